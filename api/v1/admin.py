@@ -0,0 +1,81 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Query
+
+from services.db.sqlite_pool import db_connection, run_db
+from services.http.host_concurrency import host_concurrency
+from services.observability import metrics
+from services.observability.cache_report import sample_keys
+
+from .deps import require_admin
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+_LLM_USAGE_COLUMNS = """
+    COUNT(*) AS requests,
+    SUM(CASE WHEN success THEN 1 ELSE 0 END) AS successes,
+    SUM(COALESCE(llm_calls, 0)) AS llm_calls,
+    SUM(COALESCE(prompt_tokens, 0)) AS prompt_tokens,
+    SUM(COALESCE(completion_tokens, 0)) AS completion_tokens,
+    SUM(COALESCE(cached_tokens, 0)) AS cached_tokens,
+    AVG(prompt_tokens) AS avg_prompt_tokens,
+    AVG(completion_tokens) AS avg_completion_tokens,
+    AVG(llm_latency_ms) AS avg_llm_latency_ms,
+    AVG(processing_time_ms) AS avg_processing_time_ms,
+    SUM(COALESCE(cost_usd, 0)) AS cost_usd
+"""
+
+
+@router.get("/analytics/llm_usage")
+async def llm_usage(days: int = Query(default=7, ge=1, le=365)):
+    """Agregados de tokens, latencia y coste del LLM por día y modelo."""
+    since = f"-{days} days"
+
+    def _query():
+        with db_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT date(created_at) AS day, llm_model AS model, {_LLM_USAGE_COLUMNS}
+                FROM brochure_analytics
+                WHERE created_at >= datetime('now', ?) AND llm_model IS NOT NULL
+                GROUP BY day, model
+                ORDER BY day DESC, model
+                """,
+                (since,),
+            ).fetchall()
+            totals = conn.execute(
+                f"""
+                SELECT {_LLM_USAGE_COLUMNS}
+                FROM brochure_analytics
+                WHERE created_at >= datetime('now', ?) AND llm_model IS NOT NULL
+                """,
+                (since,),
+            ).fetchone()
+            return rows, totals
+
+    rows, totals = await run_db(_query)
+
+    total = dict(totals)
+    successes = total.get("successes") or 0
+    total["cost_per_success_usd"] = (total["cost_usd"] or 0) / successes if successes else None
+    return {"days": days, "totals": total, "by_day_model": [dict(r) for r in rows]}
+
+
+@router.get("/cache/stats")
+async def cache_stats(sample: int = Query(default=0, ge=0, le=20000)):
+    """Estadísticas por namespace de caché; con `sample>0` muestrea además claves de Redis."""
+    result = {"metrics": metrics.cache_stats()}
+    if sample:
+        loop = asyncio.get_running_loop()
+        try:
+            result["sample"] = await loop.run_in_executor(None, lambda: sample_keys(sample=sample))
+        except Exception as e:
+            result["sample_error"] = str(e)
+    return result
+
+
+@router.get("/scraper/hosts")
+async def scraper_hosts():
+    """Ventana AIMD por host de este worker: límite, en vuelo, espera y Retry-After pendiente."""
+    return {"hosts": host_concurrency.snapshot()}
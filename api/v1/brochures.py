@@ -4,13 +4,21 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 
 from api.v1.schemas import CreateBrochureRequest, DownloadBrochureRequest
+from config import settings
 from services.brochures.cache import (
     generate_cache_key as gen_cache_key_service,
 )
 from services.brochures.cache import (
+    generate_content_key,
     get_brochure_payload,
+    get_shared_brochure,
     store_brochure,
+    store_brochure_pointer,
+    store_shared_brochure,
 )
+from services.common.deadline import Deadline, DeadlineExceeded
+from services.db.sqlite_pool import run_db
+from services.http.fetch_scheduler import FetchFlow
 from services.logging.dev_logger import get_logger
 from services.openai.openai_client import OpenAIClient
 from services.pdf.html_utils import sanitize_html_for_pdf
@@ -19,11 +27,9 @@ from services.scraper import Scraper
 
 from .deps import (
     MAX_BROCHURES_PER_USER,
-    ensure_user,
     get_client_ip,
-    get_conn,
-    increment_brochures,
-    reset_brochures_if_new_day,
+    release_brochure,
+    reserve_brochure,
     set_full_language,
     store_brochure_analytics,
 )
@@ -66,6 +72,9 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
     import time
 
     start_time = time.time()
+    # Presupuesto de tiempo extremo a extremo para scraping + LLM
+    deadline = Deadline(settings.request_deadline_seconds)
+    reservation = None
 
     try:
         url = str(body.url)
@@ -73,19 +82,14 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
         brochure_type = str(body.brochure_type) or "professional"
         language = set_full_language(body.language)
 
-        # Identify or create user in the same call using anon_id or IP
+        # Identify or create user in the same call using anon_id or IP, with the
+        # daily reset and the quota reservation in a single transaction
         user_ip = get_client_ip(request)
-        user = ensure_user(user_ip, body.anon_id)
-
-        # Reset diario por fecha para consistencia
-        conn = get_conn()
-        try:
-            user = reset_brochures_if_new_day(conn, user)
-        finally:
-            conn.close()
+        user, reserved = await run_db(reserve_brochure, user_ip, body.anon_id)
 
+        # Incluye la unidad reservada para esta petición
         used = int(user.get("brochures_count", 0))
-        if used >= MAX_BROCHURES_PER_USER:
+        if not reserved:
             # Analytics para quota excedida
             processing_time = int((time.time() - start_time) * 1000)
             store_brochure_analytics(
@@ -99,20 +103,39 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
                 error_type="quota_exceeded",
             )
             raise HTTPException(status_code=429, detail="Brochure quota exceeded for this user")
-
-        brochure = await OpenAIClient(Scraper).create_brochure(
-            company_name, url, language, brochure_type
-        )
+        # Hasta el éxito la reserva se devuelve en `finally` si algo falla
+        reservation = user
+
+        # Resultado compartido entre usuarios para el mismo contenido (sin LLM si existe)
+        content_key = generate_content_key(url, language, brochure_type, company_name)
+        shared = get_shared_brochure(content_key) if settings.brochure_shared_cache else None
+
+        llm_client = OpenAIClient(Scraper)
+        if shared is not None:
+            brochure = shared
+        else:
+            try:
+                brochure = await llm_client.create_brochure(
+                    company_name,
+                    url,
+                    language,
+                    brochure_type,
+                    deadline=deadline,
+                    flow=FetchFlow(user_id=user["anon_id"]),
+                )
+            except DeadlineExceeded:
+                brochure = "Error: deadline exceeded during scraping"
 
         processing_time = int((time.time() - start_time) * 1000)
 
         if isinstance(brochure, str) and brochure.startswith("Error:"):
             msg_lower = brochure.lower()
-            error_type = (
-                "openai_api_key_missing"
-                if "missing openai api key" in msg_lower
-                else "upstream_error"
-            )
+            if "missing openai api key" in msg_lower:
+                error_type = "openai_api_key_missing"
+            elif "deadline exceeded" in msg_lower:
+                error_type = "deadline_exceeded"
+            else:
+                error_type = "upstream_error"
 
             # Analytics para errores
             store_brochure_analytics(
@@ -124,11 +147,15 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
                 success=False,
                 processing_time_ms=processing_time,
                 error_type=error_type,
+                **llm_client.usage.as_analytics(),
             )
 
             if "missing openai api key" in msg_lower:
                 # Falta de configuración: 503 Service Unavailable
                 raise HTTPException(status_code=503, detail="Service unavailable")
+            elif error_type == "deadline_exceeded":
+                # Presupuesto agotado: 504 Gateway Timeout
+                raise HTTPException(status_code=504, detail="Brochure generation timed out")
             else:
                 # Error del proveedor o de procesamiento: 502 Bad Gateway
                 raise HTTPException(status_code=502, detail="Upstream provider error")
@@ -144,15 +171,28 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
             language=language,
             success=True,
             processing_time_ms=processing_time,
+            **llm_client.usage.as_analytics(),
         )
 
         # Cache brochure original en Redis por 1 hora
         cache_key = gen_cache_key_service(user_ip, body.model_dump(mode="json"))
-        store_brochure(cache_key, brochure, body.model_dump(mode="json"), user_ip, ttl_seconds=3600)
+        if settings.brochure_shared_cache:
+            # La entrada del usuario solo apunta al blob compartido (sin duplicar el HTML)
+            if shared is None:
+                store_shared_brochure(
+                    content_key, brochure, ttl_seconds=settings.brochure_shared_cache_ttl
+                )
+            store_brochure_pointer(
+                cache_key, content_key, body.model_dump(mode="json"), user_ip, ttl_seconds=3600
+            )
+        else:
+            store_brochure(
+                cache_key, brochure, body.model_dump(mode="json"), user_ip, ttl_seconds=3600
+            )
 
-        # Update usage count after successful generation
-        increment_brochures(user["anon_id"])
-        remaining_after = max(0, MAX_BROCHURES_PER_USER - (used + 1))
+        # Generación correcta: la unidad reservada queda consumida
+        reservation = None
+        remaining_after = max(0, MAX_BROCHURES_PER_USER - used)
 
         return {
             "success": True,
@@ -160,7 +200,7 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
             "cache_key": cache_key,
             "expires_in": 3600,
             "anon_id": user["anon_id"],
-            "brochures_used": used + 1,
+            "brochures_used": used,
             "brochures_remaining": remaining_after,
         }
 
@@ -198,6 +238,13 @@ async def create_brochure(request: Request, body: CreateBrochureRequest):
         # No exponer detalles internos en 500
         logger.error("[create_brochure] Error: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error") from e
+    finally:
+        if reservation is not None:
+            # La generación no llegó a completarse: devolver la cuota reservada
+            try:
+                await run_db(release_brochure, reservation["anon_id"], reservation["updated_at"])
+            except Exception as e:
+                logger.warning("[create_brochure] Error releasing quota: %s", e)
 
 
 @router.post("/download_brochure_pdf")
@@ -223,7 +270,11 @@ async def download_brochure_pdf(request: Request, body: DownloadBrochureRequest)
 
     # Generar PDF con Playwright vía helper (capturar errores inesperados)
     try:
-        pdf_bytes = await render_pdf(request.app, html)
+        pdf_bytes = await render_pdf(
+            request.app, html, deadline=Deadline(settings.request_deadline_seconds)
+        )
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="PDF generation timed out") from None
     except Exception:
         # No exponer detalles internos
         raise HTTPException(status_code=500, detail="Internal server error") from None
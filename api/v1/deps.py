@@ -1,32 +1,22 @@
-import os
+import asyncio
+import hmac
 import sqlite3
 import uuid
-from datetime import date, datetime
+from datetime import UTC, date, datetime
 
-from fastapi import Request
+from fastapi import HTTPException, Request
 
 from config import settings
+from services.db.analytics_sink import analytics_sink
+from services.db.sqlite_pool import db_connection, submit_db
 from services.logging.dev_logger import get_logger
+from services.observability import tracing
 
 # Quota configurable via env, default 3
 MAX_BROCHURES_PER_USER = int(settings.max_brochures_per_user)
 logger = get_logger(__name__)
 
 
-def _db_path_from_env() -> str:
-    url = os.getenv("DATABASE_URL", "sqlite:///./data/brochuresai.db")
-    if url.startswith("sqlite:///"):
-        return url.replace("sqlite:///", "")
-    # fallback
-    return "./data/brochuresai.db"
-
-
-def get_conn():
-    conn = sqlite3.connect(_db_path_from_env(), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def get_user_by_anon_id(conn: sqlite3.Connection, anon_id: str):
     cur = conn.execute("SELECT * FROM users WHERE anon_id = ?", (anon_id,))
     return cur.fetchone()
@@ -49,34 +39,92 @@ def create_user(conn: sqlite3.Connection, ip: str) -> sqlite3.Row:
     return get_user_by_anon_id(conn, new_anon)
 
 
-def ensure_user(ip: str, anon_id: str | None):
-    conn = get_conn()
-    try:
-        row = None
-        if anon_id:
-            row = get_user_by_anon_id(conn, anon_id)
+@tracing.traced("db.ensure_user")
+def ensure_user(ip: str, anon_id: str | None, conn: sqlite3.Connection | None = None):
+    if conn is None:
+        with db_connection() as pooled:
+            return ensure_user(ip, anon_id, pooled)
+    row = None
+    if anon_id:
+        row = get_user_by_anon_id(conn, anon_id)
+    if row is None and ip:
+        row = get_user_by_ip(conn, ip)
+    if row is None:
+        row = create_user(conn, ip)
+    return dict(row)
+
+
+@tracing.traced("db.resolve_user")
+def resolve_user(ip: str, anon_id: str | None) -> dict:
+    """Usuario por anon_id/IP (se crea si no existe) con el contador diario ya reseteado.
+
+    Usa una sola conexión del pool; llamar vía `run_db` desde código async.
+    """
+    with db_connection() as conn:
+        user = ensure_user(ip, anon_id, conn)
+        return reset_brochures_if_new_day(conn, user)
+
+
+# Reset diario + check-and-reserve en una sola sentencia: reserva si ha cambiado el
+# día (el contador vuelve a 1) o si queda cuota; sin fila devuelta = cuota agotada
+_RESERVE_BROCHURE = """
+    UPDATE users SET
+      brochures_count = CASE
+        WHEN date(updated_at) < date('now') THEN 1
+        ELSE brochures_count + 1
+      END,
+      updated_at = datetime('now')
+    WHERE anon_id = ?
+      AND (date(updated_at) < date('now') OR brochures_count < ?)
+    RETURNING *
+"""
+
+
+@tracing.traced("db.reserve_brochure")
+def reserve_brochure(
+    ip: str, anon_id: str | None, limit: int = MAX_BROCHURES_PER_USER
+) -> tuple[dict, bool]:
+    """Resuelve el usuario, aplica el reset diario y reserva una unidad de cuota.
+
+    Todo en una transacción `BEGIN IMMEDIATE` (toma el lock de escritura al empezar),
+    así dos peticiones simultáneas del mismo usuario no pueden superar la cuota.
+    Devuelve `(usuario, reservado)`; si se reservó, `brochures_count` ya la incluye.
+    Si la generación falla, devolver la unidad con `release_brochure`.
+    """
+    with db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = get_user_by_anon_id(conn, anon_id) if anon_id else None
         if row is None and ip:
             row = get_user_by_ip(conn, ip)
         if row is None:
-            row = create_user(conn, ip)
-        return dict(row)
-    finally:
-        conn.close()
+            row = conn.execute(
+                "INSERT INTO users (ip_address, anon_id, brochures_count, created_at, updated_at)"
+                " VALUES (?, ?, 0, datetime('now'), datetime('now')) RETURNING *",
+                (ip, uuid.uuid4().hex),
+            ).fetchone()
+        reserved = conn.execute(_RESERVE_BROCHURE, (row["anon_id"], int(limit))).fetchone()
+        conn.commit()
+        return dict(reserved or row), reserved is not None
 
 
-def increment_brochures(anon_id: str):
-    conn = get_conn()
-    try:
+@tracing.traced("db.release_brochure")
+def release_brochure(anon_id: str, reserved_at: str | None = None) -> None:
+    """Devuelve una unidad reservada (generación fallida).
+
+    Con `reserved_at` (el `updated_at` tras reservar) no se toca el contador si
+    entretanto ha cambiado el día y ya se reseteó.
+    """
+    with db_connection() as conn:
         conn.execute(
-            "UPDATE users SET brochures_count = brochures_count + 1, updated_at = datetime('now') WHERE anon_id = ?",
-            (anon_id,),
+            "UPDATE users SET brochures_count = MAX(brochures_count - 1, 0)"
+            " WHERE anon_id = ? AND (? IS NULL OR date(updated_at) = date(?))",
+            (anon_id, reserved_at, reserved_at),
         )
         conn.commit()
-    finally:
-        conn.close()
 
 
 # Resetea el contador si ha cambiado el día (comparando solo la parte de fecha, sin horas/minutos)
+@tracing.traced("db.reset_brochures_if_new_day")
 def reset_brochures_if_new_day(conn: sqlite3.Connection, user: dict | sqlite3.Row) -> dict:
     # Acepta tanto dict como sqlite3.Row
     user_dict = dict(user) if isinstance(user, sqlite3.Row) else (user or {})
@@ -125,6 +173,19 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
+def require_admin(request: Request) -> None:
+    """Protege rutas de administración con `ADMIN_TOKEN` (cabecera X-Admin-Token).
+
+    Sin `ADMIN_TOKEN` configurado las rutas no existen (404) en lugar de quedar abiertas.
+    """
+    expected = settings.admin_token
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    provided = request.headers.get("X-Admin-Token") or ""
+    if not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
 def set_full_language(language: str) -> str:
     if language == "en":
         return "English"
@@ -133,6 +194,24 @@ def set_full_language(language: str) -> str:
     return "English"
 
 
+_ANALYTICS_INSERT = """
+    INSERT INTO brochure_analytics
+    (anon_id, url_domain, company_name, company_name_length, brochure_type,
+     language, success, processing_time_ms, error_type, llm_model, llm_calls,
+     prompt_tokens, completion_tokens, cached_tokens, llm_latency_ms, cost_usd,
+     created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+@tracing.traced("db.insert_brochure_analytics")
+def insert_brochure_analytics(rows: list[tuple]) -> None:
+    """Inserta un lote de filas de analytics en una sola transacción."""
+    with db_connection() as conn:
+        conn.executemany(_ANALYTICS_INSERT, rows)
+        conn.commit()
+
+
 def store_brochure_analytics(
     anon_id: str,
     url: str,
@@ -142,10 +221,21 @@ def store_brochure_analytics(
     success: bool,
     processing_time_ms: int | None = None,
     error_type: str | None = None,
+    llm_model: str | None = None,
+    llm_calls: int | None = None,
+    prompt_tokens: int | None = None,
+    completion_tokens: int | None = None,
+    cached_tokens: int | None = None,
+    llm_latency_ms: int | None = None,
+    cost_usd: float | None = None,
 ):
     """
     Guarda analytics de creación de brochures de manera limpia y truncada.
 
+    No bloquea: la fila se encola en el sink write-behind y se persiste en lote.
+    Sin sink, dentro del event loop se inserta en el executor de SQLite y se
+    devuelve su `Future` (p. ej. para esperarlo en tests).
+
     Args:
         anon_id: ID anónimo del usuario
         url: URL original (se extraerá solo el dominio)
@@ -155,11 +245,11 @@ def store_brochure_analytics(
         success: Si la generación fue exitosa
         processing_time_ms: Tiempo de procesamiento en milisegundos
         error_type: Tipo de error si success=False
+        llm_model .. cost_usd: uso del LLM en la petición (ver `LLMUsage.as_analytics`)
     """
     import re
     from urllib.parse import urlparse
 
-    conn = get_conn()
     try:
         # Extraer dominio limpio de la URL
         try:
@@ -186,29 +276,40 @@ def store_brochure_analytics(
         # Truncar error_type si existe
         clean_error_type = error_type[:50] if error_type else None
 
-        # Insertar en BD
-        conn.execute(
-            """
-            INSERT INTO brochure_analytics 
-            (anon_id, url_domain, company_name, company_name_length, brochure_type, 
-             language, success, processing_time_ms, error_type, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """,
-            (
-                anon_id,
-                domain,
-                clean_company_name,
-                company_name_length,
-                brochure_type,
-                language,
-                success,
-                processing_time_ms,
-                clean_error_type,
-            ),
+        row = (
+            anon_id,
+            domain,
+            clean_company_name,
+            company_name_length,
+            brochure_type,
+            language,
+            success,
+            processing_time_ms,
+            clean_error_type,
+            llm_model,
+            llm_calls,
+            prompt_tokens,
+            completion_tokens,
+            cached_tokens,
+            llm_latency_ms,
+            cost_usd,
+            # Hora del evento (UTC, mismo formato que datetime('now')), no la del volcado
+            datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S"),
         )
-        conn.commit()
+
+        # Write-behind: encolar sin tocar la BD
+        if analytics_sink.running:
+            analytics_sink.offer(row)
+            return None
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Fuera del event loop (scripts): insertar en línea
+            insert_brochure_analytics([row])
+            return None
+        # Sin sink (ANALYTICS_WRITE_BEHIND=false o fallo al arrancar): insertar en el
+        # executor de SQLite sin esperar, nunca en el event loop
+        return submit_db(insert_brochure_analytics, [row])
     except Exception as e:
         # No fallar si analytics falla, solo loggear
         logger.warning("[Analytics] Error storing brochure analytics: %s", e)
-    finally:
-        conn.close()
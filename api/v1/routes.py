@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from api.v1.admin import router as admin_router
 from api.v1.brochures import router as brochures_router
 from api.v1.users import router as users_router
 
@@ -9,3 +10,4 @@ router = APIRouter()
 # Mount sub-routers
 router.include_router(users_router)
 router.include_router(brochures_router)
+router.include_router(admin_router)
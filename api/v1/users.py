@@ -1,11 +1,11 @@
 from fastapi import APIRouter, HTTPException, Request
 
+from services.db.sqlite_pool import run_db
+
 from .deps import (
     MAX_BROCHURES_PER_USER,
-    ensure_user,
     get_client_ip,
-    get_conn,
-    reset_brochures_if_new_day,
+    resolve_user,
 )
 
 router = APIRouter()
@@ -15,14 +15,8 @@ router = APIRouter()
 async def get_remaining_brochures(request: Request, anon_id: str = ""):
     try:
         user_ip = get_client_ip(request)
-        user = ensure_user(user_ip, anon_id if anon_id else None)
-
         # Resetear si ha cambiado el día (solo por fecha)
-        conn = get_conn()
-        try:
-            user = reset_brochures_if_new_day(conn, user)
-        finally:
-            conn.close()
+        user = await run_db(resolve_user, user_ip, anon_id if anon_id else None)
 
         remaining = max(0, MAX_BROCHURES_PER_USER - int(user.get("brochures_count", 0)))
         return {
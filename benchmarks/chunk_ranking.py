@@ -0,0 +1,107 @@
+"""Calidad y latencia del ranking TF-IDF de trozos frente al truncado por orden de fetch.
+
+Construye un crawl sintético: páginas de relleno (blog, noticias) que llegan antes que
+las páginas importantes del corpus, como ocurre con menús largos. Mide:
+- recall de "hechos clave" del perfil de empresa que llegan al prompt
+- latencia de `pack_ranked_chunks` (CPU, sin modelos externos)
+
+Uso:
+    python -m benchmarks.chunk_ranking [--filler-pages 40] [--budget 30000] [--repeat 20]
+"""
+
+import argparse
+import glob
+import os
+import random
+import statistics
+import time
+
+from benchmarks.extract_modes import CORPUS_DIR, extract
+from services.openai.chunk_ranking import pack_ranked_chunks
+
+# Frases del corpus que un brochure de Acme Robotics debería poder usar
+KEY_FACTS = (
+    "founded in Madrid in 2012",
+    "240 people",
+    "Laura Martín",
+    "Warehouse automation",
+    "Inspection drones",
+    "Fleet software",
+    "Maintenance plans",
+    "sales@acme-robotics.example",
+    "Lisbon",
+    "100% renewable electricity",
+)
+
+_FILLER_WORDS = (
+    "quarterly market trends webinar recap event photos conference keynote speaker "
+    "industry outlook podcast episode interview newsletter digest holiday schedule "
+    "office party recipe weather travel tips football results charity run"
+).split()
+
+
+def filler_page(rng: random.Random, chars: int = 6000) -> str:
+    lines = []
+    size = 0
+    while size < chars:
+        line = " ".join(rng.choice(_FILLER_WORDS) for _ in range(rng.randint(8, 20))) + "."
+        lines.append(line.capitalize())
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def build_crawl(filler_pages: int, seed: int = 7) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = sorted(glob.glob(os.path.join(CORPUS_DIR, "*.html")))
+    texts = {
+        os.path.basename(p): extract(open(p, encoding="utf-8").read(), "main")[0] for p in corpus
+    }
+    pages = [("landing", texts.pop("landing.html", ""))]
+    pages += [("info", filler_page(rng)) for _ in range(filler_pages)]
+    pages += [("info", text) for _, text in sorted(texts.items())]
+    return pages
+
+
+def fetch_order_truncate(pages: list[tuple[str, str]], budget: int) -> str:
+    out = ""
+    for _, text in pages:
+        out += "\n\n" + text
+        if len(out) >= budget:
+            return out[:budget]
+    return out
+
+
+def recall(text: str) -> float:
+    return sum(1 for fact in KEY_FACTS if fact in text) / len(KEY_FACTS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filler-pages", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=30_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = build_crawl(args.filler_pages)
+    total_chars = sum(len(t) for _, t in pages)
+
+    baseline = fetch_order_truncate(pages, args.budget)
+    timings = []
+    ranked_text = ""
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        packed = pack_ranked_chunks(pages, args.budget, company_name="Acme Robotics")
+        timings.append((time.perf_counter() - started) * 1000)
+        ranked_text = "\n\n".join(text for _, text in packed)
+
+    print(f"pages={len(pages)} input_chars={total_chars} budget={args.budget}")
+    print(f"fetch-order truncation recall: {recall(baseline):.0%}")
+    print(f"tf-idf ranked packing recall:  {recall(ranked_text):.0%}")
+    print(
+        f"ranking latency ms: p50={statistics.median(timings):.2f} "
+        f"max={max(timings):.2f} (n={len(timings)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compara el extractor de texto completo ("full") con el de contenido principal ("main").
+
+Mide caracteres y tokens aproximados por página y para el crawl completo (incluyendo
+la eliminación de líneas repetidas entre páginas del modo "main").
+
+Uso:
+    python -m benchmarks.extract_modes                  # corpus de benchmarks/corpus
+    python -m benchmarks.extract_modes pagina1.html ... # ficheros HTML propios
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from services.scraper import _clean_soup, _extract_main_text, _extract_text, strip_repeated_lines
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+def count_tokens(text: str) -> int:
+    """Tokens con tiktoken si está instalado; si no, aproximación de ~4 caracteres por token."""
+    try:
+        import tiktoken
+
+        return len(tiktoken.get_encoding("o200k_base").encode(text))
+    except Exception:
+        return (len(text) + 3) // 4
+
+
+def extract(html: str, mode: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    soup = BeautifulSoup(html, "html.parser")
+    _clean_soup(soup)
+    text = _extract_main_text(soup) if mode == "main" else _extract_text(soup)
+    return text, time.perf_counter() - started
+
+
+def run(paths: list[str]) -> dict:
+    pages = [(os.path.basename(p), open(p, encoding="utf-8").read()) for p in paths]
+    full = [extract(html, "full") for _, html in pages]
+    main = [extract(html, "main") for _, html in pages]
+    main_crawl = strip_repeated_lines([text for text, _ in main])
+
+    rows = []
+    for (name, _), (f_text, f_time), (_, m_time), m_text in zip(
+        pages, full, main, main_crawl, strict=True
+    ):
+        rows.append(
+            {
+                "page": name,
+                "full_tokens": count_tokens(f_text),
+                "main_tokens": count_tokens(m_text),
+                "full_ms": f_time * 1000,
+                "main_ms": m_time * 1000,
+            }
+        )
+    return {
+        "rows": rows,
+        "full_tokens": sum(r["full_tokens"] for r in rows),
+        "main_tokens": sum(r["main_tokens"] for r in rows),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="HTML files (default: benchmarks/corpus/*.html)")
+    args = parser.parse_args()
+    paths = args.paths or sorted(glob.glob(os.path.join(CORPUS_DIR, "*.html")))
+
+    result = run(paths)
+    print(f"{'page':<24}{'full tok':>10}{'main tok':>10}{'saved':>8}{'full ms':>10}{'main ms':>10}")
+    for r in result["rows"]:
+        saved = 1 - r["main_tokens"] / r["full_tokens"] if r["full_tokens"] else 0
+        print(
+            f"{r['page']:<24}{r['full_tokens']:>10}{r['main_tokens']:>10}{saved:>8.0%}"
+            f"{r['full_ms']:>10.2f}{r['main_ms']:>10.2f}"
+        )
+    total_saved = 1 - result["main_tokens"] / max(1, result["full_tokens"])
+    print(
+        f"{'TOTAL (crawl)':<24}{result['full_tokens']:>10}{result['main_tokens']:>10}"
+        f"{total_saved:>8.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
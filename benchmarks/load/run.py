@@ -0,0 +1,351 @@
+"""Suite de carga extremo a extremo para create/download/get_remaining.
+
+Ejecuta la app ASGI en proceso con:
+- sitios web stub (`benchmarks/load/stub_sites.py`) servidos vía override del transporte
+- LLM simulado (`MOCK_LLM=true`, latencia configurable)
+- Redis local (`--redis-url`, por defecto la base 15) y SQLite temporal
+
+Por endpoint informa p50/p95/p99, RPS, errores, RSS pico del worker y de Chromium
+(procesos descendientes, leído de /proc). Los resultados pueden guardarse como
+baseline y compararse en ejecuciones posteriores para detectar regresiones.
+
+Uso:
+    python -m benchmarks.load.run --concurrency 8 --requests 40
+    python -m benchmarks.load.run --save-baseline benchmarks/load/baselines/local.json
+    python -m benchmarks.load.run --compare benchmarks/load/baselines/local.json
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+
+ENDPOINTS = ("remaining", "create", "download")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+
+
+def _configure_env(args: argparse.Namespace, db_path: str) -> None:
+    # Debe ejecutarse antes de importar la app: settings se leen al importar
+    os.environ.update(
+        {
+            "MOCK_LLM": "true",
+            "MOCK_LLM_LATENCY": args.llm_latency,
+            "MOCK_LLM_ERROR_RATE": str(args.llm_error_rate),
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "REDIS_URL": args.redis_url,
+            "MAX_BROCHURES_PER_USER": str(10**9),
+            "RATE_LIMIT_MAX_PER_MINUTE": str(10**9),
+            "TRUST_PROXY": "true",
+            "DEV_MODE": "false",
+            # Medir el camino de generación: los sitios stub se repiten entre usuarios
+            "BROCHURE_SHARED_CACHE": "false",
+        }
+    )
+
+
+def _migrate(db_path: str) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+            with open(path, encoding="utf-8") as fh:
+                conn.executescript(fh.read())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# --- Memoria (Linux /proc) ---
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _descendants(root: int) -> list[int]:
+    parents: dict[int, list[int]] = {}
+    for stat_path in glob.glob("/proc/[0-9]*/stat"):
+        try:
+            with open(stat_path) as fh:
+                # El nombre va entre paréntesis y puede contener espacios
+                after = fh.read().rsplit(")", 1)[1].split()
+            pid = int(stat_path.split("/")[2])
+            parents.setdefault(int(after[1]), []).append(pid)
+        except (OSError, ValueError, IndexError):
+            continue
+    found, stack = [], [root]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _chromium_rss_kb(root: int) -> int:
+    total = 0
+    for pid in _descendants(root):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as fh:
+                cmdline = fh.read().lower()
+        except OSError:
+            continue
+        if b"chrom" in cmdline or b"headless_shell" in cmdline:
+            total += _rss_kb(pid)
+    return total
+
+
+class MemorySampler:
+    """Muestrea en segundo plano el RSS del worker y de Chromium, guardando picos."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.peak_worker_kb = 0
+        self.peak_chromium_kb = 0
+        self._task: asyncio.Task | None = None
+
+    def _sample(self) -> None:
+        pid = os.getpid()
+        self.peak_worker_kb = max(self.peak_worker_kb, _rss_kb(pid))
+        self.peak_chromium_kb = max(self.peak_chromium_kb, _chromium_rss_kb(pid))
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.to_thread(self._sample)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak_worker_kb = self.peak_chromium_kb = 0
+        self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._sample()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentil por rango más cercano (sin interpolar), estable con pocas muestras."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def run_phase(name, total, concurrency, call, sampler: MemorySampler) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                status = await call(i)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    sampler.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    await sampler.stop()
+
+    ok = statuses.get("200", 0)
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": total - ok,
+        "status_counts": statuses,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "peak_worker_rss_mb": round(sampler.peak_worker_kb / 1024, 1),
+        "peak_chromium_rss_mb": round(sampler.peak_chromium_kb / 1024, 1),
+    }
+
+
+async def run_suite(args: argparse.Namespace) -> dict:
+    import httpx
+
+    from benchmarks.load.stub_sites import build_stub_sites_app, company_name, site_url
+    from main import app
+    from services.http.transport import set_transport_override
+    from services.redis.redis_client import redis_client
+
+    if args.flush_redis:
+        try:
+            redis_client.flushdb()
+        except Exception as e:
+            print(f"warning: could not flush Redis: {e}", file=sys.stderr)
+
+    stub_sites = build_stub_sites_app(latency_ms=args.site_latency_ms)
+    set_transport_override(lambda: httpx.ASGITransport(app=stub_sites))
+
+    try:
+        await app.router.startup()
+    except Exception as e:
+        # Sin Chromium instalado la descarga de PDF fallará; el resto sigue siendo medible
+        print(f"warning: startup incomplete ({e}); PDF downloads will fail", file=sys.stderr)
+
+    sites = args.sites or args.requests
+    cache_keys: list[str] = []
+    results: dict[str, dict] = {}
+    sampler = MemorySampler()
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+
+            def _headers(i: int) -> dict:
+                # Una IP por usuario virtual: rate limit y cuotas no se comparten
+                return {"X-Forwarded-For": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"}
+
+            async def remaining(i: int):
+                response = await client.get(
+                    "/api/v1/users/get_remaining/",
+                    params={"anon_id": f"bench-{i}"},
+                    headers=_headers(i),
+                )
+                return response.status_code
+
+            async def create(i: int):
+                site = i % sites
+                response = await client.post(
+                    "/api/v1/create_brochure",
+                    json={
+                        "url": site_url(site),
+                        "company_name": company_name(site),
+                        "language": "en",
+                        "brochure_type": "professional",
+                        "anon_id": f"bench-{i}",
+                    },
+                    headers=_headers(i),
+                )
+                if response.status_code == 200:
+                    cache_keys.append(response.json()["cache_key"])
+                return response.status_code
+
+            async def download(i: int):
+                response = await client.post(
+                    "/api/v1/download_brochure_pdf",
+                    json={"cache_key": cache_keys[i % len(cache_keys)]},
+                    headers=_headers(i),
+                )
+                return response.status_code
+
+            calls = {"remaining": remaining, "create": create, "download": download}
+            for name in args.endpoints:
+                if name == "download" and not cache_keys:
+                    print("skipping download: no brochure was created", file=sys.stderr)
+                    continue
+                results[name] = await run_phase(
+                    name, args.requests, args.concurrency, calls[name], sampler
+                )
+                print(_format_row(name, results[name]))
+    finally:
+        set_transport_override(None)
+        try:
+            await app.router.shutdown()
+        except Exception:
+            pass
+
+    return {
+        "meta": {
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "sites": sites,
+            "llm_latency": args.llm_latency,
+            "site_latency_ms": args.site_latency_ms,
+        },
+        "endpoints": results,
+    }
+
+
+def _format_row(name: str, r: dict) -> str:
+    return (
+        f"{name:<10} n={r['requests']:<5} err={r['errors']:<4} "
+        f"p50={r['p50_ms']:>8.1f} p95={r['p95_ms']:>8.1f} p99={r['p99_ms']:>8.1f} ms "
+        f"rps={r['rps']:>7.2f} rss={r['peak_worker_rss_mb']:.0f}MB "
+        f"chromium={r['peak_chromium_rss_mb']:.0f}MB"
+    )
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regresiones frente a la baseline: p95 más alto, RPS más bajo o más errores."""
+    problems = []
+    for name, now in current.get("endpoints", {}).items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {base['p95_ms']} -> {now['p95_ms']} ms")
+        if base["rps"] and now["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: rps {base['rps']} -> {now['rps']}")
+        base_rate = base["errors"] / max(1, base["requests"])
+        now_rate = now["errors"] / max(1, now["requests"])
+        if now_rate > base_rate + tolerance / 10:
+            problems.append(f"{name}: error rate {base_rate:.1%} -> {now_rate:.1%}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="peticiones por endpoint")
+    parser.add_argument("--sites", type=int, default=0, help="sitios stub (0 = uno por petición)")
+    parser.add_argument("--llm-latency", default="lognormal:1500:0.5")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--site-latency-ms", type=float, default=20.0)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--flush-redis", action="store_true", help="FLUSHDB de --redis-url")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _migrate(db_path)
+        _configure_env(args, db_path)
+        report = asyncio.run(run_suite(args))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as fh:
+            problems = compare(report, json.load(fh), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Sitios de empresa sintéticos servidos en proceso (ASGI) para las pruebas de carga.
+
+Cada host `companyN.bench.test` sirve el corpus de `benchmarks/corpus/` con el nombre
+de la empresa cambiado, de modo que los crawls no comparten caché de detalles.
+El scraper llega aquí mediante `set_transport_override` + `httpx.ASGITransport`, sin
+red ni DNS.
+"""
+
+import asyncio
+import os
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, PlainTextResponse
+from starlette.routing import Route
+
+from benchmarks.extract_modes import CORPUS_DIR
+
+STUB_DOMAIN = "bench.test"
+
+_PAGES = {
+    "/": "landing.html",
+    "/about": "about.html",
+    "/services": "services.html",
+    "/contact": "contact.html",
+}
+_GENERIC_PAGE = """<!DOCTYPE html><html><head><title>{company} - {path}</title></head>
+<body><nav><a href="/">Home</a> <a href="/about">About</a> <a href="/contact">Contact</a></nav>
+<main><h1>{path}</h1>{paragraphs}</main><footer>&copy; {company}</footer></body></html>"""
+
+
+def _load_corpus() -> dict[str, str]:
+    corpus = {}
+    for name in set(_PAGES.values()):
+        with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as fh:
+            corpus[name] = fh.read()
+    return corpus
+
+
+def site_url(index: int) -> str:
+    return f"https://company{index}.{STUB_DOMAIN}/"
+
+
+def company_name(index: int) -> str:
+    return f"Company {index} Robotics"
+
+
+def build_stub_sites_app(latency_ms: float = 0.0) -> Starlette:
+    """App ASGI multi-host; `latency_ms` simula el tiempo de respuesta de cada página."""
+    corpus = _load_corpus()
+
+    async def page(request: Request):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        host = (request.headers.get("host") or "").split(":")[0]
+        label = host.split(".", 1)[0]
+        index = label[len("company") :] if label.startswith("company") else "0"
+        company = company_name(int(index) if index.isdigit() else 0)
+        path = request.url.path.rstrip("/") or "/"
+
+        if path.endswith(".xml") or path.endswith(".txt"):
+            return PlainTextResponse("Not found", status_code=404)
+        name = _PAGES.get(path) or ("services.html" if path.startswith("/services/") else None)
+        if name is not None:
+            body = corpus[name].replace("Acme Robotics", company)
+            body = body.replace("acme-robotics.example", host)
+        else:
+            paragraphs = "".join(
+                f"<p>{company} article {path} paragraph {i}: robots, logistics, "
+                "maintenance and software for modern warehouses.</p>"
+                for i in range(12)
+            )
+            body = _GENERIC_PAGE.format(company=company, path=path, paragraphs=paragraphs)
+        return HTMLResponse(body)
+
+    return Starlette(routes=[Route("/{path:path}", page)])
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from benchmarks.micro.conftest import record_allocations, rounds_for
+from services.common import cache_codec as cache
+
+
+@pytest.fixture
+def compression_enabled(monkeypatch):
+    monkeypatch.setattr(cache.settings, "cache_compress", True, raising=False)
+    monkeypatch.setattr(cache.settings, "cache_compression_algo", "gzip", raising=False)
+    monkeypatch.setattr(cache.settings, "cache_compress_min_bytes", 1024, raising=False)
+
+
+def _payload(html: str) -> str:
+    # Mismo formato que store_brochure: brochure + datos de la petición
+    return json.dumps({"brochure": html, "data": {"company_name": "Acme Robotics"}})
+
+
+def test_maybe_compress(benchmark, brochure_html, compression_enabled):
+    size, html = brochure_html
+    payload = _payload(html)
+    record_allocations(benchmark, cache._maybe_compress, payload)
+    encoded = benchmark.pedantic(cache._maybe_compress, args=(payload,), rounds=rounds_for(size))
+    benchmark.extra_info["ratio"] = round(len(encoded) / len(payload), 3)
+    assert encoded.startswith("cmp:gzip:")
+
+
+def test_maybe_decompress(benchmark, brochure_html, compression_enabled):
+    size, html = brochure_html
+    encoded = cache._maybe_compress(_payload(html))
+    record_allocations(benchmark, cache._maybe_decompress, encoded)
+    decoded = benchmark.pedantic(cache._maybe_decompress, args=(encoded,), rounds=rounds_for(size))
+    assert decoded == _payload(html)
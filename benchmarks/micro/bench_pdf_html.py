@@ -0,0 +1,16 @@
+from benchmarks.micro.conftest import record_allocations, rounds_for
+from services.pdf.html_utils import inline_print_css, sanitize_html_for_pdf
+
+
+def test_sanitize_html_for_pdf(benchmark, brochure_html):
+    size, html = brochure_html
+    record_allocations(benchmark, sanitize_html_for_pdf, html)
+    result = benchmark.pedantic(sanitize_html_for_pdf, args=(html,), rounds=rounds_for(size))
+    assert "<script" not in result
+
+
+def test_inline_print_css(benchmark, brochure_html):
+    size, html = brochure_html
+    record_allocations(benchmark, inline_print_css, html)
+    result = benchmark.pedantic(inline_print_css, args=(html,), rounds=rounds_for(size))
+    assert "@page" in result
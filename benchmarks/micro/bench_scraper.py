@@ -0,0 +1,49 @@
+import asyncio
+
+from bs4 import BeautifulSoup
+
+from benchmarks.micro.conftest import record_allocations, rounds_for
+from services.scraper import Scraper, _collect_links, _filter_social_media_links, _get_base_host
+
+URL = "https://acme-robotics.example/"
+
+
+class _StaticScraper(Scraper):
+    """Scraper sin red: `fetch` devuelve el HTML del corpus."""
+
+    def __init__(self, url: str, html: str):
+        super().__init__(url)
+        self._html = html
+
+    async def fetch(self):
+        return self._html
+
+
+def test_get_content(benchmark, landing_page):
+    size, html = landing_page
+    loop = asyncio.new_event_loop()
+
+    def parse():
+        return loop.run_until_complete(_StaticScraper(URL, html).get_content())
+
+    try:
+        record_allocations(benchmark, parse)
+        result = benchmark.pedantic(parse, rounds=rounds_for(size), iterations=1)
+    finally:
+        loop.close()
+    assert result["info_links"]
+
+
+def test_collect_and_filter_links(benchmark, landing_page):
+    size, html = landing_page
+    soup = BeautifulSoup(html, "html.parser")
+    base_host = _get_base_host(URL)
+
+    def collect():
+        links = _collect_links(soup, URL, base_host)
+        return _filter_social_media_links(list(links), base_host)
+
+    record_allocations(benchmark, collect)
+    info, social = benchmark.pedantic(collect, rounds=rounds_for(size), iterations=1)
+    benchmark.extra_info["info_links"] = len(info)
+    assert social
@@ -0,0 +1,82 @@
+import gc
+import math
+import os
+import re
+import tracemalloc
+
+import pytest
+
+from benchmarks.extract_modes import CORPUS_DIR
+
+# Tamaños representativos: página típica, página larga, catálogo enorme y el tope del scraper
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+
+_BODY_RE = re.compile(r"(<body[^>]*>)(.*)(</body>)", re.I | re.S)
+
+
+def read_corpus(name: str) -> str:
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as fh:
+        return fh.read()
+
+
+def scale_html(html: str, target: int) -> str:
+    """Repite el contenido del <body> hasta ~`target` bytes.
+
+    Cada copia reescribe los enlaces relativos (`/x` -> `/pN/x`) para que el número
+    de enlaces únicos crezca con el tamaño, como en un catálogo real.
+    """
+    match = _BODY_RE.search(html)
+    if not match:
+        return html
+    head, inner, tail = html[: match.start(2)], match.group(2), html[match.end(2) :]
+    copies = max(1, math.ceil((target - len(head) - len(tail)) / max(1, len(inner))))
+    parts = [inner] + [inner.replace('href="/', f'href="/p{i}/') for i in range(1, copies)]
+    return head + "".join(parts) + tail
+
+
+def rounds_for(size: int) -> int:
+    # Muchas rondas para lo pequeño, pocas para no eternizar los tamaños grandes
+    return max(3, min(50, 2_000_000 // size))
+
+
+def record_allocations(benchmark, fn, *args) -> None:
+    """Ejecuta `fn` una vez bajo tracemalloc y anota memoria en el informe del benchmark.
+
+    - peak_kb: pico de memoria asignada durante la llamada
+    - retained_blocks / retained_kb: bloques vivos que retiene el resultado
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    del result
+    benchmark.extra_info["peak_kb"] = round(peak / 1024, 1)
+    benchmark.extra_info["retained_kb"] = round(current / 1024, 1)
+    benchmark.extra_info["retained_blocks"] = blocks
+
+
+@pytest.fixture(scope="session")
+def page_cache() -> dict:
+    return {}
+
+
+@pytest.fixture(params=list(SIZES), ids=list(SIZES))
+def landing_page(request, page_cache) -> tuple[int, str]:
+    size = SIZES[request.param]
+    key = ("landing", size)
+    if key not in page_cache:
+        page_cache[key] = scale_html(read_corpus("landing.html"), size)
+    return size, page_cache[key]
+
+
+@pytest.fixture(params=list(SIZES), ids=list(SIZES))
+def brochure_html(request, page_cache) -> tuple[int, str]:
+    size = SIZES[request.param]
+    key = ("brochure", size)
+    if key not in page_cache:
+        page_cache[key] = scale_html(read_corpus("brochures/professional.html"), size)
+    return size, page_cache[key]
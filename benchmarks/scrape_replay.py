@@ -0,0 +1,116 @@
+"""Benchmark reproducible de `get_all_details` sobre un cassette HTTP grabado.
+
+Primero se graban los sitios una vez (con red) y después se reproducen sin red,
+opcionalmente con la latencia grabada, para perfilar el pipeline de parseo,
+filtrado de enlaces y presupuesto con un corpus fijo de sitios reales.
+
+Uso:
+    python -m benchmarks.scrape_replay record https://empresa.example [...]
+    python -m benchmarks.scrape_replay replay [--repeat 5] [--latency 1.0] [--profile]
+
+Las URLs grabadas se guardan junto al cassette (`<cassette>.urls.json`), de modo
+que en CI basta con `replay` sin argumentos.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import os
+import pstats
+import statistics
+import time
+
+from services.http.cassette import CassetteTransport, get_cassette
+from services.http.transport import PinnedDNSTransport, set_transport_override
+from services.openai.openai_client import OpenAIClient
+from services.redis.redis_client import redis_client
+from services.scraper import Scraper
+
+DEFAULT_CASSETTE = os.path.join(os.path.dirname(__file__), "cassettes", "scraper.jsonl.gz")
+
+
+def _manifest_path(cassette_path: str) -> str:
+    return cassette_path + ".urls.json"
+
+
+def _clear_caches(client: OpenAIClient, url: str) -> None:
+    # Sin esto la segunda iteración mediría la caché de detalles, no el pipeline
+    try:
+        key = client._details_cache_key(url, None)
+        redis_client.delete(key, f"{key}:neg")
+    except Exception:
+        pass
+
+
+async def _run(urls: list[str], repeat: int) -> dict[str, list[float]]:
+    client = OpenAIClient(Scraper)
+    timings: dict[str, list[float]] = {u: [] for u in urls}
+    for _ in range(repeat):
+        for url in urls:
+            _clear_caches(client, url)
+            started = time.perf_counter()
+            try:
+                result = await client.get_all_details(url)
+                chars = len(result.get("details", ""))
+            except Exception as e:
+                print(f"  {url}: error {e}")
+                continue
+            timings[url].append((time.perf_counter() - started) * 1000)
+            if len(timings[url]) == 1:
+                print(f"  {url}: details_chars={chars}")
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("urls", nargs="*")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="factor de latencia grabada")
+    parser.add_argument("--profile", action="store_true", help="cProfile de la reproducción")
+    args = parser.parse_args()
+
+    cassette = get_cassette(args.cassette)
+    urls = args.urls
+    if args.mode == "record":
+        if not urls:
+            parser.error("record needs at least one URL")
+        set_transport_override(
+            lambda: CassetteTransport(cassette, mode="record", inner=PinnedDNSTransport())
+        )
+        asyncio.run(_run(urls, 1))
+        manifest = _manifest_path(args.cassette)
+        known = json.load(open(manifest)) if os.path.exists(manifest) else []
+        with open(manifest, "w") as fh:
+            json.dump(list(dict.fromkeys(known + urls)), fh, indent=2)
+        print(f"recorded {len(cassette)} responses into {args.cassette}")
+        return
+
+    if not urls:
+        urls = json.load(open(_manifest_path(args.cassette)))
+    set_transport_override(
+        lambda: CassetteTransport(cassette, mode="replay", latency_scale=args.latency)
+    )
+    print(f"cassette={args.cassette} responses={len(cassette)} latency_scale={args.latency}")
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    timings = asyncio.run(_run(urls, args.repeat))
+    if profiler:
+        profiler.disable()
+
+    all_ms = [ms for values in timings.values() for ms in values]
+    for url, values in timings.items():
+        if values:
+            print(f"{url}: p50={statistics.median(values):.1f} ms max={max(values):.1f} ms")
+    if all_ms:
+        print(f"total: p50={statistics.median(all_ms):.1f} ms (n={len(all_ms)})")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,18 @@ class Settings(BaseSettings):
     file_logging: bool = Field(default=False, alias="FILE_LOGGING")
 
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
+    # Alternative OpenAI-compatible endpoint (e.g. the local mock server)
+    openai_base_url: str | None = Field(default=None, alias="OPENAI_BASE_URL")
+    # In-process fake LLM: realistic brochures without calling the API
+    mock_llm: bool = Field(default=False, alias="MOCK_LLM")
+    mock_llm_latency: str = Field(default="lognormal:1500:0.5", alias="MOCK_LLM_LATENCY")
+    mock_llm_error_rate: float = Field(default=0.0, alias="MOCK_LLM_ERROR_RATE")
     max_brochures_per_user: int = Field(default=3, alias="MAX_BROCHURES_PER_USER")
+    # Shared secret for /api/v1/admin/* (X-Admin-Token header); admin routes are off if unset
+    admin_token: str | None = Field(default=None, alias="ADMIN_TOKEN")
+
+    # End-to-end budget (seconds) for a request across scrape, LLM and PDF stages
+    request_deadline_seconds: float = Field(default=150, alias="REQUEST_DEADLINE_SECONDS")
 
     # Rate limiting
     rate_limit_max_per_minute: int = Field(default=10, alias="RATE_LIMIT_MAX_PER_MINUTE")
@@ -26,7 +37,49 @@ class Settings(BaseSettings):
     playwright_max_concurrency: int = Field(default=2, alias="PLAYWRIGHT_MAX_CONCURRENCY")
     playwright_pdf_timeout_ms: int = Field(default=30000, alias="PLAYWRIGHT_PDF_TIMEOUT_MS")
     playwright_disable_js: bool = Field(default=True, alias="PLAYWRIGHT_DISABLE_JS")
+    # Process-wide cap of in-flight scraper fetches, shared fairly across requests/users
+    scraper_max_in_flight: int = Field(default=32, alias="SCRAPER_MAX_IN_FLIGHT")
+    # Scraper text extraction: "full" or "main" (readability-style main content)
+    scraper_extract_mode: str = Field(default="full", alias="SCRAPER_EXTRACT_MODE")
+    # Discover subpages from /sitemap.xml before/alongside landing-page anchors
+    scraper_sitemap_discovery: bool = Field(default=False, alias="SCRAPER_SITEMAP_DISCOVERY")
+    # Probe canonical subpages (/about, /contact, ...) in parallel with the landing page
+    scraper_speculative_prefetch: bool = Field(default=False, alias="SCRAPER_SPECULATIVE_PREFETCH")
+    scraper_speculative_paths: str = Field(
+        default="/about,/about-us,/services,/contact,/nosotros,/quienes-somos,/servicios,/contacto",
+        alias="SCRAPER_SPECULATIVE_PATHS",
+    )
+    # Record/replay scraper traffic for offline benchmarks: off | record | replay
+    scraper_cassette_mode: str = Field(default="off", alias="SCRAPER_CASSETTE_MODE")
+    scraper_cassette_path: str = Field(
+        default="benchmarks/cassettes/scraper.jsonl.gz", alias="SCRAPER_CASSETTE_PATH"
+    )
+    scraper_cassette_latency: float = Field(default=0.0, alias="SCRAPER_CASSETTE_LATENCY")
     scraper_accept_language: str = Field(default="en-US,en;q=0.9", alias="SCRAPER_ACCEPT_LANGUAGE")
+    # Rank page chunks by relevance (TF-IDF) before packing them into the details budget
+    details_ranking: bool = Field(default=True, alias="DETAILS_RANKING")
+    # Company details cache: fresh until the soft TTL, served stale (and refreshed in
+    # the background) until the hard TTL
+    details_cache_soft_ttl: int = Field(default=3600, alias="DETAILS_CACHE_SOFT_TTL")
+    details_cache_hard_ttl: int = Field(default=21600, alias="DETAILS_CACHE_HARD_TTL")
+    # Cross-user brochure results keyed by content (URL, language, type, company, prompt version)
+    brochure_shared_cache: bool = Field(default=True, alias="BROCHURE_SHARED_CACHE")
+    brochure_shared_cache_ttl: int = Field(default=86400, alias="BROCHURE_SHARED_CACHE_TTL")
+    # Cache warm-up from analytics popularity (CLI: python -m services.warmup)
+    warmup_top_n: int = Field(default=50, alias="WARMUP_TOP_N")
+    warmup_days: int = Field(default=7, alias="WARMUP_DAYS")
+    warmup_concurrency: int = Field(default=4, alias="WARMUP_CONCURRENCY")
+    warmup_brochures: bool = Field(default=False, alias="WARMUP_BROCHURES")
+    # UTC hour for the in-process daily warm-up; unset disables the scheduler
+    warmup_schedule_hour: int | None = Field(default=None, alias="WARMUP_SCHEDULE_HOUR")
+    # SQLite connection pool per worker and lock wait before "database is locked"
+    sqlite_pool_size: int = Field(default=4, alias="SQLITE_POOL_SIZE")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    # Write-behind analytics: bounded in-memory queue flushed in batches
+    analytics_write_behind: bool = Field(default=True, alias="ANALYTICS_WRITE_BEHIND")
+    analytics_queue_size: int = Field(default=10000, alias="ANALYTICS_QUEUE_SIZE")
+    analytics_batch_size: int = Field(default=100, alias="ANALYTICS_BATCH_SIZE")
+    analytics_flush_seconds: float = Field(default=1.0, alias="ANALYTICS_FLUSH_SECONDS")
     # CORS allowed origins (CSV). In prod, set explicit domains.
     allowed_origins: str = Field(
         default="http://localhost:5173,http://localhost:4173", alias="ALLOWED_ORIGINS"
@@ -37,6 +90,16 @@ class Settings(BaseSettings):
     cache_compression_algo: str = Field(default="gzip", alias="CACHE_COMPRESSION_ALGO")
     cache_compress_min_bytes: int = Field(default=10240, alias="CACHE_COMPRESS_MIN_BYTES")
 
+    # Observability: Prometheus /metrics endpoint and per-stage histograms
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    # OpenTelemetry tracing exported over OTLP/HTTP; sampled by trace-id ratio
+    tracing_enabled: bool = Field(default=False, alias="TRACING_ENABLED")
+    tracing_sample_ratio: float = Field(default=0.05, alias="TRACING_SAMPLE_RATIO")
+    otel_exporter_otlp_endpoint: str = Field(
+        default="http://localhost:4318", alias="OTEL_EXPORTER_OTLP_ENDPOINT"
+    )
+    otel_service_name: str = Field(default="brochuresai-api", alias="OTEL_SERVICE_NAME")
+
     # Scraper/logging verbosity flag
     scraper_log_verbose: bool = Field(default=False, alias="SCRAPER_LOG_VERBOSE")
 
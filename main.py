@@ -5,10 +5,13 @@ from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from playwright.async_api import async_playwright
 
-from api.v1.deps import get_client_ip
+from api.v1.deps import get_client_ip, insert_brochure_analytics
 from api.v1.routes import router as api_router
 from config import settings
+from services.db.analytics_sink import analytics_sink
+from services.db.sqlite_pool import close_pools
 from services.logging.dev_logger import get_logger
+from services.observability import metrics, tracing
 from services.redis.redis_client import redis_client
 
 app = FastAPI(title="BrochuresAI API", version="1.0.0")
@@ -72,6 +75,7 @@ async def rate_limit_middleware(request: Request, call_next):
                 "X-RateLimit-Remaining": str(max(0, max_req - current)),
                 "X-RateLimit-Reset": str(bucket + window),
             }
+            metrics.record_rate_limited(path)
             return Response(status_code=429, content="Too Many Requests", headers=headers)
     except Exception:
         # Si Redis falla, fail-open
@@ -91,6 +95,38 @@ async def rate_limit_middleware(request: Request, call_next):
     return response
 
 
+# --- Métricas HTTP (registrado después: envuelve también al rate limiting) ---
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Etiquetar por plantilla de ruta (no por path crudo) para acotar la cardinalidad
+        route = request.scope.get("route")
+        path = request.url.path.rstrip("/") or "/"
+        if route is not None:
+            label = getattr(route, "path", path)
+        else:
+            label = path if path in PROTECTED_PATHS else "unmatched"
+        metrics.observe_http(request.method, label, status, time.perf_counter() - started)
+
+
+# --- Tracing (último en registrarse = más externo: el rate limiting queda dentro) ---
+app.middleware("http")(tracing.trace_request)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    content, content_type = metrics.render_latest()
+    return Response(content=content, media_type=content_type)
+
+
 # Informar estado de Redis al iniciar la app (ping único, no bloqueante)
 @app.on_event("startup")
 async def startup_redis_ping():
@@ -105,6 +141,34 @@ async def startup_redis_ping():
         logger.warning("[Redis] Not available: %s", e)
 
 
+@app.on_event("startup")
+async def startup_tracing():
+    tracing.configure_tracing()
+
+
+@app.on_event("startup")
+async def startup_analytics_sink():
+    if settings.analytics_write_behind:
+        analytics_sink.start(insert_brochure_analytics)
+
+
+@app.on_event("startup")
+async def startup_mock_llm():
+    if settings.mock_llm:
+        # Valida MOCK_LLM_LATENCY al arrancar; las peticiones reutilizan el motor
+        from services.openai.mock_llm import shared_engine
+
+        shared_engine()
+
+
+@app.on_event("startup")
+async def startup_warmup_scheduler():
+    # Import diferido: el warm-up arrastra el cliente OpenAI y el scraper
+    from services.warmup import start_warmup_scheduler
+
+    app.state.warmup_task = start_warmup_scheduler()
+
+
 @app.on_event("startup")
 async def startup_playwright():
     app.state.playwright = await async_playwright().start()
@@ -131,3 +195,27 @@ async def shutdown_playwright():
             pass
     if getattr(app.state, "playwright", None):
         await app.state.playwright.stop()
+
+
+@app.on_event("shutdown")
+async def shutdown_warmup_scheduler():
+    task = getattr(app.state, "warmup_task", None)
+    if task is not None:
+        task.cancel()
+
+
+@app.on_event("shutdown")
+async def shutdown_metrics():
+    metrics.mark_worker_dead()
+    tracing.shutdown_tracing()
+
+
+@app.on_event("shutdown")
+async def shutdown_analytics_sink():
+    # Antes de cerrar el pool: el drain escribe lo pendiente
+    await analytics_sink.stop()
+
+
+@app.on_event("shutdown")
+async def shutdown_db_pool():
+    close_pools()
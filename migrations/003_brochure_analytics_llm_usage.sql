@@ -0,0 +1,12 @@
+-- LLM usage and cost per brochure request (NULL when no LLM call was made).
+-- ALTER TABLE is not idempotent in SQLite: on re-runs the entrypoint ignores
+-- the "duplicate column" errors and continues.
+ALTER TABLE brochure_analytics ADD COLUMN llm_model TEXT;
+ALTER TABLE brochure_analytics ADD COLUMN llm_calls INTEGER;
+ALTER TABLE brochure_analytics ADD COLUMN prompt_tokens INTEGER;
+ALTER TABLE brochure_analytics ADD COLUMN completion_tokens INTEGER;
+ALTER TABLE brochure_analytics ADD COLUMN cached_tokens INTEGER;
+ALTER TABLE brochure_analytics ADD COLUMN llm_latency_ms INTEGER;
+ALTER TABLE brochure_analytics ADD COLUMN cost_usd REAL;
+
+CREATE INDEX IF NOT EXISTS idx_analytics_model_created ON brochure_analytics (llm_model, created_at);
@@ -1,46 +1,27 @@
-import base64
-import gzip
 import hashlib
 import json
 import time
 from typing import Any, Optional
 
-from config import settings
+from services.common.cache_codec import decode_payload, encode_payload
+from services.common.link_utils import normalize_url
+from services.observability import metrics, tracing
+from services.openai.prompts import PROMPT_VERSION
 from services.redis.redis_client import redis_client
 
+# Resultados compartidos entre usuarios: la clave depende solo del contenido
+SHARED_KEY_PREFIX = "brochure:content:"
 
-def _maybe_compress(s: str) -> str:
-    """Compress string payload if enabled and size >= threshold.
-    Store as safe string with prefix to allow transparent decompression.
-    Format: "cmp:gzip:" + base64(gzip(payload))
-    """
-    try:
-        if not settings.cache_compress:
-            return s
-        if len(s) < int(settings.cache_compress_min_bytes or 0):
-            return s
-        algo = (settings.cache_compression_algo or "gzip").lower()
-        if algo != "gzip":
-            # Solo soportamos gzip por ahora
-            return s
-        compressed = gzip.compress(s.encode("utf-8"), compresslevel=4)
-        return "cmp:gzip:" + base64.b64encode(compressed).decode("ascii")
-    except Exception:
-        # Ante cualquier problema, fallback a sin compresión
-        return s
 
-
-def _maybe_decompress(s: str) -> str:
-    """Detecta prefijo de compresión y devuelve el JSON en claro."""
+def _redis_get(cache: str, key: str) -> str | None:
+    """GET fail-open que contabiliza hit/miss/error del namespace."""
     try:
-        if isinstance(s, str) and s.startswith("cmp:gzip:"):
-            b64 = s[len("cmp:gzip:") :]
-            raw = base64.b64decode(b64)
-            return gzip.decompress(raw).decode("utf-8")
-        return s
+        data = redis_client.get(key)
     except Exception:
-        # Si falla la descompresión, devolvemos tal cual para no romper flujo
-        return s
+        metrics.record_cache_error(cache)
+        return None
+    metrics.record_cache(cache, bool(data))
+    return data or None
 
 
 def generate_cache_key(user_ip: str, data_json: dict[str, Any]) -> str:
@@ -48,6 +29,7 @@ def generate_cache_key(user_ip: str, data_json: dict[str, Any]) -> str:
     return hashlib.sha256(content.encode()).hexdigest()
 
 
+@tracing.traced("cache.brochure.set")
 def store_brochure(
     cache_key: str,
     brochure_html: str,
@@ -62,23 +44,101 @@ def store_brochure(
         "created_at": time.time(),
     }
     try:
-        value = json.dumps(payload)
-        value = _maybe_compress(value)
+        value = encode_payload("brochure", payload)
         redis_client.set(cache_key, value, ex=ttl_seconds)
     except Exception:
         # Si Redis no está disponible, simplemente no cacheamos
-        pass
+        metrics.record_cache_error("brochure")
 
 
+@tracing.traced("cache.brochure.get")
 def get_brochure_payload(cache_key: str) -> Optional[dict[str, Any]]:
+    data = _redis_get("brochure", cache_key)
+    if not data:
+        return None
+    payload = decode_payload("brochure", data)
+    if payload is None:
+        return None
+    # Puntero al resultado compartido: resolver el HTML
+    if payload.get("ref"):
+        brochure = get_shared_brochure(payload.pop("ref"))
+        if brochure is None:
+            return None
+        payload["brochure"] = brochure
+    return payload
+
+
+def _content_url(url: str) -> str:
+    # Mismo criterio de host que analytics y la caché de detalles: sin esquema ni
+    # `www.`, para que el warm-up por dominio acierte con lo que piden los usuarios
+    normalized = normalize_url(url).rstrip("/")
+    _, sep, rest = normalized.partition("://")
+    rest = rest if sep else normalized
+    if rest.startswith("www."):
+        rest = rest[4:]
+    return rest
+
+
+def generate_content_key(url: str, language: str, brochure_type: str, company_name: str) -> str:
+    """Clave por contenido (sin IP): misma URL normalizada, idioma, tipo, empresa y prompts."""
+    content = {
+        "url": _content_url(url),
+        "language": (language or "").strip().lower(),
+        "brochure_type": (brochure_type or "").strip().lower(),
+        "company_name": " ".join((company_name or "").split()).casefold(),
+        "prompt_version": PROMPT_VERSION,
+    }
+    digest = hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+    return SHARED_KEY_PREFIX + digest
+
+
+@tracing.traced("cache.brochure_shared.set")
+def store_shared_brochure(content_key: str, brochure_html: str, ttl_seconds: int) -> None:
+    payload = {
+        "brochure": brochure_html,
+        "prompt_version": PROMPT_VERSION,
+        "created_at": time.time(),
+    }
     try:
-        data = redis_client.get(cache_key)
+        value = encode_payload("brochure_shared", payload)
+        redis_client.set(content_key, value, ex=ttl_seconds)
     except Exception:
-        return None
+        metrics.record_cache_error("brochure_shared")
+
+
+@tracing.traced("cache.brochure_shared.get")
+def get_shared_brochure(content_key: str) -> str | None:
+    data = _redis_get("brochure_shared", content_key)
     if not data:
         return None
+    payload = decode_payload("brochure_shared", data)
+    return (payload or {}).get("brochure") or None
+
+
+@tracing.traced("cache.brochure.set_pointer")
+def store_brochure_pointer(
+    cache_key: str,
+    content_key: str,
+    data_json: dict[str, Any],
+    user_ip: str,
+    ttl_seconds: int = 3600,
+) -> None:
+    """Entrada por usuario que apunta al resultado compartido en lugar de copiarlo.
+
+    El blob compartido debe vivir al menos tanto como el puntero: si le queda
+    menos TTL se extiende.
+    """
+    payload = {
+        "ref": content_key,
+        "data": data_json,
+        "user_ip": user_ip,
+        "created_at": time.time(),
+    }
     try:
-        data_json_str = _maybe_decompress(data)
-        return json.loads(data_json_str)
+        # Los punteros son pequeños: no compensa comprimirlos
+        value = encode_payload("brochure", payload, compress=False)
+        redis_client.set(cache_key, value, ex=ttl_seconds)
+        if 0 <= int(redis_client.ttl(content_key)) < ttl_seconds:
+            redis_client.expire(content_key, ttl_seconds)
     except Exception:
-        return None
+        metrics.record_cache_error("brochure")
@@ -0,0 +1,78 @@
+import base64
+import gzip
+import json
+import time
+from typing import Any
+
+from config import settings
+from services.observability import metrics
+
+# Codec de payloads de caché en Redis (JSON + gzip opcional con prefijo `cmp:gzip:`)
+# compartido por la caché de brochures y la de detalles de empresa. Cada operación
+# se mide por namespace (`cache`) en las métricas de caché.
+
+
+def _maybe_compress(s: str, cache: str = "brochure") -> str:
+    """Compress string payload if enabled and size >= threshold.
+    Store as safe string with prefix to allow transparent decompression.
+    Format: "cmp:gzip:" + base64(gzip(payload))
+    """
+    started = time.perf_counter()
+    try:
+        if not settings.cache_compress:
+            return s
+        if len(s) < int(settings.cache_compress_min_bytes or 0):
+            return s
+        algo = (settings.cache_compression_algo or "gzip").lower()
+        if algo != "gzip":
+            # Solo soportamos gzip por ahora
+            return s
+        compressed = gzip.compress(s.encode("utf-8"), compresslevel=4)
+        encoded = "cmp:gzip:" + base64.b64encode(compressed).decode("ascii")
+        metrics.observe_cache_codec(cache, "compress", time.perf_counter() - started)
+        return encoded
+    except Exception:
+        # Ante cualquier problema, fallback a sin compresión
+        return s
+
+
+def _maybe_decompress(s: str, cache: str = "brochure") -> str:
+    """Detecta prefijo de compresión y devuelve el JSON en claro."""
+    try:
+        if isinstance(s, str) and s.startswith("cmp:gzip:"):
+            started = time.perf_counter()
+            b64 = s[len("cmp:gzip:") :]
+            raw = base64.b64decode(b64)
+            plain = gzip.decompress(raw).decode("utf-8")
+            metrics.observe_cache_codec(cache, "decompress", time.perf_counter() - started)
+            return plain
+        return s
+    except Exception:
+        # Si falla la descompresión, devolvemos tal cual para no romper flujo
+        return s
+
+
+def encode_payload(cache: str, payload: dict[str, Any], compress: bool = True) -> str:
+    """JSON (+ compresión opcional) registrando tamaños y tiempos por namespace."""
+    started = time.perf_counter()
+    serialized = json.dumps(payload)
+    metrics.observe_cache_codec(cache, "serialize", time.perf_counter() - started)
+    value = _maybe_compress(serialized, cache) if compress else serialized
+    metrics.observe_cache_payload(cache, len(serialized), len(value))
+    return value
+
+
+def decode_payload(cache: str, data: str) -> dict[str, Any] | None:
+    """Inverso de `encode_payload`; un payload ilegible cuenta como error (y miss)."""
+    try:
+        plain = _maybe_decompress(data, cache)
+        started = time.perf_counter()
+        payload = json.loads(plain)
+        metrics.observe_cache_codec(cache, "deserialize", time.perf_counter() - started)
+    except Exception:
+        metrics.record_cache_error(cache)
+        return None
+    if not isinstance(payload, dict):
+        metrics.record_cache_error(cache)
+        return None
+    return payload
@@ -1,16 +1,143 @@
 from config import settings
+from services.common.content_decoding import bounded_encodings
 
 # OpenAI configuration
 OPENAI_DEFAULT_MODEL = "gpt-5-mini"
+# Upper bound (seconds) for a single LLM call; shrunk further by the request deadline
+OPENAI_DEFAULT_TIMEOUT = 120
+
+# USD per 1M tokens: (input, cached input, output). Used to price each brochure
+# in brochure_analytics; models missing here are stored without cost.
+LLM_PRICING_PER_MTOK = {
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+# Mock LLM (MOCK_LLM=true or the stub server in services/openai/mock_server.py).
+# Latency spec in ms: "fixed:800", "uniform:500:3000" or "lognormal:<median>:<sigma>"
+MOCK_LLM_LATENCY = getattr(settings, "mock_llm_latency", "lognormal:1500:0.5") or "fixed:0"
+# Fraction of calls failing with an injected 429/500/503/timeout
+MOCK_LLM_ERROR_RATE = float(getattr(settings, "mock_llm_error_rate", 0.0) or 0.0)
+# Characters per streamed delta
+MOCK_LLM_STREAM_CHUNK_CHARS = 256
 
 # Scraper configuration
 SCRAPER_DEFAULT_TIMEOUT = 10
-# Concurrency cap for parallel page fetches during details scraping
-SCRAPER_MAX_CONCURRENCY = 6
+# Adaptive (AIMD) per-host concurrency for page fetches. Each host starts at
+# INITIAL parallel fetches, grows while responses stay fast and healthy and is
+# halved on 429/503, timeouts or latency spikes (> SPIKE_FACTOR x moving average).
+SCRAPER_HOST_CONCURRENCY_INITIAL = 4
+SCRAPER_HOST_CONCURRENCY_MIN = 1
+SCRAPER_HOST_CONCURRENCY_MAX = 16
+SCRAPER_LATENCY_SPIKE_FACTOR = 3.0
+# Longest Retry-After (seconds) honored before fetching from a host again
+SCRAPER_RETRY_AFTER_MAX = 30
+
+# Upper bound on the decoded (decompressed) body of a page fetch; larger
+# responses are aborted so a small compressed payload cannot blow up memory.
+SCRAPER_MAX_DECODED_BYTES = 5 * 1024 * 1024
+
+
+# Only encodings the scraper can decompress with a bounded output (see
+# services/common/content_decoding.py): brotli < 1.2 has no output limit.
+SCRAPER_ACCEPT_ENCODING = ", ".join(bounded_encodings())
+
+# Record/replay of scraper HTTP traffic (see services/http/cassette.py): "off",
+# "record" (live fetches are saved) or "replay" (served offline from the archive).
+SCRAPER_CASSETTE_MODE = (getattr(settings, "scraper_cassette_mode", "off") or "off").lower()
+SCRAPER_CASSETTE_PATH = getattr(
+    settings, "scraper_cassette_path", "benchmarks/cassettes/scraper.jsonl.gz"
+)
+# Replayed responses wait recorded time x this factor (0 = no simulated latency)
+SCRAPER_CASSETTE_LATENCY = float(getattr(settings, "scraper_cassette_latency", 0.0) or 0.0)
+
+# DNS cache for scraper fetches (seconds). The system resolver does not expose
+# record TTLs, so a fixed positive TTL and a short negative TTL are applied.
+SCRAPER_DNS_CACHE_TTL = 300
+SCRAPER_DNS_NEGATIVE_TTL = 30
+SCRAPER_DNS_CACHE_MAX_ENTRIES = 1024
+
+# Per-host circuit breaker: open after N host failures (timeouts, 5xx, 408/429)
+# within the window, and short-circuit fetches to that host for OPEN_SECONDS.
+SCRAPER_HOST_FAILURE_THRESHOLD = 3
+SCRAPER_HOST_FAILURE_WINDOW = 60
+SCRAPER_HOST_OPEN_SECONDS = 60
+# How often (seconds) the in-process mirror re-reads the shared state in Redis
+SCRAPER_HOST_SYNC_INTERVAL = 5
+# Hosts tracked in memory by the breaker and the AIMD controller; beyond this the
+# least recently used idle hosts are forgotten (hosts come from user URLs)
+SCRAPER_HOST_STATE_MAX_ENTRIES = 4096
+
+# Negative cache TTL (seconds) for landing pages that could not be fetched
+DETAILS_NEGATIVE_CACHE_TTL = 120
+
+# Company details cache: entries are fresh for SOFT_TTL seconds and served stale
+# (while a background refresh runs) until HARD_TTL, when Redis expires them.
+DETAILS_CACHE_SOFT_TTL = max(1, int(getattr(settings, "details_cache_soft_ttl", 3600) or 3600))
+DETAILS_CACHE_HARD_TTL = max(
+    DETAILS_CACHE_SOFT_TTL, int(getattr(settings, "details_cache_hard_ttl", 21600) or 0)
+)
+# XFetch early refresh: higher beta refreshes earlier; 0 disables early refresh
+DETAILS_CACHE_XFETCH_BETA = 1.0
+# Lock TTL (seconds) so only one worker refreshes a given entry at a time
+DETAILS_REFRESH_LOCK_TTL = 180
+
+# Prepared statements kept per pooled SQLite connection
+SQLITE_CACHED_STATEMENTS = 128
+
+# Seconds of the request deadline kept for the LLM call; the subpage crawl stops
+# early (returning partial details) so that this much budget is left.
+DEADLINE_LLM_RESERVE_SECONDS = 45
+
+# Near-duplicate page detection: pages whose 64-bit SimHash is within this many
+# bits of an already accepted page are dropped from the details.
+SCRAPER_SIMHASH_MAX_DISTANCE = 3
+# Per-URL fingerprint cache size (entries, per worker)
+SCRAPER_FINGERPRINT_CACHE_SIZE = 4096
+
+# Sitemap-first link discovery: read /sitemap.xml (or a sitemap index) in a
+# streaming fashion and merge its best-ranked internal URLs into the info links.
+SCRAPER_SITEMAP_DISCOVERY = bool(getattr(settings, "scraper_sitemap_discovery", False))
+SCRAPER_SITEMAP_PATHS = ("/sitemap.xml", "/sitemap_index.xml")
+# Hard cap on (decompressed) bytes read per sitemap document
+SCRAPER_SITEMAP_MAX_BYTES = 2 * 1024 * 1024
+# Stop parsing after this many <loc> entries per sitemap document
+SCRAPER_SITEMAP_MAX_URLS = 5000
+# Child sitemaps followed from a sitemap index
+SCRAPER_SITEMAP_MAX_CHILDREN = 3
+# Sitemap URLs merged into the info links (best ranked first)
+SCRAPER_SITEMAP_MAX_LINKS = 20
+# Per-host cache of discovered URLs (seconds); also caches "no sitemap"
+SCRAPER_SITEMAP_CACHE_TTL = 6 * 3600
+
+# Speculative prefetch: while the landing page downloads, canonical subpages are
+# fetched in parallel; results are reused only if the landing page links to them.
+SCRAPER_SPECULATIVE_PREFETCH = bool(getattr(settings, "scraper_speculative_prefetch", False))
+SCRAPER_SPECULATIVE_PATHS = tuple(
+    "/" + p.strip().strip("/")
+    for p in (getattr(settings, "scraper_speculative_paths", "") or "").split(",")
+    if p.strip().strip("/")
+)
+# Speculative fetches in flight per crawl: guesses that miss must not take the
+# host window (AIMD) or global scheduler slots ahead of real subpage fetches
+SCRAPER_SPECULATIVE_MAX_IN_FLIGHT = 2
 
 # Details aggregation budget to avoid excessive prompt payloads
 DETAILS_MAX_CHARS = 30_000
 
+# Text extraction mode: "full" (all visible text) or "main" (boilerplate-free
+# main content plus removal of lines repeated across the crawl)
+SCRAPER_EXTRACT_MODE = (getattr(settings, "scraper_extract_mode", "full") or "full").lower()
+
+# Relevance ranking of page chunks (TF-IDF against a company-profile query) when
+# building the details prompt; when disabled pages are concatenated in fetch order.
+DETAILS_RANKING = bool(getattr(settings, "details_ranking", True))
+# Target chunk size (chars) for ranking
+DETAILS_CHUNK_CHARS = 800
+
 # Logging verbosity for scraper/link processing
 SCRAPER_LOG_VERBOSE = bool(getattr(settings, "scraper_log_verbose", False))
 
@@ -32,6 +159,7 @@ def get_base_headers(accept_language_override: str | None = None) -> dict:
         ),
         "Accept-Language": accept_language,
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Encoding": SCRAPER_ACCEPT_ENCODING,
         "Connection": "keep-alive",
         "Upgrade-Insecure-Requests": "1",
     }
@@ -0,0 +1,168 @@
+import zlib
+
+# Descompresión incremental de cuerpos HTTP con tope de salida. A diferencia de
+# `aiter_bytes()` de httpx, que entrega cada bloque ya descomprimido entero, aquí
+# el propio descompresor nunca produce más de `limit` bytes (más un bloque de
+# margen), así un bloque comprimido pequeño no puede inflarse en memoria.
+
+# Tamaño máximo de cada paso de salida de los descompresores
+_STEP = 64 * 1024
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+
+def _brotli_bounded() -> bool:
+    # `output_buffer_limit` existe desde brotli 1.2 (CVE-2025-6176); sin él no hay tope
+    if brotli is None:
+        return False
+    try:
+        brotli.Decompressor().process(b"", output_buffer_limit=1)
+    except TypeError:
+        return False
+    except Exception:
+        pass
+    return True
+
+
+def bounded_encodings() -> tuple[str, ...]:
+    """Content-Encodings que se pueden descomprimir con tope, por orden de preferencia."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if _brotli_bounded():
+        encodings.append("br")
+    encodings.extend(("gzip", "deflate"))
+    return tuple(encodings)
+
+
+class UnsupportedEncodingError(Exception):
+    """Content-Encoding que no se sabe descomprimir con tope."""
+
+
+class _Stop(Exception):
+    pass
+
+
+class BoundedDecoder:
+    """Descomprime un cuerpo por bloques sin pasar de `limit` bytes de salida.
+
+    `decode()` devuelve la salida de cada bloque de entrada; al superar el tope la
+    salida se recorta a `limit` y `exceeded` queda a True (el llamador decide si es
+    un error o un truncado).
+    """
+
+    def __init__(self, content_encoding: str | None, limit: int):
+        self.limit = max(0, limit)
+        self.total = 0
+        self.exceeded = False
+        encodings = [e.strip().lower() for e in (content_encoding or "").split(",") if e.strip()]
+        encodings = [e for e in encodings if e != "identity"]
+        if len(encodings) > 1:
+            raise UnsupportedEncodingError(f"Unsupported Content-Encoding: {content_encoding}")
+        self.encoding = encodings[0] if encodings else "identity"
+        self._zlib = None
+        self._brotli = None
+        self._zstd = None
+        self._zstd_out: list[bytes] = []
+        self._raw_deflate_fallback = False
+        if self.encoding in ("gzip", "x-gzip"):
+            # 32 + MAX_WBITS: detecta cabecera gzip o zlib
+            self._zlib = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        elif self.encoding == "deflate":
+            self._zlib = zlib.decompressobj()
+            self._raw_deflate_fallback = True
+        elif self.encoding == "br":
+            if not _brotli_bounded():
+                raise UnsupportedEncodingError("Brotli without bounded output is not supported")
+            self._brotli = brotli.Decompressor()
+        elif self.encoding == "zstd":
+            if zstandard is None:
+                raise UnsupportedEncodingError("zstd requires the zstandard package")
+            self._zstd = zstandard.ZstdDecompressor().stream_writer(
+                _ZstdSink(self), write_size=_STEP
+            )
+        elif self.encoding != "identity":
+            # Igual que httpx: codificaciones desconocidas se entregan tal cual
+            self.encoding = "identity"
+
+    def _room(self) -> int:
+        return self.limit - self.total
+
+    def _take(self, data: bytes) -> bytes:
+        room = self._room()
+        if len(data) > room:
+            data = data[: max(0, room)]
+            self.exceeded = True
+        self.total += len(data)
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        if self.exceeded or not data:
+            return b""
+        if self._zlib is not None:
+            return self._decode_zlib(data)
+        if self._brotli is not None:
+            return self._decode_brotli(data)
+        if self._zstd is not None:
+            return self._decode_zstd(data)
+        return self._take(data)
+
+    def _decode_zlib(self, data: bytes) -> bytes:
+        out: list[bytes] = []
+        while data and not self.exceeded:
+            try:
+                # Como mucho un byte más que el hueco restante: basta para detectar el exceso
+                chunk = self._zlib.decompress(data, min(_STEP, self._room() + 1))
+            except zlib.error:
+                if self._raw_deflate_fallback and self.total == 0:
+                    # Algunos servidores envían deflate sin cabecera zlib
+                    self._raw_deflate_fallback = False
+                    self._zlib = zlib.decompressobj(-zlib.MAX_WBITS)
+                    continue
+                raise
+            self._raw_deflate_fallback = False
+            out.append(self._take(chunk))
+            data = self._zlib.unconsumed_tail
+            if self._zlib.eof and self._zlib.unused_data:
+                # gzip con varios miembros
+                data = self._zlib.unused_data
+                self._zlib = zlib.decompressobj(32 + zlib.MAX_WBITS)
+            elif not chunk and not data:
+                break
+        return b"".join(out)
+
+    def _decode_brotli(self, data: bytes) -> bytes:
+        out = [self._take(self._brotli.process(data, output_buffer_limit=_STEP))]
+        # Con el límite alcanzado la entrada pendiente se drena con llamadas vacías
+        while not self.exceeded and not self._brotli.can_accept_more_data():
+            out.append(self._take(self._brotli.process(b"", output_buffer_limit=_STEP)))
+        return b"".join(out)
+
+    def _decode_zstd(self, data: bytes) -> bytes:
+        try:
+            self._zstd.write(data)
+        except _Stop:
+            pass
+        out, self._zstd_out = self._zstd_out, []
+        return b"".join(out)
+
+
+class _ZstdSink:
+    """Destino del stream_writer de zstd: corta la descompresión al superar el tope."""
+
+    def __init__(self, decoder: BoundedDecoder):
+        self._decoder = decoder
+
+    def write(self, data: bytes) -> int:
+        self._decoder._zstd_out.append(self._decoder._take(bytes(data)))
+        if self._decoder.exceeded:
+            raise _Stop()
+        return len(data)
@@ -0,0 +1,43 @@
+import time
+
+
+class DeadlineExceeded(Exception):
+    """El presupuesto de tiempo de la petición se ha agotado."""
+
+
+class Deadline:
+    """Presupuesto de tiempo de una petición, compartido por todas sus etapas.
+
+    Se crea en la ruta y se pasa hacia abajo (scraper, LLM, PDF); cada etapa reduce
+    su propio timeout al tiempo restante con `clamp` en lugar de usar el suyo fijo.
+    `Deadline(None)` representa "sin límite".
+    """
+
+    def __init__(self, seconds: float | None):
+        self._expires_at = None if seconds is None else time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        """Segundos restantes (nunca negativo); `inf` si no hay límite."""
+        if self._expires_at is None:
+            return float("inf")
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def clamp(self, timeout: float, reserve: float = 0.0) -> float:
+        """Reduce `timeout` al tiempo restante menos `reserve` segundos (mínimo 0)."""
+        return max(0.0, min(timeout, self.remaining() - reserve))
+
+    def check(self, stage: str = "") -> None:
+        """Lanza `DeadlineExceeded` si ya no queda tiempo."""
+        if self.expired():
+            suffix = f" during {stage}" if stage else ""
+            raise DeadlineExceeded(f"Request deadline exceeded{suffix}")
+
+
+def remaining_or(deadline: Deadline | None, timeout: float, reserve: float = 0.0) -> float:
+    """Timeout efectivo: `timeout` si no hay deadline, o el recortado al presupuesto."""
+    if deadline is None:
+        return timeout
+    return deadline.clamp(timeout, reserve)
@@ -0,0 +1,76 @@
+import hashlib
+import re
+from collections import Counter, OrderedDict
+
+from services.common.config import SCRAPER_FINGERPRINT_CACHE_SIZE, SCRAPER_SIMHASH_MAX_DISTANCE
+from services.common.link_utils import normalize_url
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SHINGLE_SIZE = 3
+
+# normalized url -> (digest del texto, fingerprint)
+_fingerprint_cache: OrderedDict[str, tuple[bytes, int]] = OrderedDict()
+
+
+def _shingles(text: str) -> set[str]:
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < _SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + _SHINGLE_SIZE]) for i in range(len(tokens) - _SHINGLE_SIZE + 1)}
+
+
+def simhash(text: str) -> int:
+    """SimHash de 64 bits sobre shingles de 3 palabras del texto.
+
+    Textos casi idénticos producen fingerprints a poca distancia de Hamming.
+    El recuento por bit se hace por bytes con `Counter` (en C) en lugar de recorrer
+    los 64 bits de cada shingle en Python.
+    """
+    shingles = _shingles(text)
+    if not shingles:
+        return 0
+    packed = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    total = len(shingles)
+    fingerprint = 0
+    for pos in range(8):
+        bit_counts = [0] * 8
+        for value, count in Counter(packed[pos::8]).items():
+            for bit in range(8):
+                if value >> bit & 1:
+                    bit_counts[bit] += count
+        for bit, ones in enumerate(bit_counts):
+            # Bit a 1 si la mayoría de shingles lo tienen a 1
+            if ones * 2 > total:
+                fingerprint |= 1 << (pos * 8 + bit)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def is_near_duplicate(
+    fingerprint: int, accepted: list[int], max_distance: int = SCRAPER_SIMHASH_MAX_DISTANCE
+) -> bool:
+    """True si `fingerprint` está a `max_distance` bits o menos de alguno ya aceptado."""
+    return any(hamming_distance(fingerprint, other) <= max_distance for other in accepted)
+
+
+def page_fingerprint(url: str, text: str) -> int:
+    """SimHash del texto de una página, cacheado por URL normalizada.
+
+    Si la página vuelve a scrapearse con el mismo contenido se reutiliza el fingerprint.
+    """
+    key = normalize_url(url)
+    digest = hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).digest()
+    cached = _fingerprint_cache.get(key)
+    if cached is not None and cached[0] == digest:
+        _fingerprint_cache.move_to_end(key)
+        return cached[1]
+
+    fingerprint = simhash(text)
+    _fingerprint_cache[key] = (digest, fingerprint)
+    _fingerprint_cache.move_to_end(key)
+    while len(_fingerprint_cache) > SCRAPER_FINGERPRINT_CACHE_SIZE:
+        _fingerprint_cache.popitem(last=False)
+    return fingerprint
@@ -9,10 +9,22 @@ def is_private_ip(host: str) -> bool:
     """Detecta IPs privadas/loopback o hostnames locales.
 
     No realiza resolución DNS para hostnames; bloquea "localhost" y dominios .local.
+    La validación de las IPs resueltas se hace en `services.http.dns_cache`.
     """
     try:
         ip = ipaddress.ip_address(host)
-        return ip.is_private or ip.is_loopback or ip.is_reserved or ip.is_link_local
+        # IPv4 mapeada en IPv6 (::ffff:127.0.0.1) se evalúa como IPv4
+        mapped = getattr(ip, "ipv4_mapped", None)
+        if mapped is not None:
+            ip = mapped
+        return (
+            ip.is_private
+            or ip.is_loopback
+            or ip.is_reserved
+            or ip.is_link_local
+            or ip.is_multicast
+            or ip.is_unspecified
+        )
     except ValueError:
         lowered = (host or "").lower()
         if lowered in {"localhost"} or lowered.endswith(".local"):
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+from config import settings
+from services.db.sqlite_pool import run_db
+from services.logging.dev_logger import get_logger
+from services.observability import metrics
+
+# Escritura diferida (write-behind) de analytics: la petición solo encola la fila
+# en memoria y una tarea de fondo la persiste en lotes (una transacción por lote)
+# cuando se llena el lote o pasa el intervalo. Si la cola está llena la fila se
+# descarta y se cuenta: analytics nunca añade latencia a la respuesta.
+
+logger = get_logger(__name__)
+
+
+class AnalyticsSink:
+    """Cola acotada + tarea de volcado por lotes con `writer(rows)` en el executor de SQLite."""
+
+    def __init__(self, max_size: int, batch_size: int, flush_seconds: float):
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = max(0.0, flush_seconds)
+        self._writer: Callable[[list], None] | None = None
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        # Lote en construcción: se vuelca en el drain si la tarea se cancela
+        self._pending: list = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, writer: Callable[[list], None]) -> None:
+        if self.running:
+            return
+        self._writer = writer
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._pending = []
+        self._task = self._loop.create_task(self._run(), name="analytics-sink")
+
+    def offer(self, row) -> bool:
+        """Encola sin bloquear; False si no arrancado o la cola está llena (fila descartada)."""
+        if not self.running:
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not self._loop:
+            # Llamada desde otro hilo (executor): la cola no es thread-safe
+            self._loop.call_soon_threadsafe(self._put, row)
+            return True
+        return self._put(row)
+
+    def _put(self, row) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            metrics.record_analytics("dropped")
+            return False
+        metrics.record_analytics("queued")
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pending = [await self._queue.get()]
+            deadline = loop.time() + self.flush_seconds
+            while len(self._pending) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), remaining)
+                except TimeoutError:
+                    break
+                self._pending.append(row)
+            batch, self._pending = self._pending, []
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            await run_db(self._writer, batch)
+            metrics.record_analytics("written", len(batch))
+        except Exception as e:
+            metrics.record_analytics("failed", len(batch))
+            logger.warning("[Analytics] Error flushing %d rows: %s", len(batch), e)
+        finally:
+            metrics.observe_stage("analytics_flush", time.perf_counter() - started)
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Detiene la tarea y vuelca lo pendiente (lote en curso + cola)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        rows, self._pending = self._pending, []
+        while not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        try:
+            async with asyncio.timeout(timeout):
+                for i in range(0, len(rows), self.batch_size):
+                    await self._flush(rows[i : i + self.batch_size])
+        except TimeoutError:
+            logger.warning("[Analytics] Drain timed out; %d rows may be lost", len(rows))
+
+
+analytics_sink = AnalyticsSink(
+    max_size=int(settings.analytics_queue_size),
+    batch_size=int(settings.analytics_batch_size),
+    flush_seconds=float(settings.analytics_flush_seconds),
+)
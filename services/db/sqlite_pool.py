@@ -0,0 +1,174 @@
+import asyncio
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from config import settings
+from services.common.config import SQLITE_CACHED_STATEMENTS
+from services.logging.dev_logger import get_logger
+
+# Pool de conexiones SQLite por worker. Cada conexión se abre una sola vez con:
+# - journal_mode=WAL: lectores y el escritor no se bloquean entre sí
+# - synchronous=NORMAL: fsync solo en checkpoints (seguro con WAL)
+# - busy_timeout: espera al lock de escritura en vez de fallar con "database is locked"
+# - cached_statements: caché de sentencias preparadas de sqlite3
+# El trabajo con la BD se ejecuta fuera del event loop en un executor dedicado.
+
+logger = get_logger(__name__)
+
+
+def db_path_from_env() -> str:
+    url = os.getenv("DATABASE_URL", "sqlite:///./data/brochuresai.db")
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "")
+    # fallback
+    return "./data/brochuresai.db"
+
+
+class SQLitePool:
+    """Conexiones reutilizables a un fichero SQLite (LIFO: la más reciente está caliente)."""
+
+    def __init__(self, path: str, size: int, busy_timeout_ms: int):
+        self.path = path
+        self.size = max(1, size)
+        self.busy_timeout_ms = max(0, busy_timeout_ms)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._pid = os.getpid()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=SQLITE_CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.DatabaseError as e:
+            # Sistemas de ficheros sin memoria compartida (p. ej. algunos montajes de red)
+            logger.warning("[SQLite] WAL not available for %s: %s", self.path, e)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _check_fork(self) -> None:
+        # Una conexión heredada tras fork no se puede usar en el hijo
+        if os.getpid() != self._pid:
+            self._idle = queue.LifoQueue()
+            self._slots = threading.BoundedSemaphore(self.size)
+            self._pid = os.getpid()
+
+    @contextmanager
+    def connection(self):
+        """Presta una conexión; si el bloque falla se hace rollback antes de devolverla."""
+        self._check_fork()
+        self._slots.acquire()
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            yield conn
+        except BaseException:
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    # Conexión inservible: no devolverla al pool
+                    conn.close()
+                    conn = None
+            raise
+        finally:
+            if conn is not None:
+                if conn.in_transaction:
+                    # El llamante olvidó commit: no filtrar la transacción al siguiente
+                    conn.rollback()
+                self._idle.put(conn)
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_pool() -> SQLitePool:
+    """Pool del fichero de `DATABASE_URL` (uno por ruta y proceso)."""
+    path = db_path_from_env()
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = SQLitePool(
+                    path,
+                    size=int(settings.sqlite_pool_size),
+                    busy_timeout_ms=int(settings.sqlite_busy_timeout_ms),
+                )
+                _pools[path] = pool
+    return pool
+
+
+@contextmanager
+def db_connection():
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _pools_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, int(settings.sqlite_pool_size)),
+                    thread_name_prefix="sqlite",
+                )
+    return _executor
+
+
+async def run_db(func, *args, **kwargs):
+    """Ejecuta una función síncrona de BD en el executor de SQLite (no bloquea el loop)."""
+    loop = asyncio.get_running_loop()
+    # Como asyncio.to_thread: copiar contextvars para que los spans de BD cuelguen
+    # de la traza de la petición
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), lambda: ctx.run(func, *args, **kwargs))
+
+
+def submit_db(func, *args, **kwargs) -> Future:
+    """Lanza una función de BD en el executor sin esperarla; los errores van al log."""
+    ctx = contextvars.copy_context()
+    future = _get_executor().submit(ctx.run, func, *args, **kwargs)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("[SQLite] Background DB task failed: %s", future.exception())
+
+
+def close_pools() -> None:
+    global _executor
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
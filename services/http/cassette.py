@@ -0,0 +1,179 @@
+import asyncio
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+
+import httpx
+
+from services.logging.dev_logger import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+
+class Cassette:
+    """Archivo de respuestas HTTP grabadas (JSONL comprimido con gzip).
+
+    Cada respuesta se añade como un miembro gzip independiente, de modo que
+    grabar es un simple append y un archivo cortado a medias sigue siendo
+    legible hasta el último miembro completo. Por entrada se guarda método,
+    URL, status, headers, cuerpo en bruto (aún con su Content-Encoding) y el
+    tiempo que tardó la respuesta.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str], list[dict]] | None = None
+        self._cursor: dict[tuple[str, str], int] = {}
+
+    @staticmethod
+    def _key(method: str, url: str) -> tuple[str, str]:
+        return method.upper(), url
+
+    def _load(self) -> dict[tuple[str, str], list[dict]]:
+        if self._entries is None:
+            entries: dict[tuple[str, str], list[dict]] = {}
+            if os.path.exists(self.path):
+                try:
+                    with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+                        for line in fh:
+                            if not line.strip():
+                                continue
+                            entry = json.loads(line)
+                            key = self._key(entry["method"], entry["url"])
+                            entries.setdefault(key, []).append(entry)
+                except (EOFError, OSError, ValueError) as e:
+                    # Último miembro truncado: usar lo que se haya leído
+                    logger.warning("Cassette %s partially read: %s", self.path, e)
+            self._entries = entries
+        return self._entries
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._load().values())
+
+    def lookup(self, method: str, url: str) -> dict | None:
+        """Devuelve la siguiente grabación para (método, URL); repite la última al agotarse."""
+        with self._lock:
+            key = self._key(method, url)
+            recorded = self._load().get(key)
+            if not recorded:
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return recorded[min(index, len(recorded) - 1)]
+
+    def append(self, entry: dict) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(self.path, "ab") as fh:
+                fh.write(line.encode("utf-8"))
+            if self._entries is not None:
+                key = self._key(entry["method"], entry["url"])
+                self._entries.setdefault(key, []).append(entry)
+
+
+def _entry_from_response(
+    request: httpx.Request, response: httpx.Response, body: bytes, elapsed: float
+) -> dict:
+    return {
+        "method": request.method,
+        "url": str(request.url),
+        "status": response.status_code,
+        "headers": [[k, v] for k, v in response.headers.multi_items()],
+        "body": base64.b64encode(body).decode("ascii"),
+        "elapsed": round(elapsed, 4),
+        "recorded_at": int(time.time()),
+    }
+
+
+def _response_from_entry(entry: dict, request: httpx.Request) -> httpx.Response:
+    # Cuerpo en bruto: httpx lo descomprime según el Content-Encoding grabado
+    return httpx.Response(
+        entry["status"],
+        headers=[(k, v) for k, v in entry["headers"]],
+        stream=httpx.ByteStream(base64.b64decode(entry["body"])),
+        request=request,
+    )
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """Transporte de grabación/reproducción para benchmarks deterministas del scraper.
+
+    - record: reenvía al transporte real (`inner`) y guarda cada respuesta
+      (cada salto de redirección por separado) en el cassette.
+    - replay: sirve las respuestas grabadas sin red; una petición no grabada
+      falla como error de conexión. `latency_scale` reproduce el tiempo
+      grabado multiplicado por ese factor (0 = sin espera).
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        mode: str = "replay",
+        inner: httpx.AsyncBaseTransport | None = None,
+        latency_scale: float = 0.0,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode needs an inner transport")
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner
+        self.latency_scale = max(0.0, latency_scale)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.mode == "replay":
+            entry = self.cassette.lookup(request.method, str(request.url))
+            if entry is None:
+                raise httpx.ConnectError(
+                    f"No recorded response for {request.method} {request.url}", request=request
+                )
+            if self.latency_scale:
+                await asyncio.sleep(entry.get("elapsed", 0.0) * self.latency_scale)
+            return _response_from_entry(entry, request)
+
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        try:
+            body = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        elapsed = time.monotonic() - started
+        # Grabar en un hilo: gzip + disco no deben bloquear el event loop
+        await asyncio.to_thread(
+            self.cassette.append, _entry_from_response(request, response, body, elapsed)
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=httpx.ByteStream(body),
+            request=request,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+_cassettes: dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """Cassette compartido por ruta (el scraper crea un cliente httpx por fetch)."""
+    path = os.path.abspath(path)
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path)
+        return cassette
@@ -0,0 +1,144 @@
+import asyncio
+import socket
+import time
+from collections.abc import Awaitable, Callable
+
+from services.common.config import (
+    SCRAPER_DNS_CACHE_MAX_ENTRIES,
+    SCRAPER_DNS_CACHE_TTL,
+    SCRAPER_DNS_NEGATIVE_TTL,
+)
+from services.common.link_utils import is_private_ip
+
+Resolver = Callable[[str], Awaitable[list[str]]]
+
+
+class DNSResolutionError(Exception):
+    """El host no pudo resolverse a ninguna dirección."""
+
+
+class BlockedHostError(Exception):
+    """El host resuelve (al menos) a una dirección privada/loopback/reservada."""
+
+
+async def _system_resolve(host: str) -> list[str]:
+    """Resuelve `host` con el resolver del sistema sin bloquear el event loop."""
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    addresses: list[str] = []
+    for _family, _type, _proto, _canon, sockaddr in infos:
+        ip = str(sockaddr[0])
+        if ip not in addresses:
+            addresses.append(ip)
+    return addresses
+
+
+class DNSCache:
+    """Caché DNS asíncrona por host con TTL positivo/negativo.
+
+    - Coalesce resoluciones concurrentes del mismo host en una sola consulta.
+    - El resolver del sistema no expone el TTL real de los registros, por lo que
+      se aplica un TTL fijo (`SCRAPER_DNS_CACHE_TTL`) y otro corto para fallos.
+    - `resolve_vetted` comprueba TODAS las direcciones contra rangos privados,
+      de modo que un host con un único registro interno queda bloqueado.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver | None = None,
+        ttl: float = SCRAPER_DNS_CACHE_TTL,
+        negative_ttl: float = SCRAPER_DNS_NEGATIVE_TTL,
+        max_entries: int = SCRAPER_DNS_CACHE_MAX_ENTRIES,
+    ):
+        self._resolver = resolver or _system_resolve
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(1, max_entries)
+        # host -> (expires_at, addresses | None, error | None)
+        self._entries: dict[str, tuple[float, tuple[str, ...] | None, str | None]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _get_cached(self, host: str) -> tuple[tuple[str, ...] | None, str | None] | None:
+        entry = self._entries.get(host)
+        if entry is None:
+            return None
+        expires_at, addresses, error = entry
+        if time.monotonic() >= expires_at:
+            self._entries.pop(host, None)
+            return None
+        return addresses, error
+
+    def _store(self, host: str, addresses: tuple[str, ...] | None, error: str | None) -> None:
+        if len(self._entries) >= self.max_entries and host not in self._entries:
+            # Desalojar la entrada más antigua (orden de inserción)
+            try:
+                self._entries.pop(next(iter(self._entries)))
+            except StopIteration:
+                pass
+        ttl = self.ttl if addresses else self.negative_ttl
+        self._entries[host] = (time.monotonic() + ttl, addresses, error)
+
+    async def resolve(self, host: str) -> tuple[str, ...]:
+        """Devuelve las direcciones de `host`, usando caché y coalescencia."""
+        key = (host or "").strip().lower().rstrip(".")
+        if not key:
+            raise DNSResolutionError("Empty host")
+
+        cached = self._get_cached(key)
+        if cached is not None:
+            addresses, error = cached
+            if addresses:
+                return addresses
+            raise DNSResolutionError(error or f"Could not resolve host: {key}")
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Se canceló el líder, no nosotros: resolver de nuevo (como nuevo líder)
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.resolve(host)
+                raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            try:
+                resolved = tuple(await self._resolver(key))
+            except Exception as e:
+                resolved = ()
+                error = f"Could not resolve host {key}: {e}"
+            else:
+                error = None if resolved else f"Could not resolve host: {key}"
+            self._store(key, resolved or None, error)
+            if resolved:
+                fut.set_result(resolved)
+                return resolved
+            exc = DNSResolutionError(error)
+            fut.set_exception(exc)
+            # Evitar el aviso "exception was never retrieved" si nadie esperaba
+            fut.exception()
+            raise exc
+        finally:
+            self._inflight.pop(key, None)
+            if not fut.done():
+                # Líder cancelado (CancelledError no es Exception): liberar a los seguidores
+                fut.cancel()
+
+    async def resolve_vetted(self, host: str) -> str:
+        """Resuelve `host`, valida todas sus IPs y devuelve la IP a la que fijar la conexión."""
+        if is_private_ip(host):
+            raise BlockedHostError(f"Blocked private/loopback host: {host}")
+        addresses = await self.resolve(host)
+        for ip in addresses:
+            if is_private_ip(ip):
+                raise BlockedHostError(f"Blocked host {host}: resolves to private address {ip}")
+        return addresses[0]
+
+
+# Caché global del proceso (compartida entre crawls del mismo worker)
+dns_cache = DNSCache()
@@ -0,0 +1,101 @@
+import asyncio
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from config import settings
+
+
+@dataclass(frozen=True)
+class FetchFlow:
+    """Identifica a quién pertenece un fetch: usuario y petición (brochure) concretos."""
+
+    user_id: str = "anonymous"
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+class FairFetchScheduler:
+    """Presupuesto global de fetches salientes del proceso con reparto equitativo.
+
+    - Limita el total de peticiones en vuelo del worker (`max_in_flight`).
+    - Cuando hay cola, los huecos se reparten round-robin primero entre usuarios y,
+      dentro de cada usuario, entre sus peticiones; así un crawl enorme no acapara
+      el presupuesto y cada brochure avanza a un ritmo parecido.
+    """
+
+    def __init__(self, max_in_flight: int | None = None):
+        self.max_in_flight = max(1, int(max_in_flight or settings.scraper_max_in_flight))
+        self._in_flight = 0
+        # user_id -> request_id -> cola FIFO de waiters
+        self._queues: OrderedDict[str, OrderedDict[str, deque]] = OrderedDict()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def snapshot(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "waiting": sum(len(q) for reqs in self._queues.values() for q in reqs.values()),
+            "waiting_users": len(self._queues),
+        }
+
+    async def acquire(self, flow: FetchFlow, timeout: float | None = None) -> None:
+        """Espera un hueco global. Lanza `TimeoutError` si se agota `timeout`."""
+        if self._in_flight < self.max_in_flight and not self._queues:
+            self._in_flight += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        requests = self._queues.setdefault(flow.user_id, OrderedDict())
+        requests.setdefault(flow.request_id, deque()).append(fut)
+        # Puede haber huecos libres si la cola solo contenía waiters ya cancelados
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=timeout)
+        except BaseException:
+            if fut.done() and not fut.cancelled():
+                # El hueco llegó a concederse justo al expirar: devolverlo
+                self.release()
+            else:
+                fut.cancel()
+            raise
+
+    def release(self) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_in_flight and self._queues:
+            user_id, requests = next(iter(self._queues.items()))
+            request_id, waiters = next(iter(requests.items()))
+            fut = waiters.popleft()
+
+            # Rotar: el siguiente hueco será para otra petición y otro usuario
+            if waiters:
+                requests.move_to_end(request_id)
+            else:
+                del requests[request_id]
+            if requests:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+
+            if fut.done():
+                continue
+            self._in_flight += 1
+            fut.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, flow: FetchFlow, timeout: float | None = None):
+        await self.acquire(flow, timeout=timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+# Planificador global del proceso
+fetch_scheduler = FairFetchScheduler()
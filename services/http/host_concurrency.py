@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+from services.common.config import (
+    SCRAPER_HOST_CONCURRENCY_INITIAL,
+    SCRAPER_HOST_CONCURRENCY_MAX,
+    SCRAPER_HOST_CONCURRENCY_MIN,
+    SCRAPER_HOST_STATE_MAX_ENTRIES,
+    SCRAPER_LATENCY_SPIKE_FACTOR,
+    SCRAPER_RETRY_AFTER_MAX,
+)
+
+# Respuestas que indican que el host pide menos carga
+BACKOFF_STATUS_CODES = {429, 503}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Convierte un header Retry-After (segundos o fecha HTTP) en segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+@dataclass
+class _HostWindow:
+    window: float
+    in_flight: int = 0
+    blocked_until: float = 0.0
+    latency_ewma: float | None = None
+    last_decrease: float = 0.0
+    waiters: deque = field(default_factory=deque)
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self.window))
+
+
+class HostConcurrencyController:
+    """Control de concurrencia adaptativo (AIMD) por host.
+
+    - Incremento aditivo: cada respuesta sana suma `1/window`, es decir, ~+1 por cada
+      ventana completa de peticiones correctas.
+    - Decremento multiplicativo: 429/503, timeouts o un pico de latencia (respecto a la
+      media móvil) reducen la ventana a la mitad, como mucho una vez por RTT.
+    - `Retry-After` bloquea nuevas peticiones al host hasta la fecha indicada
+      (acotado por `SCRAPER_RETRY_AFTER_MAX`).
+    """
+
+    def __init__(
+        self,
+        initial: int = SCRAPER_HOST_CONCURRENCY_INITIAL,
+        minimum: int = SCRAPER_HOST_CONCURRENCY_MIN,
+        maximum: int = SCRAPER_HOST_CONCURRENCY_MAX,
+        spike_factor: float = SCRAPER_LATENCY_SPIKE_FACTOR,
+        retry_after_max: float = SCRAPER_RETRY_AFTER_MAX,
+        max_hosts: int = SCRAPER_HOST_STATE_MAX_ENTRIES,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.initial = min(self.maximum, max(self.minimum, initial))
+        self.spike_factor = spike_factor
+        self.retry_after_max = retry_after_max
+        self.max_hosts = max(1, max_hosts)
+        # LRU: el host más reciente al final
+        self._hosts: OrderedDict[str, _HostWindow] = OrderedDict()
+
+    def _state(self, host: str) -> _HostWindow:
+        key = (host or "").lower()
+        state = self._hosts.get(key)
+        if state is None:
+            self._evict_idle()
+            state = self._hosts[key] = _HostWindow(window=float(self.initial))
+        else:
+            self._hosts.move_to_end(key)
+        return state
+
+    def _evict_idle(self) -> None:
+        # Olvidar los hosts menos recientes sin peticiones en vuelo, sin waiters y sin
+        # Retry-After activo; los activos no se desalojan aunque se supere el límite
+        now = time.monotonic()
+        for key in list(self._hosts):
+            if len(self._hosts) < self.max_hosts:
+                return
+            state = self._hosts[key]
+            if not state.in_flight and not state.waiters and state.blocked_until <= now:
+                del self._hosts[key]
+
+    def window(self, host: str) -> float:
+        """Ventana actual (peticiones simultáneas permitidas) para `host`."""
+        return self._state(host).window
+
+    def snapshot(self) -> dict[str, dict]:
+        """Estado de todas las ventanas por host (para logs y métricas)."""
+        now = time.monotonic()
+        return {
+            host: {
+                "window": round(state.window, 2),
+                "limit": state.limit,
+                "in_flight": state.in_flight,
+                "waiting": len(state.waiters),
+                "latency_ms": (
+                    round(state.latency_ewma * 1000) if state.latency_ewma is not None else None
+                ),
+                "blocked_for": round(max(0.0, state.blocked_until - now), 2),
+            }
+            for host, state in self._hosts.items()
+        }
+
+    async def acquire(self, host: str, timeout: float | None = None) -> None:
+        """Espera un hueco en la ventana del host. Lanza `TimeoutError` si se agota `timeout`."""
+        state = self._state(host)
+        loop = asyncio.get_running_loop()
+        give_up_at = None if timeout is None else loop.time() + timeout
+
+        while True:
+            remaining = None if give_up_at is None else give_up_at - loop.time()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for a connection slot to {host}")
+
+            blocked_for = state.blocked_until - time.monotonic()
+            if blocked_for > 0:
+                # Retry-After activo: esperar sin ocupar hueco
+                if remaining is not None and blocked_for > remaining:
+                    await asyncio.sleep(remaining)
+                    continue
+                await asyncio.sleep(blocked_for)
+                continue
+
+            if state.in_flight < state.limit:
+                state.in_flight += 1
+                return
+
+            fut = loop.create_future()
+            state.waiters.append(fut)
+            try:
+                await asyncio.wait_for(asyncio.shield(fut), timeout=remaining)
+            except BaseException as e:
+                if fut.done() and not fut.cancelled():
+                    # El hueco llegó a concederse justo al expirar/cancelar: devolverlo
+                    self.release(host)
+                else:
+                    fut.cancel()
+                if isinstance(e, TimeoutError):
+                    continue
+                raise
+            finally:
+                try:
+                    state.waiters.remove(fut)
+                except ValueError:
+                    pass
+            # `_wake` ya nos ha asignado el hueco; si entretanto llegó un Retry-After,
+            # esperar a que venza sin soltarlo
+            blocked_for = state.blocked_until - time.monotonic()
+            if blocked_for > 0:
+                try:
+                    await asyncio.sleep(blocked_for)
+                except BaseException:
+                    self.release(host)
+                    raise
+            return
+
+    def release(self, host: str) -> None:
+        state = self._state(host)
+        state.in_flight = max(0, state.in_flight - 1)
+        self._wake(state)
+
+    def _wake(self, state: _HostWindow) -> None:
+        # Entrega el hueco al waiter (como FairFetchScheduler): si luego se cancela,
+        # el propio waiter lo devuelve y no queda un hueco libre sin despachar
+        while state.waiters and state.in_flight < state.limit:
+            fut = state.waiters.popleft()
+            if fut.done():
+                continue
+            state.in_flight += 1
+            fut.set_result(None)
+
+    def _decrease(self, state: _HostWindow, now: float) -> None:
+        # Como mucho un decremento por RTT para que varios fallos simultáneos no colapsen la ventana
+        rtt = state.latency_ewma if state.latency_ewma is not None else 1.0
+        if now - state.last_decrease < rtt:
+            return
+        state.window = max(float(self.minimum), state.window / 2)
+        state.last_decrease = now
+
+    def record_response(
+        self,
+        host: str,
+        status_code: int,
+        latency: float,
+        retry_after: str | None = None,
+    ) -> None:
+        """Ajusta la ventana del host según el código y la latencia de una respuesta."""
+        state = self._state(host)
+        now = time.monotonic()
+
+        if status_code in BACKOFF_STATUS_CODES:
+            self._decrease(state, now)
+            wait = parse_retry_after(retry_after)
+            if wait:
+                state.blocked_until = max(
+                    state.blocked_until, now + min(wait, self.retry_after_max)
+                )
+            return
+
+        spike = state.latency_ewma is not None and latency > state.latency_ewma * self.spike_factor
+        state.latency_ewma = (
+            latency if state.latency_ewma is None else 0.8 * state.latency_ewma + 0.2 * latency
+        )
+        if spike or status_code >= 500:
+            self._decrease(state, now)
+        else:
+            state.window = min(float(self.maximum), state.window + 1.0 / state.window)
+            self._wake(state)
+
+    def record_error(self, host: str) -> None:
+        """Timeout o error de conexión: tratar como señal de congestión."""
+        self._decrease(self._state(host), time.monotonic())
+
+
+# Controlador global del proceso: compartido por todos los crawls del worker
+host_concurrency = HostConcurrencyController()
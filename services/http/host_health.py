@@ -0,0 +1,160 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from services.common.config import (
+    SCRAPER_HOST_FAILURE_THRESHOLD,
+    SCRAPER_HOST_FAILURE_WINDOW,
+    SCRAPER_HOST_OPEN_SECONDS,
+    SCRAPER_HOST_STATE_MAX_ENTRIES,
+    SCRAPER_HOST_SYNC_INTERVAL,
+)
+from services.logging.dev_logger import get_logger
+from services.redis.redis_client import redis_client
+
+logger = get_logger(__name__)
+
+# Códigos HTTP que indican que el host (no la página) tiene problemas
+HOST_FAILURE_STATUS_CODES = {408, 429}
+
+
+class HostUnavailableError(Exception):
+    """El circuito del host está abierto: se evita la petición."""
+
+
+def is_host_failure_status(status_code: int) -> bool:
+    """5xx y 408/429 cuentan como fallo del host; otros 4xx son problemas de la página."""
+    return status_code >= 500 or status_code in HOST_FAILURE_STATUS_CODES
+
+
+@dataclass
+class _HostState:
+    failures: list[float] = field(default_factory=list)
+    open_until: float = 0.0
+    synced_at: float = 0.0
+
+
+class HostHealth:
+    """Circuit breaker por host respaldado en Redis con espejo en memoria.
+
+    - Redis comparte el estado entre workers y entre peticiones de distintos usuarios:
+      `scraper:host:fail:{host}` (contador con TTL de ventana) y
+      `scraper:host:open:{host}` (timestamp de reapertura con TTL).
+    - El espejo local evita un round-trip a Redis en cada fetch: solo se sincroniza
+      cada `sync_interval` segundos por host.
+    - Si Redis falla, el breaker sigue funcionando solo en memoria (fail-open).
+    """
+
+    def __init__(
+        self,
+        client=None,
+        failure_threshold: int = SCRAPER_HOST_FAILURE_THRESHOLD,
+        failure_window: int = SCRAPER_HOST_FAILURE_WINDOW,
+        open_seconds: int = SCRAPER_HOST_OPEN_SECONDS,
+        sync_interval: float = SCRAPER_HOST_SYNC_INTERVAL,
+        max_hosts: int = SCRAPER_HOST_STATE_MAX_ENTRIES,
+    ):
+        self._redis = client if client is not None else redis_client
+        self.failure_threshold = max(1, failure_threshold)
+        self.failure_window = max(1, failure_window)
+        self.open_seconds = max(1, open_seconds)
+        self.sync_interval = sync_interval
+        self.max_hosts = max(1, max_hosts)
+        # LRU: el host más reciente al final
+        self._hosts: OrderedDict[str, _HostState] = OrderedDict()
+
+    @staticmethod
+    def _key(host: str) -> str:
+        return (host or "").lower()
+
+    def _state(self, host: str) -> _HostState:
+        key = self._key(host)
+        state = self._hosts.get(key)
+        if state is None:
+            self._evict_idle(time.time())
+            state = self._hosts[key] = _HostState()
+        else:
+            self._hosts.move_to_end(key)
+        return state
+
+    def _evict_idle(self, now: float) -> None:
+        # Olvidar los hosts menos recientes con el circuito cerrado y sin fallos en la
+        # ventana (su estado es el de un host nuevo); los activos no se desalojan
+        for key in list(self._hosts):
+            if len(self._hosts) < self.max_hosts:
+                return
+            state = self._hosts[key]
+            if state.open_until <= now and not any(
+                now - t < self.failure_window for t in state.failures
+            ):
+                del self._hosts[key]
+
+    def _sync_from_redis(self, host: str, state: _HostState, now: float) -> None:
+        if now - state.synced_at < self.sync_interval:
+            return
+        state.synced_at = now
+        try:
+            value = self._redis.get(f"scraper:host:open:{self._key(host)}")
+            if value:
+                state.open_until = max(state.open_until, float(value))
+        except Exception:
+            pass
+
+    def is_open(self, host: str) -> bool:
+        now = time.time()
+        state = self._state(host)
+        if state.open_until > now:
+            return True
+        self._sync_from_redis(host, state, now)
+        return state.open_until > now
+
+    def check(self, host: str) -> None:
+        """Lanza `HostUnavailableError` si el host está marcado como caído."""
+        if self.is_open(host):
+            raise HostUnavailableError(f"Host temporarily unavailable (circuit open): {host}")
+
+    def record_success(self, host: str) -> None:
+        state = self._state(host)
+        had_failures = bool(state.failures)
+        state.failures.clear()
+        state.open_until = 0.0
+        if had_failures:
+            try:
+                self._redis.delete(f"scraper:host:fail:{self._key(host)}")
+            except Exception:
+                pass
+
+    def record_failure(self, host: str) -> None:
+        now = time.time()
+        key = self._key(host)
+        state = self._state(host)
+        state.failures = [t for t in state.failures if now - t < self.failure_window]
+        state.failures.append(now)
+        count = len(state.failures)
+
+        try:
+            pipe = self._redis.pipeline()
+            pipe.incr(f"scraper:host:fail:{key}")
+            pipe.expire(f"scraper:host:fail:{key}", self.failure_window, nx=True)
+            shared_count = int(pipe.execute()[0] or 0)
+            count = max(count, shared_count)
+        except Exception:
+            pass
+
+        if count >= self.failure_threshold:
+            open_until = now + self.open_seconds
+            state.open_until = open_until
+            try:
+                self._redis.set(f"scraper:host:open:{key}", open_until, ex=self.open_seconds)
+            except Exception:
+                pass
+            logger.warning(
+                "[Scraper] Circuit opened for %s after %d failures (%ds)",
+                key,
+                count,
+                self.open_seconds,
+            )
+
+
+# Instancia global del proceso
+host_health = HostHealth()
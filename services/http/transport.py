@@ -0,0 +1,92 @@
+import ipaddress
+from collections.abc import Callable
+
+import httpx
+
+from services.common.config import (
+    SCRAPER_CASSETTE_LATENCY,
+    SCRAPER_CASSETTE_MODE,
+    SCRAPER_CASSETTE_PATH,
+)
+from services.common.link_utils import is_private_ip
+from services.http.cassette import CassetteTransport, get_cassette
+from services.http.dns_cache import BlockedHostError, DNSCache, DNSResolutionError, dns_cache
+
+
+def _is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class PinnedDNSTransport(httpx.AsyncHTTPTransport):
+    """Transporte httpx que resuelve cada host vía `DNSCache` y fija la conexión a la IP validada.
+
+    La petición se envía a la IP ya verificada conservando el header Host original, y el
+    SNI/verificación TLS usan el hostname. Así httpx no vuelve a resolver y un segundo
+    lookup no puede devolver una IP interna (DNS rebinding). Cada salto de redirección
+    pasa también por aquí, por lo que también se valida.
+    """
+
+    def __init__(self, cache: DNSCache | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self._cache = cache or dns_cache
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if _is_ip_literal(host):
+            if is_private_ip(host):
+                raise httpx.ConnectError(f"Blocked private/loopback host: {host}", request=request)
+            return await super().handle_async_request(request)
+
+        try:
+            ip = await self._cache.resolve_vetted(host)
+        except (BlockedHostError, DNSResolutionError) as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+
+        extensions = dict(request.extensions)
+        if request.url.scheme == "https":
+            extensions["sni_hostname"] = host
+        # No mutar la petición original: httpx la usa para resolver redirecciones relativas
+        pinned = httpx.Request(
+            request.method,
+            request.url.copy_with(host=ip),
+            headers=request.headers,
+            stream=request.stream,
+            extensions=extensions,
+        )
+        return await super().handle_async_request(pinned)
+
+
+_transport_override: Callable[[], httpx.AsyncBaseTransport] | None = None
+
+
+def set_transport_override(
+    factory: Callable[[], httpx.AsyncBaseTransport] | None,
+) -> None:
+    """Sustituye el transporte del scraper (benchmarks, sitios stub); `None` lo restaura."""
+    global _transport_override
+    _transport_override = factory
+
+
+def build_transport() -> httpx.AsyncBaseTransport:
+    """Construye el transporte del scraper.
+
+    Prioridad: override explícito, cassette de grabación/reproducción
+    (`SCRAPER_CASSETTE_MODE`) y, por defecto, `PinnedDNSTransport`.
+    """
+    if _transport_override is not None:
+        return _transport_override()
+    if SCRAPER_CASSETTE_MODE == "replay":
+        return CassetteTransport(
+            get_cassette(SCRAPER_CASSETTE_PATH),
+            mode="replay",
+            latency_scale=SCRAPER_CASSETTE_LATENCY,
+        )
+    if SCRAPER_CASSETTE_MODE == "record":
+        return CassetteTransport(
+            get_cassette(SCRAPER_CASSETTE_PATH), mode="record", inner=PinnedDNSTransport()
+        )
+    return PinnedDNSTransport()
@@ -0,0 +1,126 @@
+"""Muestreo de claves Redis para ver la distribución de tamaños por namespace de caché.
+
+Recorre el keyspace con SCAN (sin bloquear Redis), clasifica cada clave por
+namespace y mide su longitud (`STRLEN`), memoria real (`MEMORY USAGE`), TTL y si
+está comprimida. Sirve para ajustar `CACHE_COMPRESS_MIN_BYTES`: muestra qué
+fracción de valores supera el umbral y cuánto ocupan.
+
+Uso:
+    python -m services.observability.cache_report [--sample 2000] [--json]
+"""
+
+import argparse
+import json
+import re
+
+from config import settings
+from services.redis.redis_client import redis_client
+
+# Namespaces conocidos; las claves de brochure por usuario son un sha256 sin prefijo
+_NAMESPACES = (
+    ("brochure_shared", re.compile(r"^brochure:content:")),
+    ("details_negative", re.compile(r"^company:details:.*:neg$")),
+    ("details_refresh_lock", re.compile(r"^company:details:.*:refresh$")),
+    ("details", re.compile(r"^company:details:")),
+    ("sitemap", re.compile(r"^scraper:sitemap:")),
+    ("host_health", re.compile(r"^scraper:host:")),
+    ("ratelimit", re.compile(r"^ratelimit:")),
+    ("brochure", re.compile(r"^[0-9a-f]{64}$")),
+)
+
+
+def classify_key(key: str) -> str:
+    for name, pattern in _NAMESPACES:
+        if pattern.search(key):
+            return name
+    return "other"
+
+
+def _percentile(values: list[int], q: float) -> int:
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def sample_keys(client=None, sample: int = 2000, scan_count: int = 500) -> dict[str, dict]:
+    """Muestrea hasta `sample` claves y resume tamaños por namespace."""
+    client = client or redis_client
+    threshold = int(settings.cache_compress_min_bytes or 0)
+    raw: dict[str, dict[str, list]] = {}
+    seen = 0
+    for key in client.scan_iter(count=scan_count):
+        if seen >= sample:
+            break
+        seen += 1
+        namespace = classify_key(key)
+        pipe = client.pipeline(transaction=False)
+        pipe.type(key)
+        pipe.strlen(key)
+        pipe.ttl(key)
+        pipe.getrange(key, 0, 8)
+        pipe.memory_usage(key)
+        try:
+            key_type, length, ttl, head, memory = pipe.execute()
+        except Exception:
+            continue
+        if key_type != "string":
+            length, head = 0, ""
+        bucket = raw.setdefault(
+            namespace, {"sizes": [], "memory": [], "ttls": [], "compressed": []}
+        )
+        bucket["sizes"].append(int(length or 0))
+        bucket["memory"].append(int(memory or 0))
+        bucket["ttls"].append(int(ttl))
+        bucket["compressed"].append(bool(head and head.startswith("cmp:")))
+
+    report: dict[str, dict] = {}
+    for namespace, bucket in sorted(raw.items()):
+        sizes = bucket["sizes"]
+        count = len(sizes)
+        report[namespace] = {
+            "keys": count,
+            "bytes_total": sum(sizes),
+            "memory_total": sum(bucket["memory"]),
+            "bytes_p50": _percentile(sizes, 0.5),
+            "bytes_p90": _percentile(sizes, 0.9),
+            "bytes_p99": _percentile(sizes, 0.99),
+            "bytes_max": max(sizes) if sizes else 0,
+            "compressed_fraction": round(sum(bucket["compressed"]) / count, 3),
+            "over_threshold_fraction": round(sum(s >= threshold for s in sizes) / count, 3),
+            "no_ttl": sum(t == -1 for t in bucket["ttls"]),
+        }
+    return report
+
+
+def _print_table(report: dict[str, dict]) -> None:
+    print(f"compress={settings.cache_compress} threshold={settings.cache_compress_min_bytes} bytes")
+    header = (
+        f"{'namespace':<22}{'keys':>7}{'p50':>9}{'p90':>9}{'p99':>9}"
+        f"{'max':>10}{'mem MB':>9}{'cmp%':>7}{'>thr%':>7}{'noTTL':>7}"
+    )
+    print(header)
+    for namespace, row in report.items():
+        print(
+            f"{namespace:<22}{row['keys']:>7}{row['bytes_p50']:>9}{row['bytes_p90']:>9}"
+            f"{row['bytes_p99']:>9}{row['bytes_max']:>10}"
+            f"{row['memory_total'] / 1_048_576:>9.2f}"
+            f"{row['compressed_fraction'] * 100:>7.0f}"
+            f"{row['over_threshold_fraction'] * 100:>7.0f}{row['no_ttl']:>7}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sample", type=int, default=2000, help="máximo de claves a muestrear")
+    parser.add_argument("--json", action="store_true", help="salida JSON")
+    args = parser.parse_args()
+    report = sample_keys(sample=args.sample)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_table(report)
+
+
+if __name__ == "__main__":
+    main()
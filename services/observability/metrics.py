@@ -0,0 +1,252 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from config import settings
+
+# Métricas Prometheus de la API. Con varios workers de uvicorn, definir
+# PROMETHEUS_MULTIPROC_DIR (directorio vacío y compartido) ANTES de arrancar: cada
+# proceso escribe sus valores en ficheros mmap y /metrics los agrega.
+# Todas las funciones son no-op si METRICS_ENABLED=false.
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+
+# Desde milisegundos (parseo, caché) hasta minutos (LLM)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+REDIS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+# Tamaño de payloads de caché: de 256 B a 4 MB
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(8))
+CODEC_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+STAGE_SECONDS = Histogram(
+    "brochures_stage_seconds",
+    "Duration of each pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "brochures_http_request_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "brochures_cache_requests_total",
+    "Cache lookups by cache and result (hit, miss, error)",
+    ["cache", "result"],
+)
+CACHE_REFRESHES = Counter(
+    "brochures_cache_refresh_total",
+    "Entries served while triggering a background refresh",
+    ["cache", "reason"],
+)
+CACHE_PAYLOAD_BYTES = Histogram(
+    "brochures_cache_payload_bytes",
+    "Cache payload size written: serialized JSON vs stored (after compression)",
+    ["cache", "form"],
+    buckets=SIZE_BUCKETS,
+)
+CACHE_CODEC_SECONDS = Histogram(
+    "brochures_cache_codec_seconds",
+    "Time spent encoding/decoding cache payloads",
+    ["cache", "op"],
+    buckets=CODEC_BUCKETS,
+)
+LLM_REQUESTS = Counter(
+    "brochures_llm_requests_total",
+    "LLM calls by model and outcome",
+    ["model", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "brochures_llm_tokens_total",
+    "LLM tokens by model and kind (prompt, completion)",
+    ["model", "kind"],
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "brochures_redis_command_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=REDIS_BUCKETS,
+)
+REDIS_ERRORS = Counter(
+    "brochures_redis_errors_total",
+    "Failed Redis commands (fail-open paths)",
+    ["command"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "brochures_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter",
+    ["path"],
+)
+ANALYTICS_ROWS = Counter(
+    "brochures_analytics_rows_total",
+    "Analytics rows through the write-behind sink",
+    ["outcome"],  # queued | written | dropped | failed
+)
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, "metrics_enabled", True))
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    if _enabled():
+        STAGE_SECONDS.labels(stage).observe(max(0.0, seconds))
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Mide el bloque (también si lanza) como `stage` en brochures_stage_seconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    if _enabled():
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_cache_error(cache: str) -> None:
+    """Fallo de Redis o payload corrupto (la caché se trata como miss, fail-open)."""
+    if _enabled():
+        CACHE_REQUESTS.labels(cache, "error").inc()
+
+
+def record_cache_refresh(cache: str, reason: str) -> None:
+    if _enabled():
+        CACHE_REFRESHES.labels(cache, reason).inc()
+
+
+def observe_cache_payload(cache: str, serialized_bytes: int, stored_bytes: int) -> None:
+    if not _enabled():
+        return
+    CACHE_PAYLOAD_BYTES.labels(cache, "serialized").observe(serialized_bytes)
+    CACHE_PAYLOAD_BYTES.labels(cache, "stored").observe(stored_bytes)
+
+
+def observe_cache_codec(cache: str, op: str, seconds: float) -> None:
+    if _enabled():
+        CACHE_CODEC_SECONDS.labels(cache, op).observe(seconds)
+
+
+def record_llm_call(
+    model: str,
+    outcome: str,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+) -> None:
+    if not _enabled():
+        return
+    LLM_REQUESTS.labels(model, outcome).inc()
+    if prompt_tokens:
+        LLM_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(model, "completion").inc(completion_tokens)
+
+
+def observe_redis(command: str, seconds: float, error: bool = False) -> None:
+    if not _enabled():
+        return
+    REDIS_COMMAND_SECONDS.labels(command).observe(seconds)
+    if error:
+        REDIS_ERRORS.labels(command).inc()
+
+
+def record_rate_limited(path: str) -> None:
+    if _enabled():
+        RATE_LIMIT_REJECTIONS.labels(path).inc()
+
+
+def record_analytics(outcome: str, rows: int = 1) -> None:
+    if _enabled():
+        ANALYTICS_ROWS.labels(outcome).inc(rows)
+
+
+def observe_http(method: str, route: str, status: int, seconds: float) -> None:
+    if _enabled():
+        HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+
+
+def _registry():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Exposición en formato texto; en multiproceso agrega los ficheros de todos los workers."""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def cache_stats() -> dict[str, dict]:
+    """Resumen por namespace de caché (todos los workers en modo multiproceso).
+
+    Aciertos/fallos/errores y ratio de acierto, tamaño medio serializado y
+    almacenado (ratio de compresión) y tiempo medio de codificación por operación.
+    """
+    stats: dict[str, dict] = {}
+
+    def entry(cache: str) -> dict:
+        return stats.setdefault(
+            cache,
+            {"hit": 0, "miss": 0, "error": 0, "refresh": {}, "bytes": {}, "codec_ms": {}},
+        )
+
+    sums: dict[tuple, float] = {}
+    for family in _registry().collect():
+        for sample in family.samples:
+            labels = sample.labels
+            if sample.name == "brochures_cache_requests_total":
+                entry(labels["cache"])[labels["result"]] += int(sample.value)
+            elif sample.name == "brochures_cache_refresh_total":
+                entry(labels["cache"])["refresh"][labels["reason"]] = int(sample.value)
+            elif sample.name.endswith(("_sum", "_count")) and sample.name.startswith(
+                ("brochures_cache_payload_bytes", "brochures_cache_codec_seconds")
+            ):
+                kind = "bytes" if "payload" in sample.name else "codec_ms"
+                key = (labels["cache"], kind, labels.get("form") or labels.get("op"))
+                suffix = "sum" if sample.name.endswith("_sum") else "count"
+                sums[key + (suffix,)] = sample.value
+
+    for (cache, kind, label, suffix), value in sums.items():
+        if suffix != "sum":
+            continue
+        count = sums.get((cache, kind, label, "count"), 0)
+        if not count:
+            continue
+        scale = 1000 if kind == "codec_ms" else 1
+        entry(cache)[kind][label] = {"avg": round(value / count * scale, 3), "count": int(count)}
+
+    for values in stats.values():
+        lookups = values["hit"] + values["miss"]
+        values["hit_ratio"] = round(values["hit"] / lookups, 4) if lookups else None
+        sizes = values["bytes"]
+        if sizes.get("serialized", {}).get("avg") and "stored" in sizes:
+            values["compression_ratio"] = round(
+                sizes["stored"]["avg"] / sizes["serialized"]["avg"], 4
+            )
+    return stats
+
+
+def mark_worker_dead() -> None:
+    """Al parar un worker, limpia sus ficheros de gauges en modo multiproceso."""
+    if MULTIPROC_DIR:
+        try:
+            multiprocess.mark_process_dead(os.getpid())
+        except Exception:
+            pass
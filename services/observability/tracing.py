@@ -0,0 +1,149 @@
+import functools
+import inspect
+from contextlib import contextmanager
+
+from config import settings
+from services.logging.dev_logger import get_logger
+
+# Trazas OpenTelemetry del pipeline (scrape, LLM, caché, SQLite y PDF).
+# Desactivado por defecto: sin TRACING_ENABLED todas las utilidades son no-op y no
+# se importa el SDK. Con muestreo por ratio (ParentBased) el coste de las peticiones
+# no muestreadas se reduce a crear spans no grabados.
+
+logger = get_logger(__name__)
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:  # pragma: no cover - dependencia opcional
+    trace = None
+
+_tracer = None
+_provider = None
+
+
+def configure_tracing(exporter=None) -> bool:
+    """Inicializa el TracerProvider con exportador OTLP/HTTP y muestreo por ratio.
+
+    `exporter` permite inyectar otro exportador (p. ej. en memoria en tests).
+    Devuelve True si el tracing quedó activo.
+    """
+    global _tracer, _provider
+    if not settings.tracing_enabled or trace is None:
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+        ratio = min(1.0, max(0.0, float(settings.tracing_sample_ratio)))
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": settings.otel_service_name}),
+            sampler=ParentBased(TraceIdRatioBased(ratio)),
+        )
+        if exporter is not None:
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+        else:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            endpoint = settings.otel_exporter_otlp_endpoint.rstrip("/") + "/v1/traces"
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+        _provider = provider
+        _tracer = provider.get_tracer("brochuresai")
+        logger.info("[Tracing] OTLP tracing enabled (sample ratio %.3f)", ratio)
+        return True
+    except Exception as e:
+        logger.warning("[Tracing] Could not configure tracing: %s", e)
+        _tracer = None
+        return False
+
+
+def shutdown_tracing() -> None:
+    """Vacía los spans pendientes del BatchSpanProcessor al parar el worker."""
+    global _tracer, _provider
+    if _provider is not None:
+        try:
+            _provider.shutdown()
+        except Exception:
+            pass
+    _tracer = None
+    _provider = None
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def span(name: str, attributes: dict | None = None):
+    """Span hijo del contexto actual; con tracing desactivado no hace nada y cede None."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name) as current:
+        if attributes:
+            set_attributes(current, attributes)
+        yield current
+
+
+def set_attributes(current, attributes: dict) -> None:
+    """Añade atributos a un span de `span()` (ignora None y spans no muestreados)."""
+    if current is None or not current.is_recording():
+        return
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def traced(name: str):
+    """Decorador: envuelve una función (síncrona o async) en un span `name`."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def trace_request(request, call_next):
+    """Middleware HTTP: span de servidor con el contexto W3C (`traceparent`) entrante.
+
+    Se registra como el middleware más externo para que el rate limiting, las
+    métricas y la ruta queden dentro de la misma traza.
+    """
+    if _tracer is None:
+        return await call_next(request)
+    context = propagate.extract(dict(request.headers))
+    with _tracer.start_as_current_span(
+        f"{request.method} {request.url.path}", context=context, kind=SpanKind.SERVER
+    ) as current:
+        try:
+            response = await call_next(request)
+        except Exception as e:
+            current.record_exception(e)
+            current.set_status(Status(StatusCode.ERROR))
+            raise
+        if current.is_recording():
+            route = request.scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                current.update_name(f"{request.method} {route.path}")
+                current.set_attribute("http.route", route.path)
+            current.set_attribute("http.request.method", request.method)
+            current.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                current.set_status(Status(StatusCode.ERROR))
+        return response
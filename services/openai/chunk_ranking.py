@@ -0,0 +1,151 @@
+import re
+from itertools import chain
+
+import numpy as np
+
+from services.common.config import DETAILS_CHUNK_CHARS
+
+# Palabras de 2+ caracteres
+_TOKEN_RE = re.compile(r"\w\w+", re.UNICODE)
+
+# Vocabulario de un perfil de empresa (en/es/pt/fr/de/it) para la consulta TF-IDF
+PROFILE_QUERY_TERMS = (
+    # about / historia
+    "about us company mission vision values history founded founder founders since story "
+    "who we are team leadership ceo people headquarters offices employees "
+    "nosotros empresa misión visión valores historia fundada fundador equipo sede oficinas "
+    "sobre empresa missão equipe entreprise équipe histoire unternehmen über uns azienda chi siamo "
+    # services / products
+    "services service products product solutions solution platform offer offering industries "
+    "clients customers partners case studies portfolio projects expertise "
+    "servicios productos soluciones clientes proyectos serviços produtos soluções "
+    "prestations produits clients dienstleistungen produkte lösungen kunden servizi prodotti "
+    # contact
+    "contact email phone address location locations reach call "
+    "contacto teléfono dirección correo contato endereço adresse téléphone kontakt adresse "
+    "telefon contatti indirizzo"
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def chunk_text(text: str, max_chars: int = DETAILS_CHUNK_CHARS) -> list[str]:
+    """Divide un texto en trozos de hasta `max_chars`, respetando saltos de línea."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        while len(line) > max_chars:
+            # Línea enorme (texto sin saltos): cortar en bloques
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if size + len(line) + 1 > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def build_profile_query(company_name: str | None = None) -> str:
+    """Consulta del perfil de empresa: nombre (con más peso) + vocabulario común."""
+    name = (company_name or "").strip()
+    return f"{name} {name} {name} {PROFILE_QUERY_TERMS}" if name else PROFILE_QUERY_TERMS
+
+
+def score_chunks(chunks: list[str], query: str) -> np.ndarray:
+    """Puntúa cada trozo por similitud coseno TF-IDF con `query`, vectorizado con NumPy.
+
+    Se construye una matriz dispersa en formato coordenado (fila, término, cuenta) con
+    `np.unique`, y se calcula el producto con la consulta con `np.bincount`, sin bucles
+    Python por término.
+    """
+    n = len(chunks)
+    if n == 0:
+        return np.zeros(0)
+
+    tokens = [tokenize(chunk) for chunk in chunks]
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=n)
+    if not lengths.any():
+        return np.zeros(n)
+    flat = list(chain.from_iterable(tokens))
+    vocab = {tok: i for i, tok in enumerate(dict.fromkeys(flat))}
+    cols = np.fromiter(map(vocab.__getitem__, flat), dtype=np.int64, count=len(flat))
+    rows = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+    v = len(vocab)
+    keys = rows * v + cols
+    uniq, counts = np.unique(keys, return_counts=True)
+    r = uniq // v
+    c = uniq % v
+
+    # TF sublineal e IDF suavizado
+    df = np.bincount(c, minlength=v)
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    w = (1.0 + np.log(counts)) * idf[c]
+    norms = np.sqrt(np.bincount(r, weights=w * w, minlength=n))
+    w = w / np.maximum(norms[r], 1e-12)
+
+    q = np.zeros(v)
+    q_ids = [vocab[t] for t in tokenize(query) if t in vocab]
+    if not q_ids:
+        return np.zeros(n)
+    np.add.at(q, np.asarray(q_ids), 1.0)
+    q = (1.0 + np.log(np.maximum(q, 1.0))) * (q > 0) * idf
+    q /= max(float(np.linalg.norm(q)), 1e-12)
+
+    return np.bincount(r, weights=w * q[c], minlength=n)
+
+
+def pack_ranked_chunks(
+    pages: list[tuple[str, str]],
+    budget: int,
+    company_name: str | None = None,
+    max_chunk_chars: int = DETAILS_CHUNK_CHARS,
+) -> list[tuple[int, str]]:
+    """Selecciona los trozos más relevantes que caben en `budget` caracteres.
+
+    `pages` es una lista de (etiqueta, texto). Se trocea cada página, se puntúan los
+    trozos contra el perfil de empresa y se empaquetan de forma voraz por puntuación.
+    El resultado se devuelve en el orden original (por página y posición), como
+    lista de (índice de página, texto seleccionado) sin páginas vacías.
+    """
+    chunks: list[str] = []
+    owners: list[int] = []
+    for page_idx, (_, text) in enumerate(pages):
+        for chunk in chunk_text(text, max_chunk_chars):
+            chunks.append(chunk)
+            owners.append(page_idx)
+    if not chunks:
+        return []
+
+    total = sum(len(ch) + 1 for ch in chunks)
+    if total <= budget:
+        selected = range(len(chunks))
+    else:
+        scores = score_chunks(chunks, build_profile_query(company_name))
+        # Desempate estable: a igual puntuación, preferir lo que aparece antes
+        order = np.lexsort((np.arange(len(chunks)), -scores))
+        used = 0
+        picked: list[int] = []
+        for idx in order.tolist():
+            size = len(chunks[idx]) + 1
+            if used + size <= budget:
+                picked.append(idx)
+                used += size
+        selected = sorted(picked)
+
+    by_page: dict[int, list[str]] = {}
+    for idx in selected:
+        by_page.setdefault(owners[idx], []).append(chunks[idx])
+    return [(p, "\n".join(by_page[p])) for p in sorted(by_page)]
@@ -0,0 +1,295 @@
+import html
+import random
+import re
+import threading
+import time
+import uuid
+
+import httpx
+import openai
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from services.common.config import (
+    MOCK_LLM_ERROR_RATE,
+    MOCK_LLM_LATENCY,
+    MOCK_LLM_STREAM_CHUNK_CHARS,
+)
+
+# Modo MOCK_LLM: respuestas de brochure realistas sin llamar a la API real.
+# El motor es compartido por el cliente en proceso (`FakeOpenAI`) y por el
+# servidor stub compatible con OpenAI (`services/openai/mock_server.py`).
+
+_COMPANY_RE = re.compile(r"You are looking at a company called: (.+)")
+_URL_RE = re.compile(r"Main website URL: (\S+)")
+_SOCIAL_RE = re.compile(r"^- ([\w-]+): (https?://\S+)$", re.MULTILINE)
+
+# Errores inyectables: (status, tipo de error OpenAI, mensaje)
+_INJECTED_ERRORS = (
+    (429, "rate_limit_exceeded", "Rate limit reached for requests (mock)"),
+    (500, "server_error", "The server had an error while processing your request (mock)"),
+    (503, "server_error", "The engine is currently overloaded (mock)"),
+    (408, "timeout", "Request timed out (mock)"),
+)
+
+
+class LatencyModel:
+    """Distribución de latencia del LLM simulado, en segundos.
+
+    Formato `tipo:params` en milisegundos:
+    - `fixed:800`
+    - `uniform:500:3000` (mínimo, máximo)
+    - `lognormal:1500:0.5` (mediana, sigma); colas largas como la API real
+    """
+
+    def __init__(self, kind: str = "fixed", params: tuple[float, ...] = (0.0,)):
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        parts = [p.strip() for p in (spec or "").split(":") if p.strip()]
+        if not parts:
+            return cls()
+        kind = parts[0].lower()
+        try:
+            params = tuple(float(p) for p in parts[1:])
+        except ValueError as e:
+            raise ValueError(f"Invalid latency spec: {spec}") from e
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            low, high = self.params
+            ms = rng.uniform(low, high)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            ms = median * rng.lognormvariate(0.0, sigma)
+        else:
+            ms = self.params[0]
+        return max(0.0, ms) / 1000
+
+
+def estimate_tokens(text: str) -> int:
+    # Aproximación habitual (~4 caracteres por token) suficiente para pruebas de carga
+    return max(1, len(text) // 4) if text else 0
+
+
+def _facts_from_prompt(prompt: str, limit: int = 6) -> list[str]:
+    facts = []
+    for line in prompt.splitlines():
+        line = line.strip()
+        if len(line) < 40 or line.startswith(("You are", "Here are", "IMPORTANT", "- ")):
+            continue
+        facts.append(line[:180])
+        if len(facts) >= limit:
+            break
+    return facts
+
+
+def render_mock_brochure(messages: list[dict]) -> str:
+    """Genera un brochure HTML plausible a partir del prompt (nombre, URL, sociales, texto)."""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+    company_match = _COMPANY_RE.search(prompt)
+    company = html.escape(company_match.group(1).strip() if company_match else "Your Company")
+    url_match = _URL_RE.search(prompt)
+    website = html.escape(url_match.group(1)) if url_match else ""
+    socials = _SOCIAL_RE.findall(prompt)
+    facts = [html.escape(f) for f in _facts_from_prompt(prompt)] or [
+        f"{company} helps its customers work better every day."
+    ]
+
+    bullets = "\n".join(f"        <li>✅ {fact}</li>" for fact in facts[1:5])
+    social_items = "\n".join(
+        f'      <li><a href="{html.escape(link)}">{html.escape(kind)}</a></li>'
+        for kind, link in socials
+    )
+    website_link = f'<a href="{website}">Website</a>' if website else ""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{company}</title>
+<style>
+* {{ box-sizing: border-box }}
+html, body {{ margin: 0; overflow-x: hidden; -webkit-print-color-adjust: exact; print-color-adjust: exact; }}
+body {{ font-family: system-ui, sans-serif; font-size: 15px; line-height: 1.6; color: #1d2433; }}
+header, main, footer {{ width: min(960px, 100%); margin: 0 auto; padding: 16px; }}
+h1 {{ font-size: clamp(24px, 4vw, 34px); color: #1f4fd1; }}
+h2 {{ font-size: 20px; margin-top: 20px; }}
+section, h2, h3 {{ break-inside: avoid }}
+a {{ color: #1f4fd1; text-decoration: underline; }}
+p, li {{ overflow-wrap: anywhere; hyphens: auto; }}
+@media screen {{ body {{ background: #f7f9fc; padding: 12px }} main {{ max-width: 960px; margin: 0 auto; }} }}
+@page {{ size: A4; margin: 1cm }}
+</style>
+</head>
+<body>
+<header>
+  <h1>{company} 🚀</h1>
+  <p>{facts[0]}</p>
+</header>
+<main>
+  <section>
+    <h2>What we do 🛠️</h2>
+    <p>{company} turns expertise into practical results for its clients.</p>
+  </section>
+  <section>
+    <h2>Key benefits ✨</h2>
+    <ul>
+{bullets}
+    </ul>
+  </section>
+  <section>
+    <h2>About us 🤝</h2>
+    <p>A team focused on quality, reliability and long-term relationships.</p>
+  </section>
+</main>
+<footer>
+  <p>{website_link}</p>
+  <ul>
+{social_items}
+  </ul>
+</footer>
+</body>
+</html>"""
+
+
+class MockCompletionEngine:
+    """Motor común: decide latencia/error de cada llamada y construye las respuestas."""
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        error_rate: float = 0.0,
+        stream_chunk_chars: int = 256,
+        seed: int | None = None,
+    ):
+        self.latency = latency or LatencyModel()
+        self.error_rate = min(1.0, max(0.0, error_rate))
+        self.stream_chunk_chars = max(1, stream_chunk_chars)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def plan(self) -> tuple[float, tuple[int, str, str] | None]:
+        """(segundos de espera, error inyectado o None) para la siguiente llamada."""
+        with self._lock:
+            delay = self.latency.sample(self._rng)
+            error = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                error = self._rng.choice(_INJECTED_ERRORS)
+        return delay, error
+
+    def completion(self, model: str, messages: list[dict]) -> dict:
+        content = render_mock_brochure(messages)
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-mock-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+
+    def chunks(self, model: str, messages: list[dict], include_usage: bool = False) -> list[dict]:
+        full = self.completion(model, messages)
+        content = full["choices"][0]["message"]["content"]
+        base = {"id": full["id"], "object": "chat.completion.chunk", "created": full["created"]}
+        base["model"] = model
+        out = [{**base, "choices": [{"index": 0, "delta": {"role": "assistant"}}]}]
+        for i in range(0, len(content), self.stream_chunk_chars):
+            piece = content[i : i + self.stream_chunk_chars]
+            out.append({**base, "choices": [{"index": 0, "delta": {"content": piece}}]})
+        out.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if include_usage:
+            out.append({**base, "choices": [], "usage": full["usage"]})
+        return out
+
+
+def _openai_error(status: int, message: str) -> Exception:
+    request = httpx.Request("POST", "http://mock-llm/v1/chat/completions")
+    if status == 408:
+        return openai.APITimeoutError(request=request)
+    response = httpx.Response(status, request=request)
+    if status == 429:
+        return openai.RateLimitError(message, response=response, body=None)
+    return openai.InternalServerError(message, response=response, body=None)
+
+
+class _Completions:
+    def __init__(self, engine: MockCompletionEngine):
+        self._engine = engine
+
+    def create(self, model: str, messages: list[dict], stream: bool = False, **kwargs):
+        delay, error = self._engine.plan()
+        timeout = kwargs.get("timeout")
+        if isinstance(timeout, int | float) and delay > timeout:
+            # Igual que el SDK: esperar hasta el timeout y fallar
+            time.sleep(timeout)
+            raise _openai_error(408, "Request timed out (mock)")
+        # El cliente real se ejecuta en un executor; dormir aquí bloquea solo ese hilo
+        time.sleep(delay)
+        if error is not None:
+            raise _openai_error(error[0], error[2])
+        if stream:
+            include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+            return (
+                ChatCompletionChunk.model_validate(chunk)
+                for chunk in self._engine.chunks(model, messages, include_usage)
+            )
+        return ChatCompletion.model_validate(self._engine.completion(model, messages))
+
+
+class _Chat:
+    def __init__(self, engine: MockCompletionEngine):
+        self.completions = _Completions(engine)
+
+
+class FakeOpenAI:
+    """Sustituto en proceso de `openai.OpenAI` para `MOCK_LLM=true` (solo chat.completions)."""
+
+    def __init__(self, engine: MockCompletionEngine | None = None):
+        self.engine = engine or shared_engine()
+        self.chat = _Chat(self.engine)
+
+
+def build_engine(seed: int | None = None) -> MockCompletionEngine:
+    """Motor configurado desde settings (`MOCK_LLM_LATENCY`, `MOCK_LLM_ERROR_RATE`)."""
+    return MockCompletionEngine(
+        latency=LatencyModel.parse(MOCK_LLM_LATENCY),
+        error_rate=MOCK_LLM_ERROR_RATE,
+        stream_chunk_chars=MOCK_LLM_STREAM_CHUNK_CHARS,
+        seed=seed,
+    )
+
+
+_shared_engine: MockCompletionEngine | None = None
+_shared_engine_lock = threading.Lock()
+
+
+def shared_engine() -> MockCompletionEngine:
+    """Motor de settings construido una sola vez y reutilizado por todos los `FakeOpenAI`.
+
+    Se construye al arrancar la app (ver `main.py`), así un `MOCK_LLM_LATENCY`
+    mal formado falla en el arranque y no en cada petición.
+    """
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = build_engine()
+        return _shared_engine
@@ -0,0 +1,56 @@
+"""Servidor stub compatible con la API de OpenAI (chat completions) para pruebas de carga.
+
+Uso:
+    uvicorn services.openai.mock_server:app --port 8001
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=mock uvicorn main:app
+
+Latencia y errores se configuran igual que el modo en proceso
+(`MOCK_LLM_LATENCY`, `MOCK_LLM_ERROR_RATE`).
+"""
+
+import asyncio
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from services.openai.mock_llm import shared_engine
+
+app = FastAPI(title="Mock OpenAI")
+engine = shared_engine()
+
+
+def _error_response(status: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": code, "code": code}},
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "mock")
+    messages = body.get("messages") or []
+    delay, error = engine.plan()
+    await asyncio.sleep(delay)
+    if error is not None:
+        return _error_response(*error)
+
+    if not body.get("stream"):
+        return JSONResponse(engine.completion(model, messages))
+
+    include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+    async def events():
+        for chunk in engine.chunks(model, messages, include_usage):
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(0)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
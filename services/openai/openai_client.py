@@ -1,25 +1,59 @@
 import asyncio
+import hashlib
 import ipaddress
-import json
+import math
+import random
+import time
 from urllib.parse import urlparse
 
 from openai import OpenAI
 
 from config import settings
+from services.common.cache_codec import decode_payload, encode_payload
 from services.common.config import (
+    DEADLINE_LLM_RESERVE_SECONDS,
+    DETAILS_CACHE_HARD_TTL,
+    DETAILS_CACHE_SOFT_TTL,
+    DETAILS_CACHE_XFETCH_BETA,
     DETAILS_MAX_CHARS,
+    DETAILS_NEGATIVE_CACHE_TTL,
+    DETAILS_RANKING,
+    DETAILS_REFRESH_LOCK_TTL,
     OPENAI_DEFAULT_MODEL,
+    OPENAI_DEFAULT_TIMEOUT,
+    SCRAPER_EXTRACT_MODE,
     SCRAPER_LOG_VERBOSE,
-    SCRAPER_MAX_CONCURRENCY,
+    SCRAPER_SITEMAP_DISCOVERY,
+    SCRAPER_SPECULATIVE_MAX_IN_FLIGHT,
+    SCRAPER_SPECULATIVE_PATHS,
+    SCRAPER_SPECULATIVE_PREFETCH,
 )
+from services.common.deadline import Deadline, DeadlineExceeded, remaining_or
+from services.common.fingerprint import is_near_duplicate
+from services.common.link_utils import normalize_url
 from services.common.social import SOCIAL_TYPES, classify_social_type
+from services.http.fetch_scheduler import FetchFlow
 from services.logging.dev_logger import get_logger
+from services.observability import metrics, tracing
+from services.openai.chunk_ranking import pack_ranked_chunks
+from services.openai.mock_llm import FakeOpenAI
 from services.openai.prompts import Prompts
+from services.openai.usage import LLMUsage
 from services.redis.redis_client import redis_client
+from services.scraper import strip_repeated_lines
+from services.sitemap import discover_sitemap_links, merge_info_links
 
 # Modelo por defecto y límites centralizados en services.common.config
 
 
+def _company_token(company_name: str | None) -> str:
+    """Nombre de empresa normalizado (minúsculas, espacios colapsados) y acortado para claves."""
+    normalized = " ".join((company_name or "").lower().split())
+    if not normalized:
+        return "-"
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
 def _classify_social_type(domain: str) -> str:
     # Wrapper para usar el helper compartido y mantener compatibilidad interna
     return classify_social_type(domain)
@@ -38,6 +72,34 @@ def _build_combined_links(info_urls: list[str], social_urls: list[str]) -> list[
 # Se eliminan límites máximos; el control se hace con concurrencia y presupuesto
 
 
+def _speculative_urls(url: str) -> list[str]:
+    """URLs canónicas (about, servicios, contacto...) a pedir en paralelo a la landing."""
+    try:
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.netloc:
+            return []
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        landing = normalize_url(url)
+        urls = [origin + path for path in SCRAPER_SPECULATIVE_PATHS]
+        return [u for u in dict.fromkeys(urls) if normalize_url(u) != landing]
+    except Exception:
+        return []
+
+
+async def _speculative_fetch(semaphore: asyncio.Semaphore, scraper) -> dict:
+    # Cupo propio antes de entrar en la ventana del host y en el planificador global
+    async with semaphore:
+        return await scraper.get_content()
+
+
+async def _cancel_tasks(tasks) -> None:
+    # gather también recoge excepciones de tareas ya terminadas (evita avisos de asyncio)
+    tasks = [t for t in tasks if t is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 def _build_social_block(social_links: list[dict]) -> str:
     if not social_links:
         return ""
@@ -47,25 +109,105 @@ def _build_social_block(social_links: list[dict]) -> str:
     return "\n".join(lines)
 
 
+@tracing.traced("cache.details.get")
 def _load_details_cache(cache_key: str):
     try:
         cached = redis_client.get(cache_key)
-        if cached:
-            try:
-                parsed = json.loads(cached)
-                if isinstance(parsed, dict) and "details" in parsed:
-                    return parsed
-            except Exception:
-                return {"details": cached, "social_links": []}
     except Exception:
-        pass
+        metrics.record_cache_error("details")
+        return None
+    metrics.record_cache("details", bool(cached))
+    if not cached:
+        return None
+    if not cached.startswith(("{", "cmp:")):
+        # Formato antiguo: texto plano sin sociales
+        return {"details": cached, "social_links": []}
+    parsed = decode_payload("details", cached)
+    if parsed is not None and "details" in parsed:
+        return parsed
     return None
 
 
-def _cache_details_payload(cache_key: str, details: str, social_links: list[dict]) -> None:
+@tracing.traced("cache.details.set")
+def _cache_details_payload(
+    cache_key: str, details: str, social_links: list[dict], delta: float = 0.0
+) -> None:
+    # `stored_at` y `delta` (coste del crawl) alimentan la expiración temprana XFetch
+    try:
+        payload = encode_payload(
+            "details",
+            {
+                "details": details,
+                "social_links": social_links,
+                "stored_at": time.time(),
+                "delta": round(max(0.0, delta), 3),
+            },
+        )
+        redis_client.set(cache_key, payload, ex=DETAILS_CACHE_HARD_TTL)
+    except Exception:
+        metrics.record_cache_error("details")
+
+
+def _details_freshness(cached: dict, now: float | None = None, rng=random) -> str:
+    """`fresh`, `early` (XFetch decide refrescar antes del soft TTL) o `stale`.
+
+    XFetch (Vattani et al.): refrescar si `now - delta * beta * ln(U) >= expiry`,
+    con U uniforme en (0, 1]. Cuanto más caro el crawl (`delta`) y más cerca del
+    soft TTL, más probable el refresco anticipado, y solo lo dispara una petición
+    de vez en cuando en lugar de todas a la vez al expirar.
+    """
+    stored_at = cached.get("stored_at")
+    if not isinstance(stored_at, int | float):
+        # Entradas antiguas sin metadatos: su TTL en Redis sigue mandando
+        return "fresh"
+    now = time.time() if now is None else now
+    expiry = stored_at + DETAILS_CACHE_SOFT_TTL
+    if now >= expiry:
+        return "stale"
+    delta = float(cached.get("delta") or 0.0)
+    if DETAILS_CACHE_XFETCH_BETA > 0 and delta > 0:
+        u = 1.0 - rng.random()
+        if now - delta * DETAILS_CACHE_XFETCH_BETA * math.log(u) >= expiry:
+            return "early"
+    return "fresh"
+
+
+def _acquire_refresh_lock(cache_key: str) -> bool:
+    # Un único refresco por entrada entre todos los workers; sin Redis no se refresca
     try:
-        payload = json.dumps({"details": details, "social_links": social_links})
-        redis_client.set(cache_key, payload, ex=3600)
+        return bool(
+            redis_client.set(f"{cache_key}:refresh", "1", ex=DETAILS_REFRESH_LOCK_TTL, nx=True)
+        )
+    except Exception:
+        return False
+
+
+def _release_refresh_lock(cache_key: str) -> None:
+    try:
+        redis_client.delete(f"{cache_key}:refresh")
+    except Exception:
+        pass
+
+
+# Referencias fuertes a los refrescos en segundo plano (asyncio solo guarda débiles)
+_background_refreshes: set[asyncio.Task] = set()
+
+
+@tracing.traced("cache.details_negative.get")
+def _load_details_failure(cache_key: str) -> str | None:
+    try:
+        failure = redis_client.get(f"{cache_key}:neg")
+    except Exception:
+        metrics.record_cache_error("details_negative")
+        return None
+    metrics.record_cache("details_negative", bool(failure))
+    return failure
+
+
+@tracing.traced("cache.details_negative.set")
+def _cache_details_failure(cache_key: str, error: str) -> None:
+    try:
+        redis_client.set(f"{cache_key}:neg", error[:500], ex=DETAILS_NEGATIVE_CACHE_TTL)
     except Exception:
         pass
 
@@ -91,30 +233,85 @@ def _log_links_preview(social_items: list[dict], info_items: list[dict], logger)
 
 class OpenAIClient:
     def __init__(self, scraper_cls):
-        self.client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        if settings.mock_llm:
+            # LLM simulado en proceso (pruebas de carga sin coste ni dependencia de la API)
+            self.client = FakeOpenAI()
+        elif settings.openai_api_key:
+            self.client = OpenAI(
+                api_key=settings.openai_api_key, base_url=settings.openai_base_url or None
+            )
+        else:
+            self.client = None
         self.scraper_cls = scraper_cls
+        # Tokens/latencia de las llamadas de esta instancia (una por petición)
+        self.usage = LLMUsage()
         self.prompts = Prompts()
         self.logger = get_logger(__name__)
 
     def get_client(self):
         return self.client
 
-    async def _run_chat_completion(self, messages: list[dict], model: str = OPENAI_DEFAULT_MODEL):
+    async def _run_chat_completion(
+        self,
+        messages: list[dict],
+        model: str = OPENAI_DEFAULT_MODEL,
+        deadline: Deadline | None = None,
+    ):
         # Validación centralizada de API key
         if not self.client:
             return "Error: missing OpenAI API key"
+        # Recortar el timeout del LLM al presupuesto restante de la petición
+        timeout = remaining_or(deadline, OPENAI_DEFAULT_TIMEOUT)
+        if timeout <= 0:
+            return "Error: deadline exceeded before LLM call"
+        with tracing.span("llm.chat_completion", {"gen_ai.request.model": model}) as llm_span:
+            return await self._timed_chat_completion(messages, model, timeout, llm_span)
+
+    async def _timed_chat_completion(self, messages, model, timeout, llm_span):
         loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        usage = None
         try:
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.chat.completions.create(
-                    model=model,
-                    messages=messages,
+            response = await asyncio.wait_for(
+                loop.run_in_executor(
+                    None,
+                    lambda: self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        timeout=timeout,
+                    ),
                 ),
+                timeout=timeout,
+            )
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            metrics.record_llm_call(
+                model,
+                "ok",
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            tracing.set_attributes(
+                llm_span,
+                {
+                    "gen_ai.usage.input_tokens": prompt_tokens,
+                    "gen_ai.usage.output_tokens": completion_tokens,
+                },
             )
             return response.choices[0].message.content
+        except TimeoutError:
+            metrics.record_llm_call(model, "timeout")
+            tracing.set_attributes(llm_span, {"error.type": "timeout"})
+            return "Error: deadline exceeded during LLM call"
         except Exception as e:
+            metrics.record_llm_call(model, "error")
+            tracing.set_attributes(llm_span, {"error.type": type(e).__name__})
             return f"Error: {str(e)}"
+        finally:
+            elapsed = time.perf_counter() - started
+            self.usage.record(model, usage, int(elapsed * 1000))
+            metrics.observe_stage("llm", elapsed)
 
     def _normalize_language(self, language: str):
         s = (language or "").strip().lower()
@@ -145,7 +342,9 @@ class OpenAIClient:
         ]
         return await self._run_chat_completion(messages)
 
-    def _details_cache_key(self, url: str, accept_language: str | None) -> str:
+    def _details_cache_key(
+        self, url: str, accept_language: str | None, company_name: str | None = None
+    ) -> str:
         try:
             parsed = urlparse(url)
             host = (parsed.netloc or parsed.path or url).lower()
@@ -154,9 +353,13 @@ class OpenAIClient:
             lang_token = (accept_language or settings.scraper_accept_language or "").replace(
                 ",", "_"
             )
-            return f"company:details:{host}:al:{lang_token}"
+            key = f"company:details:{host}:al:{lang_token}"
         except Exception:
-            return f"company:details:{url}:al:{accept_language or 'default'}"
+            key = f"company:details:{url}:al:{accept_language or 'default'}"
+        if DETAILS_RANKING:
+            # El ranking TF-IDF depende del nombre de empresa: una entrada por nombre
+            key += f":cn:{_company_token(company_name)}"
+        return key
 
     # --- Utilidades para validar enlaces del LLM ---
     @staticmethod
@@ -190,17 +393,166 @@ class OpenAIClient:
             return True
         return False
 
-    async def get_all_details(self, url, accept_language: str | None = None):
-        cache_key = self._details_cache_key(url, accept_language)
+    @tracing.traced("details.get_all_details")
+    async def get_all_details(
+        self,
+        url,
+        accept_language: str | None = None,
+        deadline: Deadline | None = None,
+        flow: FetchFlow | None = None,
+        company_name: str | None = None,
+    ):
+        cache_key = self._details_cache_key(url, accept_language, company_name)
         cached = _load_details_cache(cache_key)
         if cached:
-            return cached
+            # Stale-while-revalidate: servir ya y refrescar en segundo plano
+            freshness = _details_freshness(cached)
+            if freshness != "fresh":
+                metrics.record_cache_refresh("details", freshness)
+                self._schedule_details_refresh(url, accept_language, company_name, cache_key)
+            return {"details": cached["details"], "social_links": cached.get("social_links", [])}
+
+        # Caché negativa: si la landing falló hace poco, no volver a esperar sus timeouts
+        failure = _load_details_failure(cache_key)
+        if failure:
+            raise Exception(failure)
+
+        return await self._crawl_details(
+            url, cache_key, accept_language, deadline, flow, company_name
+        )
+
+    def _schedule_details_refresh(
+        self, url: str, accept_language: str | None, company_name: str | None, cache_key: str
+    ) -> None:
+        if not _acquire_refresh_lock(cache_key):
+            return
+        task = asyncio.ensure_future(
+            self._refresh_details(url, accept_language, company_name, cache_key)
+        )
+        _background_refreshes.add(task)
+        task.add_done_callback(_background_refreshes.discard)
+
+    async def _refresh_details(
+        self, url: str, accept_language: str | None, company_name: str | None, cache_key: str
+    ) -> None:
+        try:
+            await self._crawl_details(
+                url,
+                cache_key,
+                accept_language,
+                Deadline(settings.request_deadline_seconds),
+                FetchFlow(user_id="details-refresh"),
+                company_name,
+            )
+        except Exception as e:
+            # La entrada antigua sigue sirviéndose hasta el hard TTL
+            self.logger.warning("Background details refresh failed for %s: %s", url, e)
+        finally:
+            _release_refresh_lock(cache_key)
+
+    async def warm_details(
+        self, url: str, accept_language: str | None = None, company_name: str | None = None
+    ) -> str:
+        """Pre-calienta la caché de detalles: `fresh`, `locked`, `refreshed` o `failed`.
+
+        Respeta el mismo lock que el refresco en segundo plano para no duplicar
+        crawls con peticiones en curso.
+        """
+        cache_key = self._details_cache_key(url, accept_language, company_name)
+        cached = _load_details_cache(cache_key)
+        if cached and _details_freshness(cached) == "fresh":
+            return "fresh"
+        if not _acquire_refresh_lock(cache_key):
+            return "locked"
+        try:
+            await self._crawl_details(
+                url,
+                cache_key,
+                accept_language,
+                Deadline(settings.request_deadline_seconds),
+                FetchFlow(user_id="warmup"),
+                company_name,
+            )
+            return "refreshed"
+        except Exception as e:
+            self.logger.warning("Warm-up failed for %s: %s", url, e)
+            return "failed"
+        finally:
+            _release_refresh_lock(cache_key)
+
+    @tracing.traced("details.crawl")
+    async def _crawl_details(
+        self,
+        url: str,
+        cache_key: str,
+        accept_language: str | None = None,
+        deadline: Deadline | None = None,
+        flow: FetchFlow | None = None,
+        company_name: str | None = None,
+    ):
+        started = time.monotonic()
+        # Todos los fetches de este crawl comparten flujo en el planificador global
+        flow = flow or FetchFlow()
+
+        # El crawl de subpáginas termina con tiempo de sobra para la llamada al LLM
+        crawl_deadline = (
+            Deadline(max(0.0, deadline.remaining() - DEADLINE_LLM_RESERVE_SECONDS))
+            if deadline is not None
+            else None
+        )
+
+        # Prefetch especulativo de páginas canónicas mientras se descarga la landing
+        speculative: dict[str, asyncio.Future] = {}
+        if SCRAPER_SPECULATIVE_PREFETCH:
+            spec_slots = asyncio.Semaphore(max(1, SCRAPER_SPECULATIVE_MAX_IN_FLIGHT))
+            for spec_url in _speculative_urls(url):
+                speculative[normalize_url(spec_url)] = asyncio.ensure_future(
+                    _speculative_fetch(
+                        spec_slots,
+                        self.scraper_cls(
+                            spec_url,
+                            accept_language=accept_language,
+                            deadline=crawl_deadline,
+                            flow=flow,
+                        ),
+                    )
+                )
+
+        # Descubrimiento vía sitemap en paralelo a la landing (cacheado por host), con el
+        # mismo presupuesto que las subpáginas para no comerse la reserva del LLM
+        sitemap_task = (
+            asyncio.ensure_future(
+                discover_sitemap_links(
+                    url, accept_language=accept_language, deadline=crawl_deadline, flow=flow
+                )
+            )
+            if SCRAPER_SITEMAP_DISCOVERY
+            else None
+        )
 
         result_text = "Landing Page: \n"
-        result_dict = await self.scraper_cls(url, accept_language=accept_language).get_content()
+        try:
+            with metrics.time_stage("landing"), tracing.span("details.landing"):
+                result_dict = await self.scraper_cls(
+                    url, accept_language=accept_language, deadline=deadline, flow=flow
+                ).get_content()
+        except DeadlineExceeded:
+            # Agotar el presupuesto no significa que el sitio esté caído
+            await _cancel_tasks([sitemap_task, *speculative.values()])
+            raise
+        except Exception as e:
+            await _cancel_tasks([sitemap_task, *speculative.values()])
+            _cache_details_failure(cache_key, str(e))
+            raise
 
         # Usar enlaces filtrados por el scraper (sin límites máximos)
         info_urls = result_dict.get("info_links", [])
+        if sitemap_task is not None:
+            try:
+                info_urls = merge_info_links(info_urls, await sitemap_task)
+            except Exception as e:
+                # El sitemap es opcional: sin él seguimos con los enlaces de la landing
+                self.logger.warning("Sitemap discovery failed for %s: %s", url, e)
         social_urls = result_dict.get("social_links", [])
 
         # Construir estructura que el LLM espera usando helper (solo clasificación, sin recorte)
@@ -215,43 +567,135 @@ class OpenAIClient:
             _log_links_preview(social_items, info_items, self.logger)
 
         # Scrape ONLY informational links; do NOT scrape social media URLs
-        # Control de concurrencia: limitar número de scrapes simultáneos
-        sem = asyncio.Semaphore(max(1, SCRAPER_MAX_CONCURRENCY))
-
-        async def _bounded_get_content(item_url: str):
-            async with sem:
-                return await self.scraper_cls(
-                    item_url, accept_language=accept_language
-                ).get_content()
+        # La concurrencia por host la regula el controlador adaptativo del scraper
+
+        subpages_started = time.perf_counter()
+        info_tasks = []
+        prefetched: set[asyncio.Future] = set()
+        for item in info_items:
+            # Reutilizar el prefetch especulativo si la landing enlaza esa página
+            task = speculative.pop(normalize_url(item["url"]), None)
+            if task is not None:
+                prefetched.add(task)
+            else:
+                task = asyncio.ensure_future(
+                    self.scraper_cls(
+                        item["url"],
+                        accept_language=accept_language,
+                        deadline=crawl_deadline,
+                        flow=flow,
+                    ).get_content()
+                )
+            info_tasks.append(task)
+        # Páginas especulativas no enlazadas por la landing: descartarlas
+        spec_cancelled = len(speculative)
+        await _cancel_tasks(speculative.values())
+        partial = False
+        if info_tasks:
+            crawl_timeout = crawl_deadline.remaining() if crawl_deadline is not None else None
+            with tracing.span("details.subpages", {"scraper.subpages": len(info_tasks)}):
+                _, pending = await asyncio.wait(info_tasks, timeout=crawl_timeout)
+            if pending:
+                # Sin presupuesto: cancelar lo pendiente y continuar con detalles parciales
+                partial = True
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                self.logger.warning(
+                    "Deadline reached; using %d/%d subpages for %s",
+                    len(info_tasks) - len(pending),
+                    len(info_tasks),
+                    url,
+                )
+            metrics.observe_stage("subpages", time.perf_counter() - subpages_started)
+
+        # Fingerprints de páginas ya aceptadas para descartar casi-duplicados
+        accepted_fingerprints: list[int] = []
+        if result_dict.get("fingerprint") is not None:
+            accepted_fingerprints.append(result_dict["fingerprint"])
+
+        accepted: list[tuple[dict, str]] = []
+        spec_reused = 0
+        for item, task in zip(info_items, info_tasks):
+            if task.cancelled():
+                continue
+            page = task.exception() or task.result()
+            if isinstance(page, Exception):
+                partial = partial or isinstance(page, DeadlineExceeded)
+                self.logger.warning("Error scraping %s: %s", item["url"], page)
+                continue
+            fingerprint = page.get("fingerprint")
+            if fingerprint is not None:
+                if is_near_duplicate(fingerprint, accepted_fingerprints):
+                    if SCRAPER_LOG_VERBOSE:
+                        self.logger.debug("Skipping near-duplicate page %s", item["url"])
+                    continue
+                accepted_fingerprints.append(fingerprint)
+            if task in prefetched:
+                # Solo cuenta el prefetch cuyo resultado se usa de verdad
+                spec_reused += 1
+            accepted.append((item, page.get("text", "")))
+
+        if SCRAPER_LOG_VERBOSE and SCRAPER_SPECULATIVE_PREFETCH:
+            self.logger.debug(
+                "Speculative prefetch: %d reused, %d cancelled", spec_reused, spec_cancelled
+            )
 
-        info_tasks = [_bounded_get_content(item["url"]) for item in info_items]
-        pages = await asyncio.gather(*info_tasks, return_exceptions=True)
+        # Modo "main": quitar líneas repetidas en la mayoría de páginas (menús, pies)
+        if SCRAPER_EXTRACT_MODE == "main" and accepted:
+            texts = strip_repeated_lines(
+                [result_dict.get("text", "")] + [text for _, text in accepted]
+            )
+            accepted = [(item, text) for (item, _), text in zip(accepted, texts[1:], strict=True)]
 
         # Presupuesto total de texto para evitar payloads excesivos
         budget = max(1, DETAILS_MAX_CHARS)
-        for item, page in zip(info_items, pages):
-            if isinstance(page, Exception):
-                self.logger.warning("Error scraping %s: %s", item["url"], page)
-                continue
-            chunk = f"\n\n{item['type']}\n{page.get('text', '')}"
-            remaining = budget - len(result_text)
-            if remaining <= 0:
-                break
-            if len(chunk) > remaining:
-                result_text += chunk[:remaining]
-                break
-            else:
-                result_text += chunk
+        if DETAILS_RANKING:
+            # Trocear landing + subpáginas y empaquetar los trozos más relevantes
+            pages = [("landing", result_dict.get("text", ""))]
+            pages += [(item["type"], text) for item, text in accepted]
+            overhead = len(result_text) + sum(len(label) + 3 for label, _ in pages)
+            for page_idx, text in pack_ranked_chunks(
+                pages, max(1, budget - overhead), company_name=company_name
+            ):
+                if page_idx == 0:
+                    result_text += text
+                else:
+                    result_text += f"\n\n{pages[page_idx][0]}\n{text}"
+            result_text = result_text[:budget]
+        else:
+            for item, text in accepted:
+                chunk = f"\n\n{item['type']}\n{text}"
+                remaining = budget - len(result_text)
+                if remaining <= 0:
+                    break
+                if len(chunk) > remaining:
+                    result_text += chunk[:remaining]
+                    break
+                else:
+                    result_text += chunk
 
         # No incluir los sociales en el texto de detalles; devolverlos por separado
         social_links = [{"type": s["type"], "url": s["url"]} for s in social_items]
 
-        # Cachear los detalles compilados y sociales por 1h usando helper
-        _cache_details_payload(cache_key, result_text, social_links)
+        # Cachear los detalles compilados y sociales usando helper
+        # (los detalles parciales por deadline no se cachean)
+        if not partial:
+            _cache_details_payload(
+                cache_key, result_text, social_links, delta=time.monotonic() - started
+            )
 
         return {"details": result_text, "social_links": social_links}
 
-    async def create_brochure(self, company_name, url, language, brochure_type):
+    async def create_brochure(
+        self,
+        company_name,
+        url,
+        language,
+        brochure_type,
+        deadline: Deadline | None = None,
+        flow: FetchFlow | None = None,
+    ):
         # Validación perezosa: si no hay API key, devolver error claro
         if not self.client:
             return "Error: missing OpenAI API key"
@@ -259,7 +703,13 @@ class OpenAIClient:
         _, prompt_language, accept_language = self._normalize_language(language)
 
         # Obtener detalles (scraping) usando Accept-Language normalizado
-        details_payload = await self.get_all_details(url, accept_language=accept_language)
+        details_payload = await self.get_all_details(
+            url,
+            accept_language=accept_language,
+            deadline=deadline,
+            flow=flow,
+            company_name=company_name,
+        )
         # Backward compatibility: si viniera un string
         if isinstance(details_payload, str):
             if details_payload.startswith("Error:"):
@@ -304,4 +754,4 @@ class OpenAIClient:
                 ),
             },
         ]
-        return await self._run_chat_completion(messages)
+        return await self._run_chat_completion(messages, deadline=deadline)
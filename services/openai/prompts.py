@@ -1,3 +1,8 @@
+# Versión de los prompts: subirla al cambiar cualquier prompt invalida la caché
+# compartida de brochures (forma parte de la clave por contenido)
+PROMPT_VERSION = "1"
+
+
 class Prompts:
     def get_links_system_prompt(self) -> str:
         link_system_prompt = (
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+
+from services.common.config import LLM_PRICING_PER_MTOK
+
+
+def _usage_field(usage, name: str) -> int:
+    value = getattr(usage, name, None)
+    if value is None and isinstance(usage, dict):
+        value = usage.get(name)
+    return int(value or 0)
+
+
+def _cached_tokens(usage) -> int:
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None and isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details")
+    if details is None:
+        return 0
+    return _usage_field(details, "cached_tokens")
+
+
+def estimate_cost_usd(
+    model: str | None, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+) -> float | None:
+    """Coste en USD según `LLM_PRICING_PER_MTOK`; None si el modelo no tiene precio."""
+    prices = LLM_PRICING_PER_MTOK.get(model or "")
+    if prices is None:
+        return None
+    input_price, cached_price, output_price = prices
+    cached = min(cached_tokens, prompt_tokens)
+    cost = (
+        (prompt_tokens - cached) * input_price
+        + cached * cached_price
+        + completion_tokens * output_price
+    )
+    return round(cost / 1_000_000, 6)
+
+
+@dataclass
+class LLMUsage:
+    """Tokens y latencia acumulados de las llamadas al LLM de una petición."""
+
+    model: str | None = None
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: int = 0
+
+    def record(self, model: str, usage, latency_ms: int) -> None:
+        """Suma una llamada; `usage` es `response.usage` del SDK (o None si falló)."""
+        self.model = model
+        self.calls += 1
+        self.latency_ms += max(0, int(latency_ms))
+        if usage is None:
+            return
+        self.prompt_tokens += _usage_field(usage, "prompt_tokens")
+        self.completion_tokens += _usage_field(usage, "completion_tokens")
+        self.cached_tokens += _cached_tokens(usage)
+
+    def cost_usd(self) -> float | None:
+        if not self.calls:
+            return None
+        return estimate_cost_usd(
+            self.model, self.prompt_tokens, self.completion_tokens, self.cached_tokens
+        )
+
+    def as_analytics(self) -> dict:
+        """Argumentos de `store_brochure_analytics` (vacío si no hubo llamadas)."""
+        if not self.calls:
+            return {}
+        return {
+            "llm_model": self.model,
+            "llm_calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "llm_latency_ms": self.latency_ms,
+            "cost_usd": self.cost_usd(),
+        }
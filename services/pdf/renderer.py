@@ -1,11 +1,31 @@
+import asyncio
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
 from config import settings
+from services.common.deadline import Deadline, DeadlineExceeded
+from services.observability import metrics, tracing
 from services.pdf.html_utils import inline_print_css
 
 
-async def render_pdf(app, html: str) -> bytes:
-    """Renderiza HTML a PDF usando el navegador Playwright global de la app."""
+@tracing.traced("pdf.render")
+async def render_pdf(app, html: str, deadline: Deadline | None = None) -> bytes:
+    """Renderiza HTML a PDF usando el navegador Playwright global de la app.
+
+    Si se pasa `deadline`, la espera en cola y el timeout de render se recortan al
+    presupuesto restante de la petición.
+    """
     browser = app.state.browser
-    async with app.state.pdf_sema:
+    queue_timeout = deadline.remaining() if deadline is not None else None
+    # Espera en cola del semáforo y render se miden por separado
+    with metrics.time_stage("pdf_queue_wait"), tracing.span("pdf.queue_wait"):
+        try:
+            await asyncio.wait_for(app.state.pdf_sema.acquire(), timeout=queue_timeout)
+        except TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded waiting for PDF renderer") from None
+    render_started = time.perf_counter()
+    try:
         context = await browser.new_context(
             color_scheme="light",
             java_script_enabled=not settings.playwright_disable_js,
@@ -14,34 +34,46 @@ async def render_pdf(app, html: str) -> bytes:
         )
 
         timeout_ms = settings.playwright_pdf_timeout_ms
+        if deadline is not None:
+            timeout_ms = int(deadline.clamp(timeout_ms / 1000.0) * 1000)
+            if timeout_ms <= 0:
+                await context.close()
+                raise DeadlineExceeded("Request deadline exceeded before PDF render")
+        # Si el timeout lo ha recortado el deadline, agotarlo es un DeadlineExceeded (504)
+        deadline_limited = timeout_ms < settings.playwright_pdf_timeout_ms
         try:
             context.set_default_timeout(timeout_ms)
         except Exception:
             pass
 
-        page = await context.new_page()
-        await page.emulate_media(media="print")
-
-        # Inyectar CSS de impresión inline (sin depender de JS)
-        html = inline_print_css(html)
-
-        await page.set_content(html, wait_until="domcontentloaded", timeout=timeout_ms)
-
         try:
-            import asyncio as _asyncio
-
-            pdf_coro = page.pdf(
-                format="A4",
-                print_background=True,
-                scale=1.0,
-                margin={"top": "1cm", "bottom": "1cm", "left": "1cm", "right": "1cm"},
-            )
-            pdf_bytes = await _asyncio.wait_for(
-                pdf_coro, timeout=(max(1, int(timeout_ms)) / 1000.0)
-            )
-            return pdf_bytes
+            return await _render_page(context, html, timeout_ms)
+        except (TimeoutError, PlaywrightTimeoutError):
+            if deadline_limited:
+                raise DeadlineExceeded("Request deadline exceeded during PDF render") from None
+            raise
         finally:
             try:
                 await context.close()
             except Exception:
                 pass
+    finally:
+        app.state.pdf_sema.release()
+        metrics.observe_stage("pdf_render", time.perf_counter() - render_started)
+
+
+async def _render_page(context, html: str, timeout_ms: int) -> bytes:
+    page = await context.new_page()
+    await page.emulate_media(media="print")
+
+    # Inyectar CSS de impresión inline (sin depender de JS)
+    html = inline_print_css(html)
+
+    await page.set_content(html, wait_until="domcontentloaded", timeout=timeout_ms)
+    pdf_coro = page.pdf(
+        format="A4",
+        print_background=True,
+        scale=1.0,
+        margin={"top": "1cm", "bottom": "1cm", "left": "1cm", "right": "1cm"},
+    )
+    return await asyncio.wait_for(pdf_coro, timeout=(max(1, int(timeout_ms)) / 1000.0))
@@ -1,7 +1,26 @@
 import os
+import time
 
 import redis
 
+from services.observability import metrics
+
+
+class InstrumentedRedis(redis.Redis):
+    """Cliente Redis que registra la latencia de cada comando (fail-open incluido)."""
+
+    def execute_command(self, *args, **options):
+        command = str(args[0]).upper() if args else "UNKNOWN"
+        started = time.perf_counter()
+        error = False
+        try:
+            return super().execute_command(*args, **options)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.observe_redis(command, time.perf_counter() - started, error)
+
 
 def get_redis_client():
     """Devuelve un cliente Redis simple basado en REDIS_URL.
@@ -9,7 +28,7 @@ def get_redis_client():
     que lo usen podrán capturar la excepción y continuar (fail-open donde aplique).
     """
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
-    return redis.Redis.from_url(redis_url, decode_responses=True)
+    return InstrumentedRedis.from_url(redis_url, decode_responses=True)
 
 
 # Cliente global
@@ -1,3 +1,5 @@
+import re
+import time
 from urllib.parse import urljoin, urlparse
 
 import httpx
@@ -5,9 +7,14 @@ from bs4 import BeautifulSoup
 
 from services.common.config import (
     SCRAPER_DEFAULT_TIMEOUT,
+    SCRAPER_EXTRACT_MODE,
     SCRAPER_LOG_VERBOSE,
+    SCRAPER_MAX_DECODED_BYTES,
     get_base_headers,
 )
+from services.common.content_decoding import BoundedDecoder, UnsupportedEncodingError
+from services.common.deadline import Deadline, DeadlineExceeded, remaining_or
+from services.common.fingerprint import page_fingerprint
 from services.common.link_utils import (
     filter_social_media_links,
     is_http_url,
@@ -16,7 +23,13 @@ from services.common.link_utils import (
     normalize_url,
 )
 from services.common.social import is_social_host
+from services.http.dns_cache import BlockedHostError
+from services.http.fetch_scheduler import FetchFlow, fetch_scheduler
+from services.http.host_concurrency import host_concurrency
+from services.http.host_health import HostUnavailableError, host_health, is_host_failure_status
+from services.http.transport import build_transport
 from services.logging.dev_logger import get_logger
+from services.observability import metrics, tracing
 
 # Headers base ahora se construyen vía helper compartido en services.common.config
 
@@ -159,6 +172,225 @@ def _extract_text(soup: BeautifulSoup) -> str:
         return ""
 
 
+# --- Extracción de contenido principal (modo "main") ---
+# Elementos de bloque que agrupan texto para puntuarlo
+_BLOCK_TAGS = {
+    "p",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "li",
+    "td",
+    "th",
+    "dt",
+    "dd",
+    "blockquote",
+    "pre",
+    "figcaption",
+    "address",
+    "div",
+    "section",
+    "article",
+    "main",
+    "body",
+}
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# Contenedores típicos de navegación, pie, banners de cookies, etc. `header` solo
+# cuenta como cabecera de página fuera de main/article/section (ver abajo)
+_BOILERPLATE_TAGS = {"nav", "footer", "aside", "form", "menu", "dialog"}
+_BOILERPLATE_ROLES = {"navigation", "contentinfo", "banner", "complementary", "dialog", "menu"}
+_CONTENT_SECTION_TAGS = {"main", "article", "section"}
+_BOILERPLATE_HINT_RE = re.compile(
+    r"(^|[-_\s])(nav|navbar|menu|footer|cookie|consent|gdpr|breadcrumbs?|sidebar|"
+    r"popup|modal|newsletter|share|social|skip)([-_\s]|$)",
+    re.IGNORECASE,
+)
+# Un bloque con más de este porcentaje de texto en enlaces se considera navegación
+MAIN_MAX_LINK_DENSITY = 0.5
+# Bloques de una sola palabra (salvo encabezados) suelen ser etiquetas de UI
+MAIN_MIN_BLOCK_WORDS = 2
+# Longitud (caracteres) de un bloque corto / de un bloque de contenido por sí solo
+MAIN_SHORT_BLOCK_CHARS = 40
+MAIN_GOOD_BLOCK_CHARS = 120
+
+
+def _is_boilerplate_container(tag) -> bool:
+    try:
+        if tag.name in _BOILERPLATE_TAGS:
+            return True
+        if tag.name == "header":
+            # Solo la cabecera de página; la de un artículo o hero (h1, claim) es contenido
+            return not any(p.name in _CONTENT_SECTION_TAGS for p in tag.parents)
+        attrs = tag.attrs or {}
+        if (attrs.get("role") or "").lower() in _BOILERPLATE_ROLES:
+            return True
+        if str(attrs.get("aria-hidden", "")).lower() == "true":
+            return True
+        hints = " ".join(attrs.get("class") or []) + " " + str(attrs.get("id") or "")
+        return bool(_BOILERPLATE_HINT_RE.search(hints))
+    except Exception:
+        return False
+
+
+def _classify_block(name: str, text: str, total: int, link_chars: int) -> str:
+    """Clase inicial de un bloque por longitud y densidad de enlaces."""
+    if name in _HEADING_TAGS:
+        return "heading"
+    if link_chars / total > MAIN_MAX_LINK_DENSITY or len(text.split()) < MAIN_MIN_BLOCK_WORDS:
+        return "bad"
+    if total >= MAIN_GOOD_BLOCK_CHARS:
+        return "good"
+    if total < MAIN_SHORT_BLOCK_CHARS:
+        return "short"
+    return "neargood"
+
+
+def _neighbour_class(classes: list[str], i: int, step: int) -> str:
+    # Vecino más cercano ya decidido (good/bad); los bordes del documento cuentan como bad
+    i += step
+    while 0 <= i < len(classes):
+        if classes[i] in ("good", "bad"):
+            return classes[i]
+        i += step
+    return "bad"
+
+
+def _resolve_block_classes(classes: list[str], levels: list[int]) -> list[str]:
+    """Decide bloques cortos, intermedios y encabezados según su contexto.
+
+    Un bloque intermedio o corto es contenido si está junto a contenido (p. ej.
+    cifras o testimonios dentro de una sección de texto); un encabezado lo es si
+    introduce algún bloque de contenido antes del siguiente encabezado de su nivel
+    (`levels`: 1-6 para h1-h6, 0 para el resto).
+    """
+    if "good" not in classes:
+        # Página sin bloques largos (contacto, fichas): los intermedios son el contenido
+        classes = ["good" if cls == "neargood" else cls for cls in classes]
+    resolved = list(classes)
+    for i, cls in enumerate(classes):
+        if cls in ("short", "neargood"):
+            near_good = "good" in (
+                _neighbour_class(classes, i, -1),
+                _neighbour_class(classes, i, 1),
+            )
+            resolved[i] = "good" if near_good else "bad"
+    for i, cls in enumerate(classes):
+        if cls != "heading":
+            continue
+        resolved[i] = "bad"
+        # Su sección acaba en el siguiente encabezado de igual o mayor rango (h2 > h3)
+        for nxt, level in zip(resolved[i + 1 :], levels[i + 1 :], strict=True):
+            if nxt == "heading" and level <= levels[i]:
+                break
+            if nxt == "good":
+                resolved[i] = "good"
+                break
+    return resolved
+
+
+def _extract_main_text(soup: BeautifulSoup) -> str:
+    """Extrae solo el contenido principal, al estilo readability/jusText.
+
+    Agrupa el texto visible por su bloque contenedor más cercano y:
+    - descarta bloques dentro de nav/footer/aside, la cabecera de página, banners de
+      cookies, menús, etc.
+    - puntúa cada bloque por longitud de texto frente a densidad de enlaces: los largos
+      con pocos enlaces son contenido; los muy enlazados o de una palabra, no
+    - los bloques cortos e intermedios y los encabezados se deciden por sus vecinos
+      (contenido junto a contenido), así se conservan el h1, claims y cifras de la
+      landing pero no enlaces sueltos o widgets aislados
+    - el h1 se conserva siempre (nombre o claim de la empresa)
+    No modifica el DOM, para que la recogida de enlaces posterior siga viendo el menú.
+    """
+    try:
+        blocks: dict[int, list] = {}
+        order: list[int] = []
+        root = soup.body or soup
+        for string in root.find_all(string=True):
+            text = str(string).strip()
+            if not text or string.parent is None or string.parent.name in ("[document]",):
+                continue
+            block = None
+            in_link = False
+            skip = False
+            for parent in string.parents:
+                if parent.name == "a":
+                    in_link = True
+                if _is_boilerplate_container(parent):
+                    skip = True
+                    break
+                if block is None and parent.name in _BLOCK_TAGS:
+                    block = parent
+            if skip or block is None:
+                continue
+            key = id(block)
+            entry = blocks.get(key)
+            if entry is None:
+                entry = blocks[key] = [block.name, [], 0, 0]
+                order.append(key)
+            entry[1].append(text)
+            entry[2] += len(text)
+            if in_link:
+                entry[3] += len(text)
+
+        candidates = []
+        for key in order:
+            name, parts, total, link_chars = blocks[key]
+            if total == 0:
+                continue
+            line = " ".join(parts)
+            candidates.append((name, line, _classify_block(name, line, total, link_chars)))
+
+        classes = _resolve_block_classes(
+            [cls for _, _, cls in candidates],
+            [int(name[1]) if name in _HEADING_TAGS else 0 for name, _, _ in candidates],
+        )
+        lines = [
+            line
+            for (name, line, _), cls in zip(candidates, classes, strict=True)
+            if cls == "good" or name == "h1"
+        ]
+        return "\n".join(lines)
+    except Exception:
+        return _extract_text(soup)
+
+
+def strip_repeated_lines(texts: list[str], min_pages: int = 3, max_ratio: float = 0.6) -> list[str]:
+    """Elimina líneas que se repiten en la mayoría de páginas de un mismo crawl.
+
+    Cabeceras, menús, banners y pies que sobreviven a la extracción aparecen en casi
+    todas las páginas. Se conserva su primera aparición y se eliminan del resto.
+    Con menos de `min_pages` páginas no hay señal suficiente y se devuelve tal cual.
+    """
+    if len(texts) < min_pages:
+        return texts
+    counts: dict[str, int] = {}
+    for text in texts:
+        for line in set((text or "").splitlines()):
+            if line:
+                counts[line] = counts.get(line, 0) + 1
+    threshold = max(2, int(len(texts) * max_ratio + 0.5))
+    repeated = {line for line, n in counts.items() if n >= threshold}
+    if not repeated:
+        return texts
+
+    seen: set[str] = set()
+    result: list[str] = []
+    for text in texts:
+        kept: list[str] = []
+        for line in (text or "").splitlines():
+            if line in repeated:
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+        result.append("\n".join(kept))
+    return result
+
+
 def _get_base_host(url: str) -> str:
     """Obtiene el host base (sin www) en minúsculas para comparaciones."""
     try:
@@ -237,11 +469,25 @@ class Scraper:
     Initializes the Scraper with a URL.
     :param url: The URL to scrape.
     :param accept_language: Optional override for Accept-Language header.
+    :param deadline: Optional request-scoped deadline; fetch timeouts shrink to it.
+    :param flow: Optional user/request identity for the global fair fetch scheduler.
     """
 
-    def __init__(self, url: str, accept_language: str | None = None):
+    def __init__(
+        self,
+        url: str,
+        accept_language: str | None = None,
+        deadline: Deadline | None = None,
+        flow: FetchFlow | None = None,
+    ):
         self.url = url
         self.accept_language = accept_language
+        self.deadline = deadline
+        self.flow = flow or FetchFlow()
+        # Bytes en el cable vs. tras descomprimir del último fetch (br/zstd/gzip)
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.content_encoding = "identity"
 
     """
   Fetches the HTML content from the URL.
@@ -250,6 +496,32 @@ class Scraper:
   """
 
     async def fetch(self):
+        with tracing.span("scraper.fetch", {"url.full": self.url}) as current:
+            html = await self._gated(self._fetch_html)
+            tracing.set_attributes(
+                current,
+                {
+                    "scraper.wire_bytes": self.wire_bytes,
+                    "scraper.decoded_bytes": self.decoded_bytes,
+                    "http.response.header.content-encoding": self.content_encoding,
+                },
+            )
+            return html
+
+    async def fetch_stream(self, on_chunk, max_bytes: int) -> None:
+        """Descarga la URL en streaming entregando cada bloque a `on_chunk`.
+
+        Pasa por las mismas salvaguardas que `fetch` (SSRF, circuit breaker,
+        concurrencia por host y planificador global). Deja de leer al superar
+        `max_bytes` o cuando `on_chunk` devuelve False.
+        """
+
+        async def _consume(host: str) -> None:
+            await self._stream(host, on_chunk, max_bytes)
+
+        await self._gated(_consume)
+
+    async def _gated(self, fetcher):
         # Validación simple para evitar SSRF hacia IPs/hosts internos
         if not _is_http_url(self.url):
             raise Exception(f"Invalid URL scheme or host: {self.url}")
@@ -257,19 +529,135 @@ class Scraper:
         if _is_private_ip(parsed.hostname or ""):
             raise Exception(f"Blocked private/loopback host: {parsed.hostname}")
 
+        host = (parsed.hostname or "").lower()
+        # Circuit breaker: si el host está caído, fallar en milisegundos
+        try:
+            host_health.check(host)
+        except HostUnavailableError as e:
+            raise Exception(f"Error fetching {self.url}: {e}") from e
+
+        # Ventana adaptativa por host (AIMD): esperar hueco sin exceder el deadline
+        wait_timeout = self.deadline.remaining() if self.deadline is not None else None
+        try:
+            await host_concurrency.acquire(host, timeout=wait_timeout)
+        except TimeoutError as e:
+            raise DeadlineExceeded(f"Request deadline exceeded waiting to fetch {self.url}") from e
+        try:
+            # Presupuesto global del worker, repartido round-robin entre peticiones/usuarios
+            wait_timeout = self.deadline.remaining() if self.deadline is not None else None
+            try:
+                await fetch_scheduler.acquire(self.flow, timeout=wait_timeout)
+            except TimeoutError as e:
+                raise DeadlineExceeded(
+                    f"Request deadline exceeded waiting to fetch {self.url}"
+                ) from e
+            try:
+                return await fetcher(host)
+            finally:
+                fetch_scheduler.release()
+        finally:
+            host_concurrency.release(host)
+
+    async def _fetch_html(self, host: str) -> str:
+        chunks: list[bytes] = []
+
+        def _collect(chunk: bytes) -> None:
+            chunks.append(chunk)
+
+        response = await self._stream(host, _collect, None)
+        return b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+
+    async def _stream(self, host: str, on_chunk, max_bytes: int | None) -> httpx.Response:
+        # Recortar el timeout al presupuesto restante de la petición
+        timeout = remaining_or(self.deadline, SCRAPER_DEFAULT_TIMEOUT)
+        if timeout <= 0:
+            raise DeadlineExceeded(f"Request deadline exceeded before fetching {self.url}")
+        clamped = timeout < SCRAPER_DEFAULT_TIMEOUT
+
         headers = get_base_headers(self.accept_language)
 
-        async with httpx.AsyncClient() as client:
+        # El transporte resuelve vía caché DNS, valida todas las IPs y fija la conexión
+        async with httpx.AsyncClient(transport=build_transport()) as client:
+            started = time.monotonic()
             try:
-                response = await client.get(
+                async with client.stream(
+                    "GET",
                     self.url,
                     headers=headers,
-                    timeout=SCRAPER_DEFAULT_TIMEOUT,
+                    timeout=timeout,
                     follow_redirects=True,
-                )
-                response.raise_for_status()
-                return response.text
-            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                ) as response:
+                    host_concurrency.record_response(
+                        host,
+                        response.status_code,
+                        time.monotonic() - started,
+                        response.headers.get("Retry-After"),
+                    )
+                    if is_host_failure_status(response.status_code):
+                        host_health.record_failure(host)
+                    else:
+                        host_health.record_success(host)
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError as e:
+                        raise Exception(f"Error fetching {self.url}: {e}") from e
+
+                    # Sin límite del llamador, superar el tope decodificado es un error
+                    # (posible bomba de descompresión); con límite, se trunca
+                    limit = SCRAPER_MAX_DECODED_BYTES
+                    if max_bytes is not None:
+                        limit = min(max_bytes, limit)
+                    self.content_encoding = response.headers.get("Content-Encoding", "identity")
+                    # Se descomprime el cuerpo crudo con un decoder acotado: nunca produce
+                    # más de `limit` bytes aunque un bloque del wire se infle muchísimo
+                    try:
+                        decoder = BoundedDecoder(self.content_encoding, limit)
+                    except UnsupportedEncodingError as e:
+                        raise Exception(f"Error fetching {self.url}: {e}") from e
+                    try:
+                        async for raw in response.aiter_raw():
+                            try:
+                                chunk = decoder.decode(raw)
+                            except Exception as e:
+                                raise Exception(
+                                    f"Error fetching {self.url}: cannot decode "
+                                    f"{self.content_encoding} body: {e}"
+                                ) from e
+                            if decoder.exceeded and max_bytes is None:
+                                raise Exception(
+                                    f"Error fetching {self.url}: decoded body exceeds "
+                                    f"{limit} bytes"
+                                )
+                            if chunk and on_chunk(chunk) is False:
+                                break
+                            if decoder.total >= limit:
+                                break
+                    finally:
+                        self.wire_bytes = response.num_bytes_downloaded
+                        self.decoded_bytes = decoder.total
+                        if SCRAPER_LOG_VERBOSE:
+                            logger.debug(
+                                "Fetched %s: %d wire bytes, %d decoded (%s)",
+                                self.url,
+                                self.wire_bytes,
+                                self.decoded_bytes,
+                                self.content_encoding,
+                            )
+                    return response
+            except httpx.TimeoutException as e:
+                # Si el timeout lo impuso el deadline, no es culpa del host
+                if clamped:
+                    raise DeadlineExceeded(
+                        f"Request deadline exceeded while fetching {self.url}"
+                    ) from e
+                host_concurrency.record_error(host)
+                host_health.record_failure(host)
+                raise Exception(f"Error fetching {self.url}: {e}") from e
+            except httpx.RequestError as e:
+                # Hosts bloqueados por SSRF no cuentan como caída del sitio
+                if not isinstance(e.__cause__, BlockedHostError):
+                    host_concurrency.record_error(host)
+                    host_health.record_failure(host)
                 raise Exception(f"Error fetching {self.url}: {e}") from e
 
     """
@@ -279,13 +667,23 @@ class Scraper:
   """
 
     async def get_content(self):
+        # Un span por página: cada tarea de get_all_details queda como hijo de la petición
+        with tracing.span("scraper.get_content", {"url.full": self.url}):
+            return await self._get_content()
+
+    async def _get_content(self):
 
-        html = await self.fetch()
+        with metrics.time_stage("fetch"):
+            html = await self.fetch()
+        parse_started = time.perf_counter()
         soup = BeautifulSoup(html, "html.parser")
 
         title = _extract_title(soup)
         _clean_soup(soup)
-        text = _extract_text(soup)
+        if SCRAPER_EXTRACT_MODE == "main":
+            text = _extract_main_text(soup)
+        else:
+            text = _extract_text(soup)
 
         base_host = _get_base_host(self.url)
         links = _collect_links(soup, self.url, base_host)
@@ -294,6 +692,7 @@ class Scraper:
 
         all_links = list(links)
         info_links, social_links = _filter_social_media_links(all_links, base_host)
+        metrics.observe_stage("parse", time.perf_counter() - parse_started)
 
         if SCRAPER_LOG_VERBOSE:
             logger.debug("Después del filtrado:")
@@ -315,4 +714,7 @@ class Scraper:
             "info_links": info_links,
             "social_links": social_links,
             "all_links": all_links,
+            "fingerprint": page_fingerprint(self.url, text),
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes,
         }
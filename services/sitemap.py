@@ -0,0 +1,256 @@
+import json
+import zlib
+from urllib.parse import urlparse
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import httpx
+
+from services.common.config import (
+    SCRAPER_LOG_VERBOSE,
+    SCRAPER_SITEMAP_CACHE_TTL,
+    SCRAPER_SITEMAP_MAX_BYTES,
+    SCRAPER_SITEMAP_MAX_CHILDREN,
+    SCRAPER_SITEMAP_MAX_LINKS,
+    SCRAPER_SITEMAP_MAX_URLS,
+    SCRAPER_SITEMAP_PATHS,
+)
+from services.common.deadline import Deadline, DeadlineExceeded
+from services.http.fetch_scheduler import FetchFlow
+from services.logging.dev_logger import get_logger
+from services.observability import metrics, tracing
+from services.redis.redis_client import redis_client
+from services.scraper import (
+    Scraper,
+    _get_base_host,
+    _is_http_url,
+    _is_irrelevant_link,
+    _is_private_ip,
+    _normalize_url,
+    _score_link,
+)
+
+logger = get_logger(__name__)
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag: str) -> str:
+    # "{http://www.sitemaps.org/schemas/sitemap/0.9}loc" -> "loc"
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+class SitemapParser:
+    """Parser incremental de sitemaps (urlset o sitemapindex).
+
+    Se alimenta con bloques de bytes según llegan de la red; descomprime gzip
+    al vuelo y deja de aceptar datos al superar `max_bytes` descomprimidos o
+    `max_urls` entradas, de modo que un sitemap enorme nunca se carga entero.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SCRAPER_SITEMAP_MAX_BYTES,
+        max_urls: int = SCRAPER_SITEMAP_MAX_URLS,
+    ):
+        self.max_bytes = max_bytes
+        self.max_urls = max_urls
+        self.urls: list[str] = []
+        self.sitemaps: list[str] = []
+        self.is_index = False
+        self.done = False
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._inflater = None
+        self._sniffed = False
+        self._received = 0
+        self._root_seen = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Procesa un bloque; devuelve False cuando no hace falta seguir leyendo."""
+        if self.done or not chunk:
+            return not self.done
+        if not self._sniffed:
+            self._sniffed = True
+            if chunk[:2] == _GZIP_MAGIC:
+                self._inflater = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        try:
+            if self._inflater is not None:
+                # Limitar la salida para que una "bomba" gzip no crezca sin control
+                data = self._inflater.decompress(
+                    self._inflater.unconsumed_tail + chunk, self.max_bytes - self._received + 1
+                )
+            else:
+                data = chunk
+            data = data[: self.max_bytes - self._received]
+            self._received += len(data)
+            self._parser.feed(data)
+            self._drain()
+        except (ParseError, zlib.error):
+            # Documento corrupto o truncado: conservar lo ya extraído
+            self.done = True
+        if self._received >= self.max_bytes:
+            self.done = True
+        return not self.done
+
+    def _drain(self) -> None:
+        for event, elem in self._parser.read_events():
+            name = _local_name(elem.tag)
+            if event == "start":
+                if not self._root_seen:
+                    self._root_seen = True
+                    self.is_index = name == "sitemapindex"
+                continue
+            if name == "loc":
+                loc = (elem.text or "").strip()
+                if loc:
+                    (self.sitemaps if self.is_index else self.urls).append(loc)
+                if len(self.urls) + len(self.sitemaps) >= self.max_urls:
+                    self.done = True
+                    return
+            elif name in ("url", "sitemap"):
+                # Liberar memoria de entradas ya procesadas
+                elem.clear()
+
+
+def select_sitemap_links(
+    urls: list[str], base_url: str, limit: int = SCRAPER_SITEMAP_MAX_LINKS
+) -> list[str]:
+    """Filtra URLs del sitemap a enlaces internos útiles y devuelve las mejor puntuadas."""
+    base_host = _get_base_host(base_url)
+    landing = _normalize_url(base_url)
+    seen: set[str] = set()
+    candidates: list[str] = []
+    for url in urls:
+        if not _is_http_url(url):
+            continue
+        host = (urlparse(url).hostname or "").lower()
+        if _is_private_ip(host):
+            continue
+        bare = host[4:] if host.startswith("www.") else host
+        # Solo el propio sitio (o subdominios); un sitemap puede listar otros dominios
+        if bare != base_host and not bare.endswith("." + base_host):
+            continue
+        if _is_irrelevant_link(url, base_host):
+            continue
+        key = _normalize_url(url)
+        if key == landing or key in seen:
+            continue
+        seen.add(key)
+        candidates.append(url)
+    # sorted es estable: a igual puntuación se respeta el orden del sitemap
+    ranked = sorted(candidates, key=lambda u: _score_link(u, base_host), reverse=True)
+    return ranked[:limit]
+
+
+def merge_info_links(info_links: list[str], sitemap_links: list[str]) -> list[str]:
+    """Añade a los enlaces de la landing los del sitemap que aún no estén presentes."""
+    merged = list(info_links)
+    seen = {_normalize_url(u) for u in info_links}
+    for url in sitemap_links:
+        key = _normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            merged.append(url)
+    return merged
+
+
+def _cache_key(host: str) -> str:
+    return f"scraper:sitemap:{host}"
+
+
+def _load_cached(host: str) -> list[str] | None:
+    try:
+        cached = redis_client.get(_cache_key(host))
+        if cached is not None:
+            parsed = json.loads(cached)
+            if isinstance(parsed, list):
+                return parsed
+    except Exception:
+        metrics.record_cache_error("sitemap")
+    return None
+
+
+def _store_cached(host: str, links: list[str]) -> None:
+    try:
+        redis_client.set(_cache_key(host), json.dumps(links), ex=SCRAPER_SITEMAP_CACHE_TTL)
+    except Exception:
+        metrics.record_cache_error("sitemap")
+
+
+async def _read_sitemap(
+    url: str,
+    accept_language: str | None,
+    deadline: Deadline | None,
+    flow: FetchFlow | None,
+) -> SitemapParser:
+    parser = SitemapParser()
+    scraper = Scraper(url, accept_language=accept_language, deadline=deadline, flow=flow)
+    # El parser corta por bytes descomprimidos; aquí se acota además lo descargado
+    await scraper.fetch_stream(parser.feed, SCRAPER_SITEMAP_MAX_BYTES)
+    return parser
+
+
+@tracing.traced("sitemap.discover")
+async def discover_sitemap_links(
+    base_url: str,
+    accept_language: str | None = None,
+    deadline: Deadline | None = None,
+    flow: FetchFlow | None = None,
+) -> list[str]:
+    """Descubre subpáginas informativas a partir del sitemap del sitio.
+
+    Prueba las rutas de `SCRAPER_SITEMAP_PATHS`; si la primera que responde es
+    un índice, sigue hasta `SCRAPER_SITEMAP_MAX_CHILDREN` sitemaps hijos. El
+    resultado se cachea por host (también la ausencia de sitemap). Nunca lanza
+    salvo `DeadlineExceeded`: un sitemap ausente o roto devuelve lista vacía.
+    """
+    parsed = urlparse(base_url)
+    host = (parsed.hostname or "").lower()
+    if not host or not parsed.scheme:
+        return []
+
+    cached = _load_cached(host)
+    metrics.record_cache("sitemap", cached is not None)
+    if cached is not None:
+        return cached
+
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    urls: list[str] = []
+    # Solo se cachea "sin sitemap" si el servidor respondió (p. ej. 404), no ante
+    # errores de red transitorios
+    answered = False
+    for path in SCRAPER_SITEMAP_PATHS:
+        try:
+            sitemap = await _read_sitemap(origin + path, accept_language, deadline, flow)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            answered = answered or isinstance(e.__cause__, httpx.HTTPStatusError)
+            if SCRAPER_LOG_VERBOSE:
+                logger.debug("Sitemap %s unavailable: %s", origin + path, e)
+            continue
+
+        answered = True
+        urls = list(sitemap.urls)
+        # Índice de sitemaps: seguir solo los hijos del mismo host
+        children = [
+            u
+            for u in sitemap.sitemaps
+            if (urlparse(u).hostname or "").lower() == host and u != origin + path
+        ]
+        for child in children[:SCRAPER_SITEMAP_MAX_CHILDREN]:
+            try:
+                urls.extend((await _read_sitemap(child, accept_language, deadline, flow)).urls)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                if SCRAPER_LOG_VERBOSE:
+                    logger.debug("Child sitemap %s unavailable: %s", child, e)
+        if urls or sitemap.sitemaps:
+            break
+
+    links = select_sitemap_links(urls, base_url)
+    if answered:
+        _store_cached(host, links)
+    if SCRAPER_LOG_VERBOSE:
+        logger.debug("Sitemap discovery for %s: %d/%d links", host, len(links), len(urls))
+    return links
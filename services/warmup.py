@@ -0,0 +1,193 @@
+"""Pre-calentamiento de cachés a partir de la popularidad en `brochure_analytics`.
+
+Consulta los dominios más pedidos en los últimos días y refresca su caché de
+detalles (`company:details:*`) con concurrencia limitada; opcionalmente genera
+también el brochure compartido por contenido (llama al LLM: tiene coste).
+
+Uso (cron en horas valle):
+    python -m services.warmup [--top 50] [--days 7] [--concurrency 4] [--brochures]
+
+O en proceso con `WARMUP_SCHEDULE_HOUR` (ver `start_warmup_scheduler`).
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+from config import settings
+from services.brochures.cache import (
+    generate_content_key,
+    get_shared_brochure,
+    store_shared_brochure,
+)
+from services.common.deadline import Deadline
+from services.db.sqlite_pool import db_connection, run_db
+from services.http.fetch_scheduler import FetchFlow
+from services.logging.dev_logger import get_logger
+from services.openai.openai_client import OpenAIClient
+from services.redis.redis_client import redis_client
+from services.scraper import Scraper
+
+logger = get_logger(__name__)
+
+# Lock diario: con varios workers solo uno ejecuta el warm-up programado
+_SCHEDULE_LOCK_KEY = "warmup:lock:{day}"
+
+
+def popular_targets(top_n: int, days: int) -> list[dict]:
+    """Combinaciones más pedidas (dominio, idioma, tipo, empresa) de los últimos `days` días.
+
+    Devuelve como mucho `top_n` dominios distintos; para cada uno, la combinación
+    más frecuente de idioma, tipo y nombre de empresa.
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT url_domain, language, brochure_type, company_name, COUNT(*) AS hits
+            FROM brochure_analytics
+            WHERE created_at >= datetime('now', ?)
+              AND url_domain NOT IN ('', 'unknown')
+              AND COALESCE(error_type, '') != 'quota_exceeded'
+            GROUP BY url_domain, language, brochure_type, company_name
+            ORDER BY hits DESC, url_domain
+            """,
+            (f"-{int(days)} days",),
+        ).fetchall()
+
+    targets: dict[str, dict] = {}
+    for row in rows:
+        domain = row["url_domain"]
+        if domain in targets:
+            targets[domain]["hits"] += row["hits"]
+            continue
+        if len(targets) >= top_n:
+            continue
+        targets[domain] = {
+            "url": f"https://{domain}",
+            "language": row["language"],
+            "brochure_type": row["brochure_type"],
+            "company_name": row["company_name"] or domain,
+            "hits": row["hits"],
+        }
+    return sorted(targets.values(), key=lambda t: t["hits"], reverse=True)
+
+
+async def _warm_brochure(client: OpenAIClient, target: dict) -> str:
+    content_key = generate_content_key(
+        target["url"], target["language"], target["brochure_type"], target["company_name"]
+    )
+    if get_shared_brochure(content_key) is not None:
+        return "fresh"
+    brochure = await client.create_brochure(
+        target["company_name"],
+        target["url"],
+        target["language"],
+        target["brochure_type"],
+        deadline=Deadline(settings.request_deadline_seconds),
+        flow=FetchFlow(user_id="warmup"),
+    )
+    if not brochure or brochure.startswith("Error:"):
+        return "failed"
+    store_shared_brochure(content_key, brochure, ttl_seconds=settings.brochure_shared_cache_ttl)
+    return "refreshed"
+
+
+async def warm_caches(
+    targets: list[dict], concurrency: int = 4, brochures: bool = False
+) -> dict[str, int]:
+    """Refresca detalles (y opcionalmente brochures) de `targets`; devuelve recuento por estado."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    summary: dict[str, int] = {}
+
+    async def warm(target: dict) -> None:
+        async with semaphore:
+            client = OpenAIClient(Scraper)
+            _, _, accept_language = client._normalize_language(target["language"])
+            status = await client.warm_details(
+                target["url"], accept_language, company_name=target["company_name"]
+            )
+            if brochures and status != "failed" and settings.brochure_shared_cache:
+                brochure_status = await _warm_brochure(client, target)
+                summary[f"brochure_{brochure_status}"] = (
+                    summary.get(f"brochure_{brochure_status}", 0) + 1
+                )
+            summary[status] = summary.get(status, 0) + 1
+            logger.info("[Warmup] %s (%d hits): %s", target["url"], target["hits"], status)
+
+    await asyncio.gather(*(warm(t) for t in targets))
+    return summary
+
+
+async def run_warmup(
+    top_n: int | None = None,
+    days: int | None = None,
+    concurrency: int | None = None,
+    brochures: bool | None = None,
+) -> dict[str, int]:
+    top_n = settings.warmup_top_n if top_n is None else top_n
+    days = settings.warmup_days if days is None else days
+    concurrency = settings.warmup_concurrency if concurrency is None else concurrency
+    brochures = settings.warmup_brochures if brochures is None else brochures
+    started = time.monotonic()
+    targets = await run_db(popular_targets, top_n, days)
+    summary = await warm_caches(targets, concurrency=concurrency, brochures=brochures)
+    logger.info(
+        "[Warmup] %d domains in %.1fs: %s", len(targets), time.monotonic() - started, summary
+    )
+    return summary
+
+
+def _seconds_until(hour: int, now: datetime.datetime | None = None) -> float:
+    now = now or datetime.datetime.now(datetime.UTC)
+    target = now.replace(hour=hour % 24, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+async def _scheduler_loop(hour: int) -> None:
+    while True:
+        await asyncio.sleep(_seconds_until(hour))
+        day = datetime.datetime.now(datetime.UTC).date().isoformat()
+        try:
+            acquired = redis_client.set(
+                _SCHEDULE_LOCK_KEY.format(day=day), "1", ex=23 * 3600, nx=True
+            )
+        except Exception:
+            # Sin Redis no hay coordinación entre workers: mejor no ejecutar N veces
+            acquired = False
+        if not acquired:
+            continue
+        try:
+            await run_warmup()
+        except Exception as e:
+            logger.warning("[Warmup] Scheduled run failed: %s", e)
+
+
+def start_warmup_scheduler() -> asyncio.Task | None:
+    """Arranca el warm-up diario a `WARMUP_SCHEDULE_HOUR` (UTC) si está configurado."""
+    hour = settings.warmup_schedule_hour
+    if hour is None:
+        return None
+    return asyncio.ensure_future(_scheduler_loop(int(hour)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=settings.warmup_top_n)
+    parser.add_argument("--days", type=int, default=settings.warmup_days)
+    parser.add_argument("--concurrency", type=int, default=settings.warmup_concurrency)
+    parser.add_argument(
+        "--brochures",
+        action="store_true",
+        default=settings.warmup_brochures,
+        help="genera también el brochure compartido (llama al LLM)",
+    )
+    args = parser.parse_args()
+    summary = asyncio.run(run_warmup(args.top, args.days, args.concurrency, args.brochures))
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
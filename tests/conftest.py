@@ -0,0 +1,23 @@
+import glob
+import os
+import sqlite3
+
+import pytest
+
+from services.db import sqlite_pool
+
+MIGRATIONS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "migrations", "*.sql")))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """SQLite temporal con las migraciones aplicadas; cierra el pool al terminar."""
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    for migration in MIGRATIONS:
+        with open(migration, encoding="utf-8") as fh:
+            conn.executescript(fh.read())
+    conn.close()
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    yield path
+    sqlite_pool.close_pools()
@@ -0,0 +1,79 @@
+import asyncio
+import sqlite3
+
+from api.v1.deps import insert_brochure_analytics, store_brochure_analytics
+from services.db import analytics_sink as sink_module
+from services.db.analytics_sink import AnalyticsSink
+from services.observability import metrics
+
+
+def _counter(outcome: str) -> float:
+    return metrics.ANALYTICS_ROWS.labels(outcome)._value.get()
+
+
+async def test_flushes_on_batch_size_and_drains_on_stop():
+    batches: list[list] = []
+    sink = AnalyticsSink(max_size=100, batch_size=3, flush_seconds=30)
+    sink.start(batches.append)
+    for i in range(7):
+        assert sink.offer(i)
+    for _ in range(50):
+        if len(batches) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+
+    await sink.stop()
+    assert batches[-1] == [6]
+    assert not sink.running
+
+
+async def test_flushes_partial_batch_after_interval():
+    batches: list[list] = []
+    sink = AnalyticsSink(max_size=100, batch_size=100, flush_seconds=0.05)
+    sink.start(batches.append)
+    sink.offer("a")
+    sink.offer("b")
+    await asyncio.sleep(0.2)
+    assert batches == [["a", "b"]]
+    await sink.stop()
+
+
+async def test_full_queue_drops_and_counts():
+    sink = AnalyticsSink(max_size=2, batch_size=10, flush_seconds=30)
+    sink.start(lambda rows: None)
+    dropped = _counter("dropped")
+    # Sin ceder el loop la tarea no consume: la tercera fila ya no cabe
+    assert [sink.offer(i) for i in range(3)] == [True, True, False]
+    assert _counter("dropped") == dropped + 1
+    await sink.stop()
+
+
+async def test_store_brochure_analytics_enqueues_and_persists(db, monkeypatch):
+    sink = AnalyticsSink(max_size=100, batch_size=50, flush_seconds=30)
+    monkeypatch.setattr(sink_module, "analytics_sink", sink)
+    monkeypatch.setattr("api.v1.deps.analytics_sink", sink)
+    sink.start(insert_brochure_analytics)
+    for success in (True, False):
+        store_brochure_analytics(
+            anon_id="a",
+            url="https://www.acme.example/about",
+            company_name="  Acme\x00 Corp ",
+            brochure_type="professional",
+            language="English",
+            success=success,
+        )
+
+    # Nada escrito hasta el volcado
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM brochure_analytics").fetchone()[0] == 0
+    await sink.stop()
+    rows = conn.execute(
+        "SELECT url_domain, company_name, success, created_at FROM brochure_analytics"
+    ).fetchall()
+    conn.close()
+    assert [r[:3] for r in rows] == [
+        ("acme.example", "Acme Corp", 1),
+        ("acme.example", "Acme Corp", 0),
+    ]
+    assert all(r[3] for r in rows)
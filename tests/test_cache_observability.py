@@ -0,0 +1,89 @@
+import httpx
+from fastapi import FastAPI
+
+import services.brochures.cache as cache_module
+from api.v1.admin import router as admin_router
+from config import settings
+from services.brochures.cache import get_brochure_payload, store_brochure
+from services.observability.cache_report import classify_key, sample_keys
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.ttls[key] = ex if ex is not None else -1
+
+    def scan_iter(self, count=None):
+        return iter(list(self.store))
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def type(self, key):
+        self.calls.append("string")
+
+    def strlen(self, key):
+        self.calls.append(len(self.redis.store[key]))
+
+    def ttl(self, key):
+        self.calls.append(self.redis.ttls[key])
+
+    def getrange(self, key, start, end):
+        self.calls.append(self.redis.store[key][start : end + 1])
+
+    def memory_usage(self, key):
+        self.calls.append(len(self.redis.store[key]) + 50)
+
+    def execute(self):
+        return self.calls
+
+
+def test_classify_keys_by_namespace():
+    assert classify_key("a" * 64) == "brochure"
+    assert classify_key("brochure:content:" + "b" * 64) == "brochure_shared"
+    assert classify_key("company:details:acme.com:al:en-US") == "details"
+    assert classify_key("company:details:acme.com:al:en-US:neg") == "details_negative"
+    assert classify_key("scraper:sitemap:acme.com") == "sitemap"
+    assert classify_key("something-else") == "other"
+
+
+async def test_cache_stats_report_hits_sizes_and_compression(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(cache_module, "redis_client", fake)
+    monkeypatch.setattr(settings, "cache_compress", True)
+    monkeypatch.setattr(settings, "cache_compress_min_bytes", 1024)
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+
+    key = "c" * 64
+    store_brochure(key, "<p>repetitive brochure</p>" * 400, {"url": "x"}, "1.1.1.1")
+    assert get_brochure_payload(key)["data"] == {"url": "x"}
+    assert get_brochure_payload("d" * 64) is None
+    fake.set("e" * 64, "{not json")
+    assert get_brochure_payload("e" * 64) is None
+
+    sampled = sample_keys(client=fake, sample=10)
+    assert sampled["brochure"]["keys"] == 2
+    assert sampled["brochure"]["compressed_fraction"] == 0.5
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/admin/cache/stats", headers={"X-Admin-Token": "s3cret"})
+    stats = response.json()["metrics"]["brochure"]
+    assert stats["hit"] >= 2 and stats["miss"] >= 1 and stats["error"] >= 1
+    assert 0 < stats["compression_ratio"] < 0.5
+    assert stats["codec_ms"]["compress"]["count"] >= 1
@@ -0,0 +1,81 @@
+import gzip
+import time
+
+import httpx
+import pytest
+
+from services.http.cassette import Cassette, CassetteTransport
+
+
+def _live_site() -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/old":
+            return httpx.Response(301, headers={"Location": "/about"})
+        if request.url.path == "/about":
+            return httpx.Response(
+                200,
+                content=gzip.compress(b"<h1>About Acme</h1>"),
+                headers={"Content-Encoding": "gzip", "Content-Type": "text/html"},
+            )
+        return httpx.Response(404, text="missing")
+
+    return httpx.MockTransport(handler)
+
+
+async def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "site.jsonl.gz")
+    recorder = CassetteTransport(Cassette(path), mode="record", inner=_live_site())
+    async with httpx.AsyncClient(transport=recorder) as client:
+        live = await client.get("https://acme.example/old", follow_redirects=True)
+    assert live.text == "<h1>About Acme</h1>"
+
+    # Un cassette nuevo sobre el mismo archivo: cada salto grabado por separado
+    cassette = Cassette(path)
+    assert len(cassette) == 2
+    replayer = CassetteTransport(cassette, mode="replay")
+    async with httpx.AsyncClient(transport=replayer) as client:
+        replayed = await client.get("https://acme.example/old", follow_redirects=True)
+        assert replayed.status_code == 200
+        assert replayed.text == live.text
+        assert replayed.headers["Content-Encoding"] == "gzip"
+        with pytest.raises(httpx.ConnectError, match="No recorded response"):
+            await client.get("https://acme.example/contact")
+
+
+async def test_replay_simulates_recorded_latency(tmp_path):
+    path = str(tmp_path / "slow.jsonl.gz")
+    cassette = Cassette(path)
+    cassette.append(
+        {
+            "method": "GET",
+            "url": "https://acme.example/",
+            "status": 200,
+            "headers": [["Content-Type", "text/html"]],
+            "body": "",
+            "elapsed": 0.2,
+        }
+    )
+    transport = CassetteTransport(Cassette(path), mode="replay", latency_scale=0.5)
+    async with httpx.AsyncClient(transport=transport) as client:
+        started = time.monotonic()
+        await client.get("https://acme.example/")
+    assert time.monotonic() - started >= 0.09
+
+
+def test_truncated_archive_keeps_complete_members(tmp_path):
+    path = tmp_path / "cut.jsonl.gz"
+    cassette = Cassette(str(path))
+    for i in range(3):
+        cassette.append(
+            {
+                "method": "GET",
+                "url": f"https://acme.example/{i}",
+                "status": 200,
+                "headers": [],
+                "body": "",
+                "elapsed": 0.0,
+            }
+        )
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])
+    assert 1 <= len(Cassette(str(path))) < 3
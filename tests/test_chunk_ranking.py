@@ -0,0 +1,48 @@
+from services.openai.chunk_ranking import chunk_text, pack_ranked_chunks, score_chunks
+
+
+def test_chunk_text_respects_max_chars_and_lines():
+    text = "\n".join(f"line number {i} with some words" for i in range(100))
+    chunks = chunk_text(text, max_chars=200)
+    assert all(len(c) <= 200 for c in chunks)
+    assert "\n".join(chunks).splitlines() == text.splitlines()
+    # Líneas sin saltos más largas que el máximo se cortan
+    assert all(len(c) <= 50 for c in chunk_text("x" * 175, max_chars=50))
+
+
+def test_score_prefers_company_profile_chunks():
+    chunks = [
+        "Football results and holiday recipes from the office party.",
+        "About us: Acme was founded in 2012. Our team and mission.",
+        "Contact us by email or phone at our Madrid offices.",
+    ]
+    scores = score_chunks(chunks, "acme about team contact email phone")
+    assert scores[0] < scores[1] and scores[0] < scores[2]
+
+
+def test_pack_keeps_relevant_chunks_in_original_order():
+    filler = "\n".join("weather travel tips and football results." for _ in range(40))
+    pages = [
+        ("landing", "Acme Robotics builds warehouse robots."),
+        ("info", filler),
+        (
+            "info",
+            "About Acme Robotics: founded in Madrid, 240 employees.\nContact: sales@acme.example",
+        ),
+    ]
+    packed = pack_ranked_chunks(
+        pages, budget=300, company_name="Acme Robotics", max_chunk_chars=120
+    )
+
+    assert [idx for idx, _ in packed][0] == 0
+    joined = "\n".join(text for _, text in packed)
+    assert "founded in Madrid" in joined
+    assert "sales@acme.example" in joined
+    assert len(joined) <= 300
+    # Orden original por página
+    assert [idx for idx, _ in packed] == sorted(idx for idx, _ in packed)
+
+
+def test_pack_returns_everything_when_within_budget():
+    pages = [("landing", "a b c"), ("info", "d e f")]
+    assert pack_ranked_chunks(pages, budget=1000) == [(0, "a b c"), (1, "d e f")]
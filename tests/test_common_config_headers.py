@@ -39,3 +39,12 @@ def test_get_base_headers_contains_expected_keys():
         assert key in headers
     # User-Agent debe parecerse a un navegador moderno
     assert "Mozilla/5.0" in headers["User-Agent"]
+
+
+def test_get_base_headers_negotiates_installed_encodings():
+    encodings = [e.strip() for e in get_base_headers(None)["Accept-Encoding"].split(",")]
+    # gzip/deflate siempre; br/zstd solo si httpx puede decodificarlos
+    assert {"gzip", "deflate"} <= set(encodings)
+    for optional, module in (("br", "brotli"), ("zstd", "zstandard")):
+        if optional in encodings:
+            __import__(module)
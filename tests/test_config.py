@@ -6,15 +6,23 @@ from config import Settings
 def test_env_aliases_and_parsing(monkeypatch):
     # OpenAI API
     monkeypatch.setenv("OPENAI_API_KEY", "sk-test-123")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://localhost:8001/v1")
+    monkeypatch.setenv("MOCK_LLM", "true")
+    monkeypatch.setenv("MOCK_LLM_LATENCY", "fixed:10")
+    monkeypatch.setenv("MOCK_LLM_ERROR_RATE", "0.25")
 
     # Brochures quota
     monkeypatch.setenv("MAX_BROCHURES_PER_USER", "5")
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
 
     # App environment flags
     monkeypatch.setenv("DEV_MODE", "false")
     monkeypatch.setenv("FILE_LOGGING", "true")
     monkeypatch.setenv("TRUST_PROXY", "true")
 
+    # Request deadline
+    monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "90")
+
     # Rate limiting
     monkeypatch.setenv("RATE_LIMIT_MAX_PER_MINUTE", "15")
     monkeypatch.setenv("RATE_LIMIT_WINDOW_SECONDS", "120")
@@ -24,24 +32,64 @@ def test_env_aliases_and_parsing(monkeypatch):
     monkeypatch.setenv("PLAYWRIGHT_PDF_TIMEOUT_MS", "45000")
     monkeypatch.setenv("PLAYWRIGHT_DISABLE_JS", "false")
 
-    # Scraper headers
+    # Scraper headers and global fetch budget
     monkeypatch.setenv("SCRAPER_ACCEPT_LANGUAGE", "es-ES,es;q=0.9")
+    monkeypatch.setenv("SCRAPER_MAX_IN_FLIGHT", "64")
+    monkeypatch.setenv("SCRAPER_EXTRACT_MODE", "main")
+
+    # Details ranking
+    monkeypatch.setenv("DETAILS_RANKING", "false")
+    monkeypatch.setenv("DETAILS_CACHE_SOFT_TTL", "600")
+    monkeypatch.setenv("DETAILS_CACHE_HARD_TTL", "7200")
+    monkeypatch.setenv("WARMUP_TOP_N", "20")
+    monkeypatch.setenv("WARMUP_DAYS", "3")
+    monkeypatch.setenv("WARMUP_CONCURRENCY", "2")
+    monkeypatch.setenv("WARMUP_BROCHURES", "true")
+    monkeypatch.setenv("WARMUP_SCHEDULE_HOUR", "4")
+    monkeypatch.setenv("SQLITE_POOL_SIZE", "8")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "2500")
+    monkeypatch.setenv("ANALYTICS_WRITE_BEHIND", "false")
+    monkeypatch.setenv("ANALYTICS_QUEUE_SIZE", "500")
+    monkeypatch.setenv("ANALYTICS_BATCH_SIZE", "20")
+    monkeypatch.setenv("ANALYTICS_FLUSH_SECONDS", "0.5")
+    monkeypatch.setenv("SCRAPER_SITEMAP_DISCOVERY", "true")
+    monkeypatch.setenv("SCRAPER_SPECULATIVE_PREFETCH", "true")
+    monkeypatch.setenv("SCRAPER_SPECULATIVE_PATHS", "/about,/kontakt")
+    monkeypatch.setenv("SCRAPER_CASSETTE_MODE", "replay")
+    monkeypatch.setenv("SCRAPER_CASSETTE_PATH", "/tmp/sites.jsonl.gz")
+    monkeypatch.setenv("SCRAPER_CASSETTE_LATENCY", "0.5")
 
     # Cache compression
     monkeypatch.setenv("CACHE_COMPRESS", "true")
     monkeypatch.setenv("CACHE_COMPRESSION_ALGO", "gzip")
     monkeypatch.setenv("CACHE_COMPRESS_MIN_BYTES", "2048")
+    monkeypatch.setenv("BROCHURE_SHARED_CACHE", "false")
+    monkeypatch.setenv("BROCHURE_SHARED_CACHE_TTL", "7200")
+
+    # Observability
+    monkeypatch.setenv("METRICS_ENABLED", "false")
+    monkeypatch.setenv("TRACING_ENABLED", "true")
+    monkeypatch.setenv("TRACING_SAMPLE_RATIO", "0.5")
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://collector:4318")
+    monkeypatch.setenv("OTEL_SERVICE_NAME", "brochures-test")
 
     s = Settings()
 
     assert s.openai_api_key == "sk-test-123"
+    assert s.openai_base_url == "http://localhost:8001/v1"
+    assert s.mock_llm is True
+    assert s.mock_llm_latency == "fixed:10"
+    assert s.mock_llm_error_rate == 0.25
     assert s.max_brochures_per_user == 5
+    assert s.admin_token == "admin-secret"
 
     # Booleans parsed correctly
     assert s.dev_mode is False
     assert s.file_logging is True
     assert s.trust_proxy is True
 
+    assert s.request_deadline_seconds == 90
+
     # Rate limiting values
     assert s.rate_limit_max_per_minute == 15
     assert s.rate_limit_window_seconds == 120
@@ -53,11 +101,42 @@ def test_env_aliases_and_parsing(monkeypatch):
 
     # Scraper header default/override
     assert s.scraper_accept_language.startswith("es-ES")
+    assert s.scraper_max_in_flight == 64
+    assert s.scraper_extract_mode == "main"
+
+    assert s.details_ranking is False
+    assert s.details_cache_soft_ttl == 600
+    assert s.details_cache_hard_ttl == 7200
+    assert s.warmup_top_n == 20
+    assert s.warmup_days == 3
+    assert s.warmup_concurrency == 2
+    assert s.warmup_brochures is True
+    assert s.warmup_schedule_hour == 4
+    assert s.sqlite_pool_size == 8
+    assert s.sqlite_busy_timeout_ms == 2500
+    assert s.analytics_write_behind is False
+    assert s.analytics_queue_size == 500
+    assert s.analytics_batch_size == 20
+    assert s.analytics_flush_seconds == 0.5
+    assert s.scraper_sitemap_discovery is True
+    assert s.scraper_speculative_prefetch is True
+    assert s.scraper_speculative_paths == "/about,/kontakt"
+    assert s.scraper_cassette_mode == "replay"
+    assert s.scraper_cassette_path == "/tmp/sites.jsonl.gz"
+    assert s.scraper_cassette_latency == 0.5
 
     # Cache compression settings
     assert s.cache_compress is True
     assert s.cache_compression_algo == "gzip"
     assert s.cache_compress_min_bytes == 2048
+    assert s.brochure_shared_cache is False
+    assert s.brochure_shared_cache_ttl == 7200
+
+    assert s.metrics_enabled is False
+    assert s.tracing_enabled is True
+    assert s.tracing_sample_ratio == 0.5
+    assert s.otel_exporter_otlp_endpoint == "http://collector:4318"
+    assert s.otel_service_name == "brochures-test"
 
 
 class EphemeralSettings(Settings):
@@ -69,9 +148,15 @@ def test_defaults_when_env_missing(monkeypatch):
     # Ensure env vars are absent to validate defaults
     for key in [
         "OPENAI_API_KEY",
+        "OPENAI_BASE_URL",
+        "MOCK_LLM",
+        "MOCK_LLM_LATENCY",
+        "MOCK_LLM_ERROR_RATE",
         "MAX_BROCHURES_PER_USER",
+        "ADMIN_TOKEN",
         "DEV_MODE",
         "FILE_LOGGING",
+        "REQUEST_DEADLINE_SECONDS",
         "RATE_LIMIT_MAX_PER_MINUTE",
         "RATE_LIMIT_WINDOW_SECONDS",
         "TRUST_PROXY",
@@ -79,17 +164,52 @@ def test_defaults_when_env_missing(monkeypatch):
         "PLAYWRIGHT_PDF_TIMEOUT_MS",
         "PLAYWRIGHT_DISABLE_JS",
         "SCRAPER_ACCEPT_LANGUAGE",
+        "SCRAPER_MAX_IN_FLIGHT",
+        "SCRAPER_EXTRACT_MODE",
+        "DETAILS_RANKING",
+        "DETAILS_CACHE_SOFT_TTL",
+        "DETAILS_CACHE_HARD_TTL",
+        "WARMUP_TOP_N",
+        "WARMUP_DAYS",
+        "WARMUP_CONCURRENCY",
+        "WARMUP_BROCHURES",
+        "WARMUP_SCHEDULE_HOUR",
+        "SQLITE_POOL_SIZE",
+        "SQLITE_BUSY_TIMEOUT_MS",
+        "ANALYTICS_WRITE_BEHIND",
+        "ANALYTICS_QUEUE_SIZE",
+        "ANALYTICS_BATCH_SIZE",
+        "ANALYTICS_FLUSH_SECONDS",
+        "SCRAPER_SITEMAP_DISCOVERY",
+        "SCRAPER_SPECULATIVE_PREFETCH",
+        "SCRAPER_SPECULATIVE_PATHS",
+        "SCRAPER_CASSETTE_MODE",
+        "SCRAPER_CASSETTE_PATH",
+        "SCRAPER_CASSETTE_LATENCY",
         "CACHE_COMPRESS",
         "CACHE_COMPRESSION_ALGO",
         "CACHE_COMPRESS_MIN_BYTES",
+        "BROCHURE_SHARED_CACHE",
+        "BROCHURE_SHARED_CACHE_TTL",
+        "METRICS_ENABLED",
+        "TRACING_ENABLED",
+        "TRACING_SAMPLE_RATIO",
+        "OTEL_EXPORTER_OTLP_ENDPOINT",
+        "OTEL_SERVICE_NAME",
     ]:
         monkeypatch.delenv(key, raising=False)
 
     s = EphemeralSettings()
 
     assert s.max_brochures_per_user == 3
+    assert s.admin_token is None
+    assert s.openai_base_url is None
+    assert s.mock_llm is False
+    assert s.mock_llm_latency == "lognormal:1500:0.5"
+    assert s.mock_llm_error_rate == 0.0
     assert s.dev_mode is True
     assert s.file_logging is False
+    assert s.request_deadline_seconds == 150
     assert s.rate_limit_max_per_minute == 10
     assert s.rate_limit_window_seconds == 60
     assert s.trust_proxy is False
@@ -97,6 +217,34 @@ def test_defaults_when_env_missing(monkeypatch):
     assert s.playwright_pdf_timeout_ms == 30000
     assert s.playwright_disable_js is True
     assert s.scraper_accept_language == "en-US,en;q=0.9"
+    assert s.scraper_max_in_flight == 32
+    assert s.scraper_extract_mode == "full"
+    assert s.details_ranking is True
+    assert s.details_cache_soft_ttl == 3600
+    assert s.details_cache_hard_ttl == 21600
+    assert s.warmup_top_n == 50
+    assert s.warmup_days == 7
+    assert s.warmup_concurrency == 4
+    assert s.warmup_brochures is False
+    assert s.warmup_schedule_hour is None
+    assert s.sqlite_pool_size == 4
+    assert s.sqlite_busy_timeout_ms == 5000
+    assert s.analytics_write_behind is True
+    assert s.analytics_queue_size == 10000
+    assert s.analytics_batch_size == 100
+    assert s.analytics_flush_seconds == 1.0
+    assert s.scraper_sitemap_discovery is False
+    assert s.scraper_speculative_prefetch is False
+    assert s.scraper_speculative_paths.startswith("/about,/about-us")
+    assert s.scraper_cassette_mode == "off"
+    assert s.scraper_cassette_latency == 0.0
     assert s.cache_compress is False
     assert s.cache_compression_algo == "gzip"
     assert s.cache_compress_min_bytes == 10240
+    assert s.brochure_shared_cache is True
+    assert s.brochure_shared_cache_ttl == 86400
+    assert s.metrics_enabled is True
+    assert s.tracing_enabled is False
+    assert s.tracing_sample_ratio == 0.05
+    assert s.otel_exporter_otlp_endpoint == "http://localhost:4318"
+    assert s.otel_service_name == "brochuresai-api"
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from services.common.deadline import Deadline, DeadlineExceeded, remaining_or
+from services.openai.openai_client import OpenAIClient
+
+
+def test_clamp_and_remaining():
+    d = Deadline(5)
+    assert 0 < d.remaining() <= 5
+    assert d.clamp(10) <= 5
+    assert d.clamp(1) == 1
+    assert d.clamp(10, reserve=10) == 0
+    assert not d.expired()
+
+
+def test_unbounded_deadline_and_remaining_or():
+    assert Deadline(None).remaining() == float("inf")
+    assert remaining_or(None, 10) == 10
+    assert remaining_or(Deadline(0), 10) == 0
+
+
+def test_check_raises_when_expired():
+    with pytest.raises(DeadlineExceeded):
+        Deadline(0).check("scrape")
+
+
+class _SlowSubpageScraper:
+    """Landing inmediata con dos subpáginas: una rápida y otra que nunca termina a tiempo."""
+
+    def __init__(self, url, accept_language=None, deadline=None, flow=None):
+        self.url = url
+
+    async def get_content(self):
+        if self.url.endswith("/slow"):
+            await asyncio.sleep(10)
+        if self.url == "https://deadline.example":
+            return {
+                "text": "landing",
+                "info_links": ["https://deadline.example/fast", "https://deadline.example/slow"],
+                "social_links": [],
+            }
+        return {"text": f"content of {self.url}"}
+
+
+async def test_get_all_details_returns_partial_details_on_deadline(monkeypatch):
+    monkeypatch.setattr("services.openai.openai_client.DEADLINE_LLM_RESERVE_SECONDS", 0)
+    client = OpenAIClient(_SlowSubpageScraper)
+
+    result = await client.get_all_details("https://deadline.example", deadline=Deadline(0.2))
+
+    assert "content of https://deadline.example/fast" in result["details"]
+    assert "/slow" not in result["details"]
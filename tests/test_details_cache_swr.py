@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+
+import services.openai.openai_client as openai_client_module
+from services.openai.openai_client import OpenAIClient, _details_freshness
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+class _FixedRng:
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+crawls: list[str] = []
+
+
+class _Scraper:
+    def __init__(self, url, accept_language=None, deadline=None, flow=None):
+        self.url = url
+
+    async def get_content(self):
+        crawls.append(self.url)
+        await asyncio.sleep(0.01)
+        return {"text": "Fresh details", "info_links": [], "social_links": []}
+
+
+def test_freshness_soft_ttl_and_xfetch(monkeypatch):
+    monkeypatch.setattr(openai_client_module, "DETAILS_CACHE_SOFT_TTL", 100)
+    entry = {"details": "x", "stored_at": 1000.0, "delta": 5.0}
+    assert _details_freshness(entry, now=1010.0, rng=_FixedRng(0.5)) == "fresh"
+    assert _details_freshness(entry, now=1100.0) == "stale"
+    # Cerca del soft TTL y con un U pequeño, XFetch adelanta el refresco
+    assert _details_freshness(entry, now=1090.0, rng=_FixedRng(0.99)) == "early"
+    # Entradas antiguas sin metadatos no se consideran caducadas
+    assert _details_freshness({"details": "x"}) == "fresh"
+
+
+async def test_stale_entry_served_while_single_refresh_runs(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(openai_client_module, "redis_client", fake)
+    monkeypatch.setattr(openai_client_module, "DETAILS_CACHE_SOFT_TTL", 60)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SITEMAP_DISCOVERY", False)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PREFETCH", False)
+    crawls.clear()
+
+    client = OpenAIClient(_Scraper)
+    key = client._details_cache_key("https://swr.example", None)
+    old = {"details": "Old details", "social_links": [], "stored_at": time.time() - 120}
+    fake.set(key, json.dumps(old))
+
+    first, second = await asyncio.gather(
+        client.get_all_details("https://swr.example"),
+        OpenAIClient(_Scraper).get_all_details("https://swr.example"),
+    )
+    assert first["details"] == second["details"] == "Old details"
+
+    await asyncio.gather(*openai_client_module._background_refreshes)
+    assert crawls == ["https://swr.example"]
+    refreshed = json.loads(fake.get(key))
+    assert refreshed["details"].endswith("Fresh details")
+    assert refreshed["delta"] > 0
+    assert f"{key}:refresh" not in fake.store
+
+
+def test_details_key_depends_on_company_name_used_for_ranking(monkeypatch):
+    client = OpenAIClient(_Scraper)
+    acme = client._details_cache_key("https://www.acme.example", None, "Acme Corp")
+    assert acme == client._details_cache_key("https://acme.example/", None, "  acme   CORP ")
+    assert acme != client._details_cache_key("https://acme.example", None, "Other Co")
+
+    # Sin ranking el texto no depende del nombre: una entrada por host
+    monkeypatch.setattr(openai_client_module, "DETAILS_RANKING", False)
+    assert client._details_cache_key("https://acme.example", None, "Acme") == (
+        client._details_cache_key("https://acme.example", None, "Other")
+    )
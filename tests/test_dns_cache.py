@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.http.dns_cache import BlockedHostError, DNSCache, DNSResolutionError
+from services.http.transport import PinnedDNSTransport
+
+
+def _counting_resolver(mapping: dict[str, list[str]]):
+    calls: list[str] = []
+
+    async def resolver(host: str) -> list[str]:
+        calls.append(host)
+        await asyncio.sleep(0)
+        if host not in mapping:
+            raise OSError("NXDOMAIN")
+        return mapping[host]
+
+    return resolver, calls
+
+
+async def test_resolve_is_cached_and_coalesced():
+    resolver, calls = _counting_resolver({"example.com": ["93.184.216.34"]})
+    cache = DNSCache(resolver=resolver, ttl=60)
+
+    results = await asyncio.gather(*(cache.resolve("Example.com.") for _ in range(5)))
+    assert all(r == ("93.184.216.34",) for r in results)
+    await cache.resolve("example.com")
+    # Una sola consulta real para todas las llamadas concurrentes y posteriores
+    assert calls == ["example.com"]
+
+
+async def test_cancelled_leader_does_not_strand_followers():
+    calls: list[str] = []
+    release = asyncio.Event()
+
+    async def resolver(host: str) -> list[str]:
+        calls.append(host)
+        if len(calls) == 1:
+            await release.wait()
+        return ["93.184.216.34"]
+
+    cache = DNSCache(resolver=resolver, ttl=60)
+    leader = asyncio.ensure_future(cache.resolve("example.com"))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.resolve("example.com"))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    # El seguidor repite la resolución en lugar de quedarse colgado
+    assert await asyncio.wait_for(follower, 1) == ("93.184.216.34",)
+    assert leader.cancelled()
+    assert len(calls) == 2
+
+
+async def test_negative_results_are_cached():
+    resolver, calls = _counting_resolver({})
+    cache = DNSCache(resolver=resolver, negative_ttl=60)
+
+    for _ in range(2):
+        with pytest.raises(DNSResolutionError):
+            await cache.resolve("missing.example")
+    assert calls == ["missing.example"]
+
+
+async def test_resolve_vetted_blocks_any_private_address():
+    resolver, _ = _counting_resolver(
+        {
+            "public.example": ["93.184.216.34"],
+            "rebind.example": ["93.184.216.34", "10.0.0.5"],
+            "mapped.example": ["::ffff:127.0.0.1"],
+        }
+    )
+    cache = DNSCache(resolver=resolver)
+
+    assert await cache.resolve_vetted("public.example") == "93.184.216.34"
+    with pytest.raises(BlockedHostError):
+        await cache.resolve_vetted("rebind.example")
+    with pytest.raises(BlockedHostError):
+        await cache.resolve_vetted("mapped.example")
+    with pytest.raises(BlockedHostError):
+        await cache.resolve_vetted("localhost")
+
+
+async def test_pinned_transport_refuses_hosts_resolving_to_private_ips():
+    resolver, _ = _counting_resolver({"internal.example": ["127.0.0.1"]})
+    transport = PinnedDNSTransport(cache=DNSCache(resolver=resolver))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://internal.example/")
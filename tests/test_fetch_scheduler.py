@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from services.http.fetch_scheduler import FairFetchScheduler, FetchFlow
+
+
+async def test_caps_in_flight_and_times_out():
+    sched = FairFetchScheduler(max_in_flight=1)
+    flow = FetchFlow(user_id="u1")
+    await sched.acquire(flow)
+    with pytest.raises(TimeoutError):
+        await sched.acquire(flow, timeout=0.05)
+    sched.release()
+    # El waiter expirado no debe bloquear nuevos huecos
+    await sched.acquire(flow, timeout=0.05)
+    assert sched.in_flight == 1
+
+
+async def test_round_robin_across_users_and_requests():
+    sched = FairFetchScheduler(max_in_flight=1)
+    big = FetchFlow(user_id="heavy", request_id="crawl")
+    other = FetchFlow(user_id="light", request_id="brochure")
+    order: list[str] = []
+
+    async def fetch(flow: FetchFlow, label: str):
+        async with sched.slot(flow):
+            order.append(label)
+            await asyncio.sleep(0)
+
+    await sched.acquire(big)  # ocupa el único hueco
+    tasks = [asyncio.ensure_future(fetch(big, f"heavy-{i}")) for i in range(4)]
+    tasks.append(asyncio.ensure_future(fetch(other, "light-0")))
+    await asyncio.sleep(0)
+    sched.release()
+    await asyncio.gather(*tasks)
+
+    # El usuario ligero no espera a que termine todo el crawl pesado
+    assert order.index("light-0") <= 1
+    assert sched.in_flight == 0
@@ -0,0 +1,66 @@
+from services.common.fingerprint import (
+    hamming_distance,
+    is_near_duplicate,
+    page_fingerprint,
+    simhash,
+)
+from services.openai.openai_client import OpenAIClient
+
+SERVICES_TEXT = " ".join(
+    f"We provide consulting service number {i} for enterprise clients worldwide." for i in range(40)
+)
+
+
+def test_identical_and_near_identical_texts_are_close():
+    a = simhash(SERVICES_TEXT)
+    assert simhash(SERVICES_TEXT) == a
+    b = simhash(SERVICES_TEXT + " Copyright 2024.")
+    assert hamming_distance(a, b) <= 3
+    assert is_near_duplicate(b, [a])
+
+
+def test_different_texts_are_far_apart():
+    other = " ".join(
+        f"Our team of {i} engineers builds open source tooling in Madrid." for i in range(40)
+    )
+    assert hamming_distance(simhash(SERVICES_TEXT), simhash(other)) > 10
+    assert not is_near_duplicate(simhash(other), [simhash(SERVICES_TEXT)])
+
+
+def test_empty_text_and_url_cache():
+    assert simhash("") == 0
+    fp = page_fingerprint("https://example.com/services/", SERVICES_TEXT)
+    assert page_fingerprint("https://example.com/services", SERVICES_TEXT) == fp
+
+
+class _DuplicatePagesScraper:
+    def __init__(self, url, accept_language=None, deadline=None, flow=None):
+        self.url = url
+
+    async def get_content(self):
+        if self.url == "https://dupes.example":
+            text = "Landing"
+            links = [
+                "https://dupes.example/services",
+                "https://dupes.example/en/services",
+                "https://dupes.example/about",
+            ]
+        elif self.url.endswith("/about"):
+            text, links = "About us: a small family company founded in 1990.", []
+        else:
+            text, links = SERVICES_TEXT + f" ({self.url})", []
+        return {
+            "text": text,
+            "info_links": links,
+            "social_links": [],
+            "fingerprint": simhash(text),
+        }
+
+
+async def test_get_all_details_drops_near_duplicate_pages():
+    client = OpenAIClient(_DuplicatePagesScraper)
+    result = await client.get_all_details("https://dupes.example")
+
+    details = result["details"]
+    assert details.count("consulting service number 0 ") == 1
+    assert "family company" in details
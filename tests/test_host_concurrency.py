@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api.v1.admin as admin_module
+from config import settings
+from services.http.host_concurrency import HostConcurrencyController, parse_retry_after
+
+
+def test_parse_retry_after_seconds_and_invalid():
+    assert parse_retry_after("5") == 5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not-a-date") is None
+    # Fecha HTTP en el pasado: no esperar
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_additive_increase_on_healthy_responses():
+    ctl = HostConcurrencyController(initial=2, maximum=4)
+    for _ in range(20):
+        ctl.record_response("cdn.example", 200, 0.05)
+    assert ctl.window("cdn.example") == 4
+    assert ctl.snapshot()["cdn.example"]["limit"] == 4
+
+
+def test_multiplicative_decrease_and_retry_after():
+    ctl = HostConcurrencyController(initial=8, minimum=1)
+    ctl.record_response("small.example", 429, 0.1, retry_after="10")
+    assert ctl.window("small.example") == 4
+    assert ctl.snapshot()["small.example"]["blocked_for"] > 0
+
+    # Varios fallos seguidos dentro del mismo RTT solo reducen una vez
+    ctl.record_error("small.example")
+    assert ctl.window("small.example") == 4
+
+
+def test_latency_spike_backs_off():
+    ctl = HostConcurrencyController(initial=8, spike_factor=3.0)
+    ctl.record_response("slow.example", 200, 0.1)
+    ctl.record_response("slow.example", 200, 1.0)
+    assert ctl.window("slow.example") < 8
+
+
+async def test_acquire_respects_window_and_times_out():
+    ctl = HostConcurrencyController(initial=1, maximum=1)
+    await ctl.acquire("one.example")
+    with pytest.raises(TimeoutError):
+        await ctl.acquire("one.example", timeout=0.05)
+
+    waiter = asyncio.ensure_future(ctl.acquire("one.example", timeout=1))
+    await asyncio.sleep(0)
+    ctl.release("one.example")
+    await waiter
+    assert ctl.snapshot()["one.example"]["in_flight"] == 1
+
+
+async def test_cancelled_woken_waiter_hands_slot_to_next():
+    ctl = HostConcurrencyController(initial=1, maximum=1)
+    await ctl.acquire("one.example")
+    first = asyncio.ensure_future(ctl.acquire("one.example"))
+    second = asyncio.ensure_future(ctl.acquire("one.example", timeout=1))
+    await asyncio.sleep(0)
+
+    # El primer waiter recibe el hueco pero se cancela antes de ejecutarse
+    ctl.release("one.example")
+    first.cancel()
+    await second
+    assert first.cancelled()
+    assert ctl.snapshot()["one.example"]["in_flight"] == 1
+    assert ctl.snapshot()["one.example"]["waiting"] == 0
+
+
+async def test_idle_hosts_are_evicted_but_busy_ones_kept():
+    ctl = HostConcurrencyController(initial=1, maximum=1, max_hosts=2)
+    await ctl.acquire("busy.example")
+    ctl.window("idle.example")
+    ctl.window("new.example")
+    ctl.window("newer.example")
+    assert set(ctl.snapshot()) == {"busy.example", "newer.example"}
+    ctl.release("busy.example")
+    assert ctl.snapshot()["busy.example"]["in_flight"] == 0
+
+
+async def test_admin_endpoint_exposes_host_windows(monkeypatch):
+    controller = HostConcurrencyController(initial=4)
+    monkeypatch.setattr(admin_module, "host_concurrency", controller)
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    await controller.acquire("acme.example")
+    controller.record_response("acme.example", 429, 0.1, "30")
+
+    app = FastAPI()
+    app.include_router(admin_module.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/admin/scraper/hosts", headers={"X-Admin-Token": "s3cret"})
+    host = response.json()["hosts"]["acme.example"]
+    assert host["window"] == 2 and host["in_flight"] == 1
+    assert 0 < host["blocked_for"] <= 30
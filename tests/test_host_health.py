@@ -0,0 +1,61 @@
+import pytest
+
+from services.http.host_health import HostHealth, HostUnavailableError, is_host_failure_status
+
+
+class _DownRedis:
+    """Simula Redis caído: el breaker debe seguir funcionando en memoria."""
+
+    def __getattr__(self, name):
+        def _fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        return _fail
+
+
+def test_failure_status_classification():
+    assert is_host_failure_status(500)
+    assert is_host_failure_status(503)
+    assert is_host_failure_status(429)
+    assert not is_host_failure_status(404)
+    assert not is_host_failure_status(200)
+
+
+def test_circuit_opens_after_threshold_and_success_closes_it():
+    health = HostHealth(client=_DownRedis(), failure_threshold=2, open_seconds=60)
+
+    health.record_failure("Example.com")
+    health.check("example.com")  # todavía cerrado
+
+    health.record_failure("example.com")
+    assert health.is_open("example.com")
+    with pytest.raises(HostUnavailableError):
+        health.check("example.com")
+
+    # Otros hosts no se ven afectados
+    health.check("other.example")
+
+    health.record_success("example.com")
+    assert not health.is_open("example.com")
+
+
+def test_open_state_is_read_from_shared_store():
+    import time
+
+    class _SharedRedis:
+        def get(self, key):
+            assert key == "scraper:host:open:down.example"
+            return str(time.time() + 30)
+
+    health = HostHealth(client=_SharedRedis(), sync_interval=0)
+    assert health.is_open("down.example")
+
+
+def test_only_healthy_idle_hosts_are_evicted():
+    health = HostHealth(client=_DownRedis(), failure_threshold=1, max_hosts=2)
+    health.record_failure("down.example")
+    health.is_open("ok.example")
+    health.is_open("other.example")
+    # El host con el circuito abierto sigue recordado; el sano más antiguo se olvida
+    assert set(health._hosts) == {"down.example", "other.example"}
+    assert health.is_open("down.example")
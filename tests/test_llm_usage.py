@@ -0,0 +1,81 @@
+import sqlite3
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.v1.admin import router as admin_router
+from api.v1.deps import store_brochure_analytics
+from config import settings
+from services.openai.mock_llm import FakeOpenAI, LatencyModel, MockCompletionEngine
+from services.openai.openai_client import OpenAIClient
+from services.openai.usage import LLMUsage, estimate_cost_usd
+
+
+def test_cost_uses_cached_input_price():
+    # gpt-5-mini: 0.25 entrada, 0.025 cacheado, 2.00 salida (USD por 1M)
+    assert estimate_cost_usd("gpt-5-mini", 1_000_000, 0) == 0.25
+    assert estimate_cost_usd("gpt-5-mini", 1_000_000, 0, cached_tokens=1_000_000) == 0.025
+    assert estimate_cost_usd("gpt-5-mini", 0, 500_000) == 1.0
+    assert estimate_cost_usd("unknown-model", 10, 10) is None
+    assert LLMUsage().as_analytics() == {}
+
+
+async def test_chat_completion_accumulates_usage():
+    client = OpenAIClient(object)
+    client.client = FakeOpenAI(MockCompletionEngine(LatencyModel("fixed", (5.0,))))
+    messages = [{"role": "user", "content": "You are looking at a company called: Acme\n" * 20}]
+
+    await client._run_chat_completion(messages, model="gpt-5-mini")
+    await client._run_chat_completion(messages, model="gpt-5-mini")
+
+    usage = client.usage
+    assert usage.calls == 2
+    assert usage.prompt_tokens > 0 and usage.completion_tokens > 0
+    assert usage.latency_ms >= 10
+    assert usage.as_analytics()["cost_usd"] == usage.cost_usd() > 0
+
+
+async def test_analytics_store_usage_and_admin_aggregates(db, monkeypatch):
+    usage = LLMUsage(
+        model="gpt-5-mini", calls=1, prompt_tokens=4000, completion_tokens=1000, latency_ms=900
+    )
+    for success in (True, False):
+        # Sin sink arrancado: la inserción va al executor de SQLite
+        pending = store_brochure_analytics(
+            anon_id="anon-1",
+            url="https://www.acme.example/",
+            company_name="Acme",
+            brochure_type="professional",
+            language="English",
+            success=success,
+            processing_time_ms=1500,
+            **usage.as_analytics(),
+        )
+        pending.result(timeout=5)
+    row = (
+        sqlite3.connect(db)
+        .execute("SELECT prompt_tokens, cost_usd FROM brochure_analytics")
+        .fetchone()
+    )
+    assert row == (4000, 0.003)
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        monkeypatch.setattr(settings, "admin_token", None)
+        assert (await client.get("/admin/analytics/llm_usage")).status_code == 404
+
+        monkeypatch.setattr(settings, "admin_token", "s3cret")
+        denied = await client.get("/admin/analytics/llm_usage", headers={"X-Admin-Token": "x"})
+        assert denied.status_code == 401
+
+        response = await client.get(
+            "/admin/analytics/llm_usage", headers={"X-Admin-Token": "s3cret"}
+        )
+    body = response.json()
+    assert body["totals"]["requests"] == 2
+    assert body["totals"]["prompt_tokens"] == 8000
+    assert body["totals"]["cost_per_success_usd"] == pytest.approx(0.006)
+    assert body["by_day_model"][0]["model"] == "gpt-5-mini"
@@ -0,0 +1,32 @@
+import httpx
+
+from benchmarks.load.run import compare, percentile
+from benchmarks.load.stub_sites import build_stub_sites_app, company_name, site_url
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_flags_latency_throughput_and_error_regressions():
+    base = {"endpoints": {"create": {"p95_ms": 1000, "rps": 10, "errors": 0, "requests": 100}}}
+    same = {"endpoints": {"create": {"p95_ms": 1100, "rps": 9, "errors": 1, "requests": 100}}}
+    worse = {"endpoints": {"create": {"p95_ms": 1500, "rps": 5, "errors": 10, "requests": 100}}}
+    assert compare(same, base, tolerance=0.2) == []
+    problems = compare(worse, base, tolerance=0.2)
+    assert len(problems) == 3 and all(p.startswith("create:") for p in problems)
+
+
+async def test_stub_sites_serve_per_host_companies():
+    app = build_stub_sites_app()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+        landing = await client.get(site_url(3))
+        assert company_name(3) in landing.text
+        assert "Acme Robotics" not in landing.text
+        assert (await client.get(site_url(3) + "sitemap.xml")).status_code == 404
+        assert company_name(3) in (await client.get(site_url(3) + "blog/news")).text
@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from config import settings
+from services.observability import metrics
+
+
+def _value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_time_stage_records_even_on_error():
+    before = _value("brochures_stage_seconds_count", stage="parse")
+    with pytest.raises(ValueError):
+        with metrics.time_stage("parse"):
+            raise ValueError("boom")
+    assert _value("brochures_stage_seconds_count", stage="parse") == before + 1
+
+
+def test_cache_and_llm_counters():
+    hits = _value("brochures_cache_requests_total", cache="brochure", result="hit")
+    misses = _value("brochures_cache_requests_total", cache="brochure", result="miss")
+    metrics.record_cache("brochure", True)
+    metrics.record_cache("brochure", False)
+    metrics.record_cache("brochure", False)
+    assert _value("brochures_cache_requests_total", cache="brochure", result="hit") == hits + 1
+    assert _value("brochures_cache_requests_total", cache="brochure", result="miss") == misses + 2
+
+    prompt = _value("brochures_llm_tokens_total", model="m-test", kind="prompt")
+    metrics.record_llm_call("m-test", "ok", prompt_tokens=120, completion_tokens=30)
+    metrics.record_llm_call("m-test", "timeout")
+    assert _value("brochures_llm_tokens_total", model="m-test", kind="prompt") == prompt + 120
+    assert _value("brochures_llm_requests_total", model="m-test", outcome="timeout") >= 1
+
+
+def test_disabled_metrics_are_noop(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    before = _value("brochures_rate_limit_rejections_total", path="/x")
+    metrics.record_rate_limited("/x")
+    assert _value("brochures_rate_limit_rejections_total", path="/x") == before
+
+
+async def test_metrics_endpoint_exposes_http_histogram():
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/metrics")
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'brochures_http_request_seconds_count{method="GET",route="/metrics"' in response.text
@@ -0,0 +1,107 @@
+import random
+
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+from services.openai.mock_llm import (
+    FakeOpenAI,
+    LatencyModel,
+    MockCompletionEngine,
+    render_mock_brochure,
+)
+from services.openai.prompts import Prompts
+
+MESSAGES = [
+    {"role": "system", "content": "You are an expert marketing copywriter."},
+    {
+        "role": "user",
+        "content": Prompts().get_brochure_user_prompt(
+            "Acme Robotics",
+            "Main website URL: https://acme.example\n\n"
+            "Acme Robotics designs warehouse automation robots for mid-size logistics firms.",
+            "- linkedin: https://www.linkedin.com/company/acme",
+            "English",
+        ),
+    },
+]
+
+
+def test_latency_model_parsing_and_sampling():
+    rng = random.Random(1)
+    assert LatencyModel.parse("fixed:800").sample(rng) == 0.8
+    assert 0.5 <= LatencyModel.parse("uniform:500:3000").sample(rng) <= 3.0
+    samples = sorted(LatencyModel.parse("lognormal:1000:0.5").sample(rng) for _ in range(501))
+    assert 0.8 < samples[250] < 1.25
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:1")
+
+
+def test_brochure_uses_prompt_content():
+    page = render_mock_brochure(MESSAGES)
+    assert "<h1>Acme Robotics" in page
+    assert '<a href="https://acme.example">Website</a>' in page
+    assert 'href="https://www.linkedin.com/company/acme"' in page
+    assert "@page" in page and "<main>" in page
+
+
+def test_fake_client_completion_stream_and_errors():
+    client = FakeOpenAI(MockCompletionEngine(LatencyModel.parse("fixed:0"), seed=3))
+    response = client.chat.completions.create(model="gpt-5-mini", messages=MESSAGES)
+    content = response.choices[0].message.content
+    assert content.startswith("<!DOCTYPE html>")
+    assert response.usage.completion_tokens > 0 and response.usage.prompt_tokens > 0
+
+    chunks = list(
+        client.chat.completions.create(
+            model="gpt-5-mini",
+            messages=MESSAGES,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+    )
+    streamed = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    assert streamed.startswith("<!DOCTYPE html>") and len(streamed) == len(content)
+    assert chunks[-1].usage.total_tokens > 0
+
+    failing = FakeOpenAI(MockCompletionEngine(error_rate=1.0, seed=3))
+    with pytest.raises(openai.APIError):
+        failing.chat.completions.create(model="gpt-5-mini", messages=MESSAGES)
+
+
+def test_fake_clients_share_one_engine_parsed_once(monkeypatch):
+    import services.openai.mock_llm as mock_llm
+
+    parsed = []
+    original = LatencyModel.parse
+    monkeypatch.setattr(mock_llm, "_shared_engine", None)
+    monkeypatch.setattr(
+        LatencyModel, "parse", classmethod(lambda cls, spec: parsed.append(spec) or original(spec))
+    )
+    assert FakeOpenAI().engine is FakeOpenAI().engine
+    assert len(parsed) == 1
+
+
+def test_stub_server_speaks_openai_protocol(monkeypatch):
+    import services.openai.mock_server as mock_server
+
+    monkeypatch.setattr(mock_server, "engine", MockCompletionEngine(seed=5))
+    http = TestClient(mock_server.app)
+    body = http.post(
+        "/v1/chat/completions", json={"model": "gpt-5-mini", "messages": MESSAGES}
+    ).json()
+    assert body["choices"][0]["message"]["content"].startswith("<!DOCTYPE html>")
+    assert body["usage"]["total_tokens"] > 0
+
+    with http.stream(
+        "POST",
+        "/v1/chat/completions",
+        json={"model": "gpt-5-mini", "messages": MESSAGES, "stream": True},
+    ) as stream:
+        lines = [line for line in stream.iter_lines() if line]
+    assert lines[-1] == "data: [DONE]"
+
+    monkeypatch.setattr(mock_server, "engine", MockCompletionEngine(error_rate=1.0, seed=5))
+    error = http.post("/v1/chat/completions", json={"model": "m", "messages": MESSAGES})
+    assert error.status_code in (408, 429, 500, 503)
+    assert "error" in error.json()
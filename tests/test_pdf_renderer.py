@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config import settings
+from services.common.deadline import Deadline, DeadlineExceeded
+from services.pdf.renderer import render_pdf
+
+
+class _Page:
+    async def emulate_media(self, media):
+        pass
+
+    async def set_content(self, html, wait_until, timeout):
+        pass
+
+    async def pdf(self, **kwargs):
+        await asyncio.sleep(5)
+        return b"%PDF"
+
+
+class _Context:
+    closed = False
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    async def new_page(self):
+        return _Page()
+
+    async def close(self):
+        self.closed = True
+
+
+def _app(context: _Context):
+    async def new_context(**kwargs):
+        return context
+
+    browser = SimpleNamespace(new_context=new_context)
+    return SimpleNamespace(state=SimpleNamespace(browser=browser, pdf_sema=asyncio.Semaphore(1)))
+
+
+async def test_render_timeout_limited_by_deadline_is_deadline_exceeded():
+    context = _Context()
+    app = _app(context)
+    with pytest.raises(DeadlineExceeded):
+        await render_pdf(app, "<p>hola</p>", deadline=Deadline(0.1))
+    assert context.closed
+    assert not app.state.pdf_sema.locked()
+
+
+async def test_render_timeout_from_config_is_not_deadline(monkeypatch):
+    monkeypatch.setattr(settings, "playwright_pdf_timeout_ms", 50)
+    with pytest.raises(TimeoutError):
+        await render_pdf(_app(_Context()), "<p>hola</p>", deadline=Deadline(10))
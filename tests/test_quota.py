@@ -0,0 +1,61 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from api.v1.deps import release_brochure, reserve_brochure
+
+
+def _count(path, anon_id) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(
+            "SELECT brochures_count FROM users WHERE anon_id = ?", (anon_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_reserve_creates_user_and_stops_at_limit(db):
+    user, reserved = reserve_brochure("10.0.0.1", None, limit=2)
+    assert reserved and user["brochures_count"] == 1
+    # Sin anon_id se resuelve por IP
+    user, reserved = reserve_brochure("10.0.0.1", None, limit=2)
+    assert reserved and user["brochures_count"] == 2
+
+    user, reserved = reserve_brochure("10.0.0.9", user["anon_id"], limit=2)
+    assert not reserved
+    assert user["brochures_count"] == 2
+    assert _count(db, user["anon_id"]) == 2
+
+
+def test_reserve_resets_on_new_day(db):
+    user, _ = reserve_brochure("10.0.0.1", None, limit=1)
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE users SET updated_at = datetime('now', '-1 day')")
+    conn.commit()
+    conn.close()
+
+    user, reserved = reserve_brochure("10.0.0.1", user["anon_id"], limit=1)
+    assert reserved and user["brochures_count"] == 1
+
+
+def test_release_returns_reservation_once_per_day(db):
+    user, _ = reserve_brochure("10.0.0.1", None, limit=3)
+    release_brochure(user["anon_id"], user["updated_at"])
+    assert _count(db, user["anon_id"]) == 0
+    release_brochure(user["anon_id"], user["updated_at"])
+    assert _count(db, user["anon_id"]) == 0
+
+    # Reserva de ayer ya reseteada hoy: no se descuenta de la cuota de hoy
+    user, _ = reserve_brochure("10.0.0.1", user["anon_id"], limit=3)
+    release_brochure(user["anon_id"], "2000-01-01 12:00:00")
+    assert _count(db, user["anon_id"]) == 1
+
+
+def test_concurrent_reservations_never_exceed_quota(db):
+    user, _ = reserve_brochure("10.0.0.1", None, limit=3)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(lambda _: reserve_brochure("10.0.0.1", user["anon_id"], limit=3)[1], range(12))
+        )
+    assert results.count(True) == 2
+    assert _count(db, user["anon_id"]) == 3
@@ -0,0 +1,88 @@
+import gzip
+
+import httpx
+import pytest
+
+import services.scraper as scraper_module
+from services.scraper import Scraper
+
+PAGE = (
+    "<html><body>" + "<p>Acme builds robots for warehouses.</p>" * 2000 + "</body></html>"
+).encode()
+
+
+def _serve(monkeypatch, body: bytes, encoding: str, seen: list[httpx.Request] | None = None):
+    async def stream():
+        # Entregar en bloques, como llegaría por la red
+        for i in range(0, len(body), 1024):
+            yield body[i : i + 1024]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if seen is not None:
+            seen.append(request)
+        return httpx.Response(
+            200,
+            content=stream(),
+            headers={"Content-Encoding": encoding, "Content-Type": "text/html; charset=utf-8"},
+        )
+
+    monkeypatch.setattr(scraper_module, "build_transport", lambda: httpx.MockTransport(handler))
+
+
+async def test_gzip_page_records_wire_and_decoded_bytes(monkeypatch):
+    seen: list[httpx.Request] = []
+    _serve(monkeypatch, gzip.compress(PAGE), "gzip", seen)
+    scraper = Scraper("https://example.com/")
+    html = await scraper.fetch()
+
+    assert html == PAGE.decode()
+    assert "gzip" in seen[0].headers["Accept-Encoding"]
+    assert scraper.content_encoding == "gzip"
+    assert scraper.decoded_bytes == len(PAGE)
+    assert scraper.wire_bytes == len(gzip.compress(PAGE)) < scraper.decoded_bytes
+
+
+async def test_brotli_page_is_decoded(monkeypatch):
+    brotli = pytest.importorskip("brotli")
+    _serve(monkeypatch, brotli.compress(PAGE), "br")
+    scraper = Scraper("https://example.com/")
+    assert await scraper.fetch() == PAGE.decode()
+    assert scraper.wire_bytes < scraper.decoded_bytes
+
+
+async def test_decompression_bomb_is_rejected(monkeypatch):
+    monkeypatch.setattr(scraper_module, "SCRAPER_MAX_DECODED_BYTES", 64 * 1024)
+    _serve(monkeypatch, gzip.compress(b"\0" * (1024 * 1024)), "gzip")
+    with pytest.raises(Exception, match="decoded body exceeds"):
+        await Scraper("https://example.com/").fetch()
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return pytest.importorskip("brotli").compress(data)
+    if encoding == "zstd":
+        return pytest.importorskip("zstandard").ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+async def test_single_wire_chunk_never_inflates_past_limit(monkeypatch, encoding):
+    limit = 64 * 1024
+    monkeypatch.setattr(scraper_module, "SCRAPER_MAX_DECODED_BYTES", limit)
+    # 32 MB de ceros en un único bloque del cable (unas decenas de KB comprimidos)
+    bomb = _compress(encoding, b"\0" * (32 * 1024 * 1024))
+
+    async def stream():
+        yield bomb
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream(), headers={"Content-Encoding": encoding})
+
+    monkeypatch.setattr(scraper_module, "build_transport", lambda: httpx.MockTransport(handler))
+    sizes: list[int] = []
+    scraper = Scraper("https://example.com/")
+    await scraper.fetch_stream(lambda chunk: sizes.append(len(chunk)), max_bytes=10 * limit)
+
+    # El decoder se detiene en el tope: ni un bloque ni el total lo superan
+    assert sum(sizes) == scraper.decoded_bytes == limit
+    assert max(sizes) <= limit
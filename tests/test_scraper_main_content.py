@@ -0,0 +1,103 @@
+import os
+
+from bs4 import BeautifulSoup
+
+from services.scraper import _clean_soup, _extract_main_text, _extract_text, strip_repeated_lines
+
+CORPUS = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "corpus")
+
+
+def _soup(html: str) -> BeautifulSoup:
+    soup = BeautifulSoup(html, "html.parser")
+    _clean_soup(soup)
+    return soup
+
+
+def test_main_mode_drops_nav_footer_and_cookie_banner():
+    html = """
+    <html><body>
+      <nav><a href="/">Home</a><a href="/about">About us</a></nav>
+      <div class="cookie-banner"><p>We use cookies to improve your experience.</p></div>
+      <main>
+        <h1>Acme Robotics</h1>
+        <p>We build autonomous robots for warehouses across Europe.</p>
+        <ul class="links"><li><a href="/a">Link A</a></li><li><a href="/b">Link B</a></li></ul>
+      </main>
+      <footer><p>© 2024 Acme. All rights reserved.</p></footer>
+    </body></html>
+    """
+    text = _extract_main_text(_soup(html))
+    assert "Acme Robotics" in text
+    assert "autonomous robots for warehouses" in text
+    assert "cookies" not in text
+    assert "All rights reserved" not in text
+    assert "About us" not in text
+    assert "Link A" not in text
+
+
+def test_main_mode_keeps_article_header_but_drops_page_header():
+    html = """
+    <html><body>
+      <header><div class="logo">Acme</div><p>Call us today: +34 910 000 000 now</p></header>
+      <article>
+        <header><h1>Acme Robotics</h1><p>Robots for warehouses</p></header>
+        <p>We build autonomous mobile robots that move pallets between storage and
+        packing stations, integrated with the main warehouse management systems.</p>
+      </article>
+    </body></html>
+    """
+    text = _extract_main_text(_soup(html))
+    assert "Acme Robotics" in text
+    assert "Robots for warehouses" in text
+    assert "Call us today" not in text
+
+
+def test_main_mode_scores_unlabelled_link_lists_and_isolated_snippets():
+    html = """
+    <html><body>
+      <div class="x1"><p><a href="/a">Products and pricing</a> <a href="/b">Careers page</a></p></div>
+      <div class="x2"><p>Limited offer this week</p></div>
+      <div class="x3"><p><a href="/c">Blog archive</a> <a href="/d">Press room</a></p></div>
+      <div class="content">
+        <h2>What we do</h2>
+        <p>We build autonomous mobile robots that move pallets between storage and
+        packing stations, integrated with the main warehouse management systems.</p>
+        <p>1,800 robots deployed</p>
+      </div>
+    </body></html>
+    """
+    text = _extract_main_text(_soup(html))
+    assert "What we do" in text
+    assert "1,800 robots deployed" in text
+    assert "Products and pricing" not in text
+    # Bloque corto aislado entre bloques de enlaces: no es contenido
+    assert "Limited offer" not in text
+
+
+def test_main_mode_does_not_remove_links_from_dom():
+    soup = _soup('<nav><a href="/about">About</a></nav><p>Some real content here.</p>')
+    _extract_main_text(soup)
+    assert soup.find("a", href="/about") is not None
+
+
+def test_main_mode_reduces_corpus_text():
+    with open(os.path.join(CORPUS, "services.html"), encoding="utf-8") as f:
+        html = f.read()
+    full = _extract_text(_soup(html))
+    main = _extract_main_text(_soup(html))
+    assert "Warehouse automation" in main
+    assert len(main) < len(full) * 0.75
+
+
+def test_strip_repeated_lines_keeps_first_occurrence():
+    pages = [
+        "Menu\nLanding intro",
+        "Menu\nAbout text",
+        "Menu\nServices text",
+        "Contact text",
+    ]
+    result = strip_repeated_lines(pages)
+    assert result[0] == "Menu\nLanding intro"
+    assert result[1:] == ["About text", "Services text", "Contact text"]
+    # Con pocas páginas no se toca nada
+    assert strip_repeated_lines(pages[:2]) == pages[:2]
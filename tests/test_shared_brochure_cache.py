@@ -0,0 +1,65 @@
+import json
+
+import services.brochures.cache as cache_module
+from services.brochures.cache import (
+    generate_content_key,
+    get_brochure_payload,
+    get_shared_brochure,
+    store_brochure_pointer,
+    store_shared_brochure,
+)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+        self.ttls[key] = ex
+
+    def ttl(self, key):
+        return self.ttls.get(key, -2) if key in self.store else -2
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+def test_content_key_ignores_user_and_cosmetic_differences():
+    key = generate_content_key("https://Acme.example/", "English", "professional", "Acme  Corp")
+    assert key == generate_content_key(
+        "https://acme.example", "english", "Professional", " acme corp "
+    )
+    assert key != generate_content_key("https://acme.example", "Spanish", "professional", "Acme")
+    assert key.startswith("brochure:content:")
+
+
+def test_user_pointers_share_one_blob(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(cache_module, "redis_client", fake)
+    content_key = generate_content_key("https://acme.example", "English", "professional", "Acme")
+
+    store_shared_brochure(content_key, "<h1>Acme</h1>", ttl_seconds=600)
+    store_brochure_pointer("user-a", content_key, {"url": "https://acme.example"}, "1.1.1.1")
+    store_brochure_pointer("user-b", content_key, {"url": "https://acme.example"}, "2.2.2.2")
+
+    assert get_shared_brochure(content_key) == "<h1>Acme</h1>"
+    # El HTML se guarda una sola vez; los punteros solo referencian la clave
+    assert "<h1>" not in fake.store["user-a"]
+    assert json.loads(fake.store["user-b"])["ref"] == content_key
+    # El blob vive al menos lo que el puntero más reciente
+    assert fake.ttls[content_key] == 3600
+
+    payload = get_brochure_payload("user-b")
+    assert payload["brochure"] == "<h1>Acme</h1>"
+    assert payload["user_ip"] == "2.2.2.2"
+
+    fake.delete(content_key)
+    assert get_brochure_payload("user-a") is None
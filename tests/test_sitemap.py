@@ -0,0 +1,178 @@
+import gzip
+
+import httpx
+
+import services.scraper as scraper_module
+import services.sitemap as sitemap_module
+from services.sitemap import (
+    SitemapParser,
+    discover_sitemap_links,
+    merge_info_links,
+    select_sitemap_links,
+)
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/</loc></url>
+  <url><loc>https://example.com/blog/2021/03/some-post</loc></url>
+  <url><loc>https://example.com/about</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc>https://www.example.com/contact</loc></url>
+  <url><loc>https://other.org/about</loc></url>
+  <url><loc>https://example.com/files/report.pdf</loc></url>
+</urlset>
+"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-pages.xml</loc></sitemap>
+  <sitemap><loc>https://evil.test/sitemap.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+
+def _feed_in_chunks(parser: SitemapParser, data: bytes, size: int = 7) -> None:
+    for i in range(0, len(data), size):
+        if not parser.feed(data[i : i + size]):
+            break
+
+
+def test_parser_streams_urlset_and_index():
+    parser = SitemapParser()
+    _feed_in_chunks(parser, URLSET)
+    assert not parser.is_index
+    assert "https://example.com/about" in parser.urls
+    assert len(parser.urls) == 6
+
+    index = SitemapParser()
+    _feed_in_chunks(index, gzip.compress(INDEX))
+    assert index.is_index
+    assert index.sitemaps == [
+        "https://example.com/sitemap-pages.xml",
+        "https://evil.test/sitemap.xml",
+    ]
+
+
+def test_parser_enforces_caps_and_tolerates_garbage():
+    entries = b"".join(b"<url><loc>https://example.com/p%d</loc></url>" % i for i in range(500))
+    big = b"<urlset>" + entries + b"</urlset>"
+
+    capped = SitemapParser(max_urls=10)
+    _feed_in_chunks(capped, big, size=256)
+    assert len(capped.urls) == 10 and capped.done
+
+    small = SitemapParser(max_bytes=1024)
+    _feed_in_chunks(small, gzip.compress(big), size=64)
+    assert small.done and 0 < len(small.urls) < 500
+
+    broken = SitemapParser()
+    assert broken.feed(b"<html><body>Not found</p></html>") is False
+    assert broken.urls == []
+
+
+def test_select_and_merge_links():
+    parser = SitemapParser()
+    parser.feed(URLSET)
+    links = select_sitemap_links(parser.urls, "https://example.com/")
+    # Sin landing, sin otros dominios ni assets; about/contact antes que el post profundo
+    assert links[:2] == ["https://example.com/about", "https://www.example.com/contact"]
+    assert "https://other.org/about" not in links
+    assert all(not u.endswith(".pdf") for u in links)
+    assert len(select_sitemap_links(parser.urls, "https://example.com/", limit=1)) == 1
+
+    merged = merge_info_links(["https://example.com/about/"], links)
+    assert (
+        merged.count("https://example.com/about") + merged.count("https://example.com/about/") == 1
+    )
+    assert "https://www.example.com/contact" in merged
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+async def test_discover_follows_index_and_caches_per_host(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(sitemap_module, "redis_client", fake)
+    documents = {
+        "https://example.com/sitemap.xml": INDEX,
+        "https://example.com/sitemap-pages.xml": URLSET,
+    }
+    fetched: list[str] = []
+
+    async def fake_read(url, accept_language, deadline, flow):
+        fetched.append(url)
+        if url not in documents:
+            raise Exception(f"Error fetching {url}")
+        parser = SitemapParser()
+        parser.feed(documents[url])
+        return parser
+
+    monkeypatch.setattr(sitemap_module, "_read_sitemap", fake_read)
+
+    links = await discover_sitemap_links("https://example.com/")
+    assert "https://example.com/about" in links
+    # El hijo de otro host no se sigue
+    assert fetched == ["https://example.com/sitemap.xml", "https://example.com/sitemap-pages.xml"]
+    assert "scraper:sitemap:example.com" in fake.store
+
+    fetched.clear()
+    assert await discover_sitemap_links("https://example.com/team") == links
+    assert fetched == []
+
+
+async def test_fetch_stream_stops_at_cap(monkeypatch):
+    body = b"x" * 100_000
+
+    async def chunks():
+        for i in range(0, len(body), 1000):
+            yield body[i : i + 1000]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=chunks())
+
+    monkeypatch.setattr(scraper_module, "build_transport", lambda: httpx.MockTransport(handler))
+    received: list[bytes] = []
+    await scraper_module.Scraper("https://example.com/sitemap.xml").fetch_stream(
+        received.append, 10
+    )
+    assert 10 <= sum(map(len, received)) < len(body)
+
+    html = await scraper_module.Scraper("https://example.com/").fetch()
+    assert html == body.decode()
+
+
+async def test_crawl_bounds_sitemap_by_crawl_deadline(monkeypatch):
+    import services.openai.openai_client as openai_client_module
+    from services.common.deadline import Deadline
+    from services.openai.openai_client import OpenAIClient
+
+    seen: list[Deadline] = []
+
+    async def fake_discover(url, accept_language=None, deadline=None, flow=None):
+        seen.append(deadline)
+        return []
+
+    class _Scraper:
+        def __init__(self, url, accept_language=None, deadline=None, flow=None):
+            self.url = url
+
+        async def get_content(self):
+            return {"text": "Landing", "info_links": [], "social_links": []}
+
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SITEMAP_DISCOVERY", True)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PREFETCH", False)
+    monkeypatch.setattr(openai_client_module, "discover_sitemap_links", fake_discover)
+    monkeypatch.setattr(openai_client_module, "_load_details_cache", lambda key: None)
+    monkeypatch.setattr(openai_client_module, "_cache_details_payload", lambda *a, **k: None)
+
+    await OpenAIClient(_Scraper).get_all_details("https://example.com", deadline=Deadline(100))
+    # El sitemap no puede gastar la reserva del LLM
+    reserve = openai_client_module.DEADLINE_LLM_RESERVE_SECONDS
+    assert seen[0].remaining() <= 100 - reserve
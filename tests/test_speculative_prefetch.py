@@ -0,0 +1,93 @@
+import asyncio
+
+import services.openai.openai_client as openai_client_module
+from services.openai.openai_client import OpenAIClient, _speculative_urls
+
+calls: list[str] = []
+cancelled: list[str] = []
+
+
+class _SlowLandingScraper:
+    def __init__(self, url, accept_language=None, deadline=None, flow=None):
+        self.url = url
+
+    async def get_content(self):
+        calls.append(self.url)
+        links: list[str] = []
+        try:
+            if self.url == "https://spec.example":
+                await asyncio.sleep(0.05)
+                text = "Landing"
+                links = ["https://spec.example/about/", "https://spec.example/team"]
+            elif self.url.endswith("/contact"):
+                await asyncio.sleep(5)
+                text = "Contact"
+            else:
+                text = f"Page {self.url}"
+        except asyncio.CancelledError:
+            cancelled.append(self.url)
+            raise
+        return {"text": text, "info_links": links, "social_links": []}
+
+
+def test_speculative_urls_skip_landing_and_duplicates(monkeypatch):
+    monkeypatch.setattr(
+        openai_client_module, "SCRAPER_SPECULATIVE_PATHS", ("/about", "/about", "/contacto")
+    )
+    assert _speculative_urls("https://ex.com/about") == ["https://ex.com/contacto"]
+    assert _speculative_urls("not a url") == []
+
+
+async def test_prefetch_reuses_linked_hits_and_cancels_misses(monkeypatch):
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PATHS", ("/about", "/contact"))
+    calls.clear()
+    cancelled.clear()
+
+    client = OpenAIClient(_SlowLandingScraper)
+    result = await client.get_all_details("https://spec.example")
+
+    # /about se pidió en paralelo a la landing y no se vuelve a pedir al verla enlazada
+    assert set(calls[:3]) == {
+        "https://spec.example",
+        "https://spec.example/about",
+        "https://spec.example/contact",
+    }
+    assert calls.count("https://spec.example/about") == 1
+    assert "https://spec.example/about/" not in calls
+    # /contact no está enlazada: se cancela en lugar de esperar sus 5 s
+    assert cancelled == ["https://spec.example/contact"]
+    assert "Page https://spec.example/about" in result["details"]
+    assert "Page https://spec.example/team" in result["details"]
+
+
+async def test_speculative_fetches_have_their_own_small_cap(monkeypatch):
+    paths = ("/a", "/b", "/c", "/d", "/e")
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PREFETCH", True)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PATHS", paths)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_MAX_IN_FLIGHT", 2)
+    in_flight = peak = 0
+
+    class _CountingScraper:
+        def __init__(self, url, accept_language=None, deadline=None, flow=None):
+            self.url = url
+
+        async def get_content(self):
+            nonlocal in_flight, peak
+            links = []
+            if self.url == "https://cap.example":
+                await asyncio.sleep(0.05)
+                links = [f"https://cap.example{p}" for p in paths]
+            else:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                try:
+                    await asyncio.sleep(0.01)
+                finally:
+                    in_flight -= 1
+            return {"text": self.url, "info_links": links, "social_links": []}
+
+    result = await OpenAIClient(_CountingScraper).get_all_details("https://cap.example")
+    # Todas las conjeturas se reutilizan, pero nunca hay más de 2 en vuelo a la vez
+    assert peak == 2
+    assert all(f"https://cap.example{p}" in result["details"] for p in paths)
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from api.v1.deps import reserve_brochure, resolve_user
+from services.db.sqlite_pool import SQLitePool, db_connection, run_db
+
+
+def test_connections_use_wal_and_are_reused(tmp_path):
+    pool = SQLitePool(str(tmp_path / "wal.db"), size=2, busy_timeout_ms=1234)
+    with pool.connection() as conn:
+        first = conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    with pool.connection() as conn:
+        assert conn is first
+    pool.close()
+
+
+def test_failed_block_rolls_back_before_returning_connection(tmp_path):
+    pool = SQLitePool(str(tmp_path / "tx.db"), size=1, busy_timeout_ms=100)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    # Sin commit explícito tampoco se filtra la transacción al siguiente uso
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO t VALUES (2)")
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.close()
+
+
+def test_pool_size_bounds_concurrent_connections(tmp_path):
+    pool = SQLitePool(str(tmp_path / "bound.db"), size=1, busy_timeout_ms=100)
+    entered = threading.Event()
+
+    def borrow():
+        with pool.connection():
+            entered.set()
+
+    with pool.connection():
+        worker = threading.Thread(target=borrow)
+        worker.start()
+        worker.join(0.1)
+        assert not entered.is_set()
+    worker.join(1)
+    assert entered.is_set()
+    pool.close()
+
+
+async def test_resolve_user_and_reserve_off_the_loop(db):
+    user = await run_db(resolve_user, "10.0.0.1", None)
+    assert user["brochures_count"] == 0
+
+    await run_db(reserve_brochure, "10.0.0.1", user["anon_id"])
+    again = await run_db(resolve_user, "10.0.0.2", user["anon_id"])
+    assert again["anon_id"] == user["anon_id"]
+    assert again["brochures_count"] == 1
+
+    with db_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
@@ -0,0 +1,76 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from config import settings
+from services.db.sqlite_pool import run_db
+from services.observability import tracing
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    monkeypatch.setattr(settings, "tracing_enabled", True)
+    monkeypatch.setattr(settings, "tracing_sample_ratio", 1.0)
+    memory = InMemorySpanExporter()
+    assert tracing.configure_tracing(exporter=memory)
+    yield memory
+    tracing.shutdown_tracing()
+
+
+def test_disabled_tracing_is_noop():
+    assert not tracing.is_enabled()
+    with tracing.span("anything", {"k": "v"}) as current:
+        assert current is None
+
+
+async def test_traced_functions_nest_under_current_span(exporter):
+    @tracing.traced("db.helper")
+    def helper():
+        return 1
+
+    @tracing.traced("pipeline")
+    async def pipeline():
+        with tracing.span("stage", {"url.full": "https://ex.com", "skip": None}):
+            return helper()
+
+    assert await pipeline() == 1
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    assert spans["db.helper"].parent.span_id == spans["stage"].context.span_id
+    assert spans["stage"].parent.span_id == spans["pipeline"].context.span_id
+    assert spans["stage"].attributes == {"url.full": "https://ex.com"}
+
+
+async def test_run_db_keeps_parent_span(exporter):
+    @tracing.traced("db.helper")
+    def helper():
+        return 1
+
+    with tracing.span("request"):
+        assert await run_db(helper) == 1
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    assert spans["db.helper"].parent.span_id == spans["request"].context.span_id
+    assert spans["db.helper"].context.trace_id == spans["request"].context.trace_id
+
+
+async def test_middleware_continues_incoming_trace(exporter):
+    app = FastAPI()
+    app.middleware("http")(tracing.trace_request)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with tracing.span("handler"):
+            return {"id": item_id}
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    headers = {"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/items/7", headers=headers)
+    assert response.status_code == 200
+
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    server = spans["GET /items/{item_id}"]
+    assert format(server.context.trace_id, "032x") == trace_id
+    assert server.attributes["http.response.status_code"] == 200
+    assert spans["handler"].parent.span_id == server.context.span_id
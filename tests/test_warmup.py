@@ -0,0 +1,97 @@
+import datetime
+import sqlite3
+
+import pytest
+
+import services.openai.openai_client as openai_client_module
+import services.warmup as warmup_module
+from services.brochures.cache import generate_content_key
+from services.warmup import _seconds_until, popular_targets, warm_caches
+
+
+@pytest.fixture
+def analytics(db):
+    conn = sqlite3.connect(db)
+    # Igual que el pool de SQLite: sin claves foráneas activas (users.anon_id no es UNIQUE)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    rows = [("acme.example", "Spanish", "professional", "Acme")] * 3
+    rows += [("acme.example", "English", "funny", "Acme")]
+    rows += [("beta.example", "English", "professional", "Beta")] * 2
+    rows += [("old.example", "English", "professional", "Old")] * 5
+    for domain, language, kind, company in rows:
+        created = "datetime('now', '-30 days')" if domain == "old.example" else "datetime('now')"
+        conn.execute(
+            "INSERT INTO brochure_analytics (anon_id, url_domain, company_name, brochure_type,"
+            f" language, success, created_at) VALUES ('a', ?, ?, ?, ?, 1, {created})",
+            (domain, company, kind, language),
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_popular_targets_rank_recent_domains(analytics):
+    targets = popular_targets(top_n=5, days=7)
+    assert [t["url"] for t in targets] == ["https://acme.example", "https://beta.example"]
+    # Combinación más frecuente por dominio, con el total de peticiones del dominio
+    assert targets[0]["language"] == "Spanish"
+    assert targets[0]["hits"] == 4
+    assert popular_targets(top_n=1, days=7)[0]["company_name"] == "Acme"
+
+
+def test_warm_target_shares_content_key_with_www_requests(analytics):
+    target = popular_targets(top_n=1, days=7)[0]
+    # Analytics guarda el dominio sin `www.`: el brochure pre-generado debe servir igual
+    assert generate_content_key(
+        target["url"], "Spanish", "professional", "Acme"
+    ) == generate_content_key("https://www.Acme.example/", "Spanish", "professional", "Acme")
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, str] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+class _Scraper:
+    def __init__(self, url, accept_language=None, deadline=None, flow=None):
+        self.url = url
+
+    async def get_content(self):
+        return {"text": f"About {self.url}", "info_links": [], "social_links": []}
+
+
+async def test_warm_caches_refreshes_then_skips_fresh_entries(monkeypatch):
+    monkeypatch.setattr(openai_client_module, "redis_client", _FakeRedis())
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SITEMAP_DISCOVERY", False)
+    monkeypatch.setattr(openai_client_module, "SCRAPER_SPECULATIVE_PREFETCH", False)
+    monkeypatch.setattr(warmup_module, "Scraper", _Scraper)
+    targets = [
+        {
+            "url": f"https://site{i}.example",
+            "language": "English",
+            "brochure_type": "professional",
+            "company_name": f"Site {i}",
+            "hits": 1,
+        }
+        for i in range(3)
+    ]
+    assert await warm_caches(targets, concurrency=2) == {"refreshed": 3}
+    assert await warm_caches(targets, concurrency=2) == {"fresh": 3}
+
+
+def test_seconds_until_next_scheduled_hour():
+    now = datetime.datetime(2026, 1, 1, 5, 30, tzinfo=datetime.UTC)
+    assert _seconds_until(4, now) == 22.5 * 3600
+    assert _seconds_until(6, now) == 0.5 * 3600